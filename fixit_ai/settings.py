@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Runs early so throttled requests are rejected before sessions, auth or views
+    'playground.middleware.RateLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -99,6 +101,22 @@ else:
     }
 
 
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Persistent store shared by all worker processes (used by RCA_CACHE when enabled)
+    'rca': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('RCA_CACHE_DIR', str(BASE_DIR / 'cache' / 'rca')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -157,6 +175,9 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
+    # Cursor pagination on (created_at, id): no COUNT(*) and no OFFSET scans
+    'DEFAULT_PAGINATION_CLASS': 'playground.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 # Default primary key field type
@@ -164,5 +185,143 @@ REST_FRAMEWORK = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Outbound HTTP connection pooling used by the API tester and chaos runs
+HTTP_POOL = {
+    'POOL_CONNECTIONS': int(os.environ.get('HTTP_POOL_CONNECTIONS', 10)),
+    'POOL_MAXSIZE': int(os.environ.get('HTTP_POOL_MAXSIZE', 20)),
+    'POOL_BLOCK': False,
+    'IDLE_TIMEOUT': int(os.environ.get('HTTP_POOL_IDLE_TIMEOUT', 90)),  # seconds
+    'MAX_HOSTS': int(os.environ.get('HTTP_POOL_MAX_HOSTS', 100)),
+}
+
 # Gemini API Integration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+
+# Rate limiting of the internal REST API per client IP (see playground.middleware)
+RATE_LIMIT = {
+    'ENABLED': os.environ.get('RATE_LIMIT_ENABLED', 'True') == 'True',
+    'ALGORITHM': os.environ.get('RATE_LIMIT_ALGORITHM', 'sliding_window'),  # or 'token_bucket'
+    'MAX_REQUESTS': int(os.environ.get('RATE_LIMIT_MAX_REQUESTS', 50)),
+    'TIME_WINDOW': int(os.environ.get('RATE_LIMIT_TIME_WINDOW', 10)),  # seconds
+    # 'shared_memory' shares counts between all workers on this host; use 'cache'
+    # with a Redis/Memcached alias when running on several hosts
+    'STORE': os.environ.get('RATE_LIMIT_STORE', 'shared_memory'),
+    'SHM_PATH': os.environ.get('RATE_LIMIT_SHM_PATH') or None,
+    'MAX_KEYS': 8192,  # clients tracked at once; idle ones are evicted
+    'CACHE_ALIAS': os.environ.get('RATE_LIMIT_CACHE_ALIAS', 'default'),
+    # Per-route limits; the first policy whose PATH regex matches applies, and
+    # MAX_REQUESTS/TIME_WINDOW/ALGORITHM default to the values above
+    'POLICIES': [
+        {'NAME': 'todos-delete-completed', 'PATH': r'^/api/todos/delete_completed/$', 'MAX_REQUESTS': 10},
+        {'NAME': 'products-update-inventory', 'PATH': r'^/api/products/[^/]+/update_inventory/$', 'MAX_REQUESTS': 20},
+        {'NAME': 'api', 'PATH': r'^/api/'},
+    ],
+}
+
+# Circuit breakers guarding external services, keyed by breaker name
+CIRCUIT_BREAKERS = {
+    'gemini': {
+        'FAILURE_THRESHOLD': int(os.environ.get('GEMINI_BREAKER_THRESHOLD', 3)),
+        'RECOVERY_TIMEOUT': 30,  # seconds open after the first trip
+        'MAX_RECOVERY_TIMEOUT': 600,  # cap for the exponentially growing open period
+        'BACKOFF_MULTIPLIER': 2.0,
+        'JITTER': 0.2,
+        'HALF_OPEN_MAX_CALLS': 1,
+    },
+}
+
+# Background RCA generation (run workers with `python manage.py rca_worker`)
+RCA_QUEUE = {
+    # Process jobs inline when queued; handy for local development without a worker
+    'EAGER': os.environ.get('RCA_QUEUE_EAGER', 'False') == 'True',
+    'MAX_ATTEMPTS': 3,
+    'POLL_INTERVAL': 1.0,  # seconds
+    'STALE_AFTER': 300,  # seconds without a heartbeat before a RUNNING job is requeued
+    'BATCH_SIZE': 8,  # jobs analysed per batched Gemini call
+}
+
+# Chaos matrix jobs and load tests (run workers with `python manage.py job_worker`)
+JOB_WORKER = {
+    'POLL_INTERVAL': 1.0,  # seconds
+    'STALE_AFTER': 120,  # seconds without a heartbeat before a RUNNING job is marked FAILED
+}
+
+# Dashboard stat cards; cached briefly and dropped whenever counted rows change
+DASHBOARD_STATS = {
+    'TTL': 15,  # seconds
+    'CACHE_ALIAS': 'default',
+}
+
+# Cache of generated RCAs keyed by failure fingerprint
+RCA_CACHE = {
+    'ENABLED': os.environ.get('RCA_CACHE_ENABLED', 'True') == 'True',
+    'TTL': int(os.environ.get('RCA_CACHE_TTL', 3600)),  # seconds
+    'MAX_ENTRIES': int(os.environ.get('RCA_CACHE_MAX_ENTRIES', 1000)),
+    # Alias in CACHES to persist entries across restarts and workers, e.g. 'rca'
+    'BACKEND': os.environ.get('RCA_CACHE_BACKEND') or None,
+}
+
+# Compaction of request/response data written into RCA prompts
+RCA_CONTEXT = {
+    'TOKEN_BUDGET': int(os.environ.get('RCA_CONTEXT_TOKEN_BUDGET', 2000)),  # estimated tokens per failure
+}
+
+# Local rule-based RCA; confident matches skip the Gemini call
+RCA_RULES = {
+    'ENABLED': os.environ.get('RCA_RULES_ENABLED', 'True') == 'True',
+    'MIN_CONFIDENCE': float(os.environ.get('RCA_RULES_MIN_CONFIDENCE', 0.8)),
+    # Extra rules, in the format documented on playground.utils.rca_rules.RcaRules
+    'RULES': [],
+}
+
+# Similar-failure index behind "related RCAs"; needs NumPy
+SIMILARITY_INDEX = {
+    'ENABLED': os.environ.get('SIMILARITY_INDEX_ENABLED', 'True') == 'True',
+    # Snapshot and update log shared by all processes
+    'PATH': os.environ.get('SIMILARITY_INDEX_DIR', str(BASE_DIR / 'cache' / 'similarity')),
+    'DIMENSIONS': 2 ** 18,
+    'MAX_FEATURES': 64,  # features kept per RCA
+    'COMPACT_AFTER': 1000,  # log entries folded into a new snapshot
+}
+
+# Content-addressed, compressed storage of request/response bodies and headers
+BODY_STORE = {
+    'CODEC': os.environ.get('BODY_STORE_CODEC', 'zlib'),  # 'zstd' needs the zstandard package
+    'LEVEL': 6,
+    'MIN_COMPRESS_SIZE': 64,  # bytes; shorter texts are stored as-is
+}
+
+# Streaming capture of response bodies: only a head and tail are kept in memory
+RESPONSE_CAPTURE = {
+    'HEAD_BYTES': 64 * 1024,
+    'TAIL_BYTES': 16 * 1024,
+    'CHUNK_SIZE': 64 * 1024,
+    'MAX_READ_BYTES': 512 * 1024 * 1024,
+    # Directory for full copies of truncated bodies, named by SHA-256 (unset disables);
+    # a file is deleted with the last response that refers to it
+    'SPOOL_DIR': os.environ.get('RESPONSE_SPOOL_DIR') or None,
+}
+
+# Per-host percentiles of the recorded request phase timings
+RESPONSE_TIMING = {
+    'WINDOW_HOURS': 24,
+    'MAX_SAMPLES': 10000,  # most recent responses read per aggregate
+    'PERCENTILES': (50, 90, 99),
+}
+
+# Load tests started from the API response page or `manage.py run_load_test`
+LOAD_TEST = {
+    'MAX_DURATION': 300,     # seconds
+    'MAX_RPS': 500,
+    'MAX_CONCURRENCY': 100,
+    'WORKERS': 100,          # sender threads in RPS mode
+    'MAX_OUTSTANDING': 1000, # requests in flight or waiting in RPS mode before new ones are dropped
+    'TIMEOUT': 10,           # per-request timeout in seconds
+}
+
+# Latency histograms per endpoint, merged in as responses are stored
+ENDPOINT_LATENCY = {
+    'BUCKET_SECONDS': 300,  # width of a time bucket
+    'WINDOW_HOURS': 24,     # default window of the latency views
+    'PERCENTILES': (50, 90, 99),
+}
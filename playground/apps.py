@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PlaygroundConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'playground'
+
+    def ready(self):
+        # Connect signal receivers (rollup counters, dashboard stats invalidation, similarity index)
+        from . import receivers  # noqa: F401
@@ -1,5 +1,5 @@
 from django import forms
-from .models import ChaosTest, ChaosTestRun, RootCauseAnalysis
+from .models import ChaosTest, ChaosTestRun, LoadTestRun, RootCauseAnalysis
 
 class ApiRequestForm(forms.Form):
     """Form for creating and validating API requests"""
@@ -88,7 +88,63 @@ class RcaGenerateForm(forms.Form):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Update the queryset to show only runs without RCAs
-        existing_rcas = RootCauseAnalysis.objects.values_list('chaos_test_run', flat=True)
-        self.fields['chaos_test_run'].queryset = ChaosTestRun.objects.exclude(
+        # (API response RCAs have no run; a NULL would make NOT IN match nothing)
+        existing_rcas = RootCauseAnalysis.objects.filter(
+            chaos_test_run__isnull=False
+        ).values_list('chaos_test_run', flat=True)
+        # Option labels show the test name, so join it in
+        self.fields['chaos_test_run'].queryset = ChaosTestRun.objects.select_related('chaos_test').exclude(
             id__in=existing_rcas
-        ).order_by('-created_at')
\ No newline at end of file
+        ).order_by('-created_at')
+
+class LoadTestForm(forms.Form):
+    """Form for starting a load test of a saved API request"""
+    mode = forms.ChoiceField(
+        choices=LoadTestRun.MODE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        help_text="Open loop at a fixed rate, or a fixed number of workers sending back to back"
+    )
+    target_rps = forms.FloatField(
+        required=False,
+        min_value=0.1,
+        initial=10,
+        widget=forms.NumberInput(attrs={'class': 'form-control', 'step': 'any'}),
+        help_text="Requests started per second (RPS mode)"
+    )
+    concurrency = forms.IntegerField(
+        required=False,
+        min_value=1,
+        initial=5,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+        help_text="Concurrent workers (concurrency mode)"
+    )
+    duration_seconds = forms.IntegerField(
+        min_value=1,
+        initial=10,
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+        help_text="How long to generate load, in seconds"
+    )
+    
+    def clean(self):
+        """Require the setting of the chosen mode and keep it within the configured limits"""
+        from .utils.load_generator import LoadGenerator
+        
+        cleaned_data = super().clean()
+        mode = cleaned_data.get('mode')
+        if mode == 'RPS':
+            target_rps = cleaned_data.get('target_rps')
+            if not target_rps:
+                self.add_error('target_rps', "Target RPS is required in RPS mode")
+            elif target_rps > LoadGenerator.get_setting('MAX_RPS'):
+                self.add_error('target_rps', f"At most {LoadGenerator.get_setting('MAX_RPS')} requests per second")
+        elif mode == 'CONCURRENCY':
+            concurrency = cleaned_data.get('concurrency')
+            if not concurrency:
+                self.add_error('concurrency', "Concurrency is required in concurrency mode")
+            elif concurrency > LoadGenerator.get_setting('MAX_CONCURRENCY'):
+                self.add_error('concurrency', f"At most {LoadGenerator.get_setting('MAX_CONCURRENCY')} workers")
+        
+        duration = cleaned_data.get('duration_seconds')
+        if duration and duration > LoadGenerator.get_setting('MAX_DURATION'):
+            self.add_error('duration_seconds', f"At most {LoadGenerator.get_setting('MAX_DURATION')} seconds")
+        return cleaned_data
@@ -0,0 +1,138 @@
+import json
+import statistics
+import time
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from playground.utils.rca_engine import RcaEngine
+
+# Gemini answers that ignored the requested JSON format, used when no corpus is given
+SAMPLE_RESPONSES = [
+    """## Executive Summary:
+The request to the orders endpoint failed with a 422 status because the payload was rejected by validation.
+
+## Root Cause:
+The request body is missing the required field "customer_id", so the server-side validation rejects the order before it reaches the database.
+
+## Detailed Analysis:
+The API responded with 422 Unprocessable Entity and an error message stating that "customer_id" is required. Comparing the original and modified requests shows the chaos test removed this field from the JSON payload. The server validates input before processing, which is why the response time (38 ms) is low and no database query was executed.
+
+The error body follows the standard validation error format, listing each invalid field together with a message.
+
+## Potential Solutions:
+1. Ensure all required fields are included in the request payload before sending it.
+2. Add client-side schema validation based on the API documentation.
+3. Surface validation errors to the caller instead of retrying the request.
+
+## Affected Components:
+Order Service, Request Validation and API Client
+""",
+    """Analysis of the failure
+
+The root cause is an expired bearer token sent in the Authorization header. The API rejected the request with 401 Unauthorized and a "token_expired" error code.
+
+Detailed Analysis: The response headers contain WWW-Authenticate: Bearer error="invalid_token", which indicates the credentials were syntactically valid but no longer accepted. The request was otherwise well formed; the access denied response was returned in 12 ms, before the request affected the upstream billing service.
+
+### Recommendations:
+- Refresh the access token before it expires and retry once on 401.
+- Check the clock skew between the client and the authorization server.
+- Store token expiry alongside the token so stale credentials are never sent.
+""",
+    """```json
+{
+  "root_cause": "Upstream timeout",
+  "detailed_analysis": "The gateway waited 30 seconds for the inventory service
+```
+
+ROOT CAUSE: The inventory service did not answer within the gateway timeout, so the gateway returned 504 Gateway Timeout.
+
+DETAILED ANALYSIS: The response time of 30012 ms matches the configured gateway timeout of 30 seconds. The body is the gateway's default HTML error page rather than a JSON error, which shows the request never reached the application code. Slow database queries or connection pool exhaustion in the inventory service are the most likely reasons for the latency.
+
+
+SOLUTION: To resolve this, add an index to the inventory lookup query. Also return partial results when the inventory service is slow. Finally, retry with exponential backoff for idempotent requests.
+
+The timeout impacted the inventory lookup service and the checkout flow.
+""",
+    """## Table of Contents:
+1. Root Cause
+2. Analysis
+3. Solutions
+
+## INSTRUCTIONS: The analysis below follows the requested structure.
+
+## Root Cause:
+The payload sent to /v1/profiles is malformed JSON: a trailing comma after the last property makes the parser fail.
+
+## Analysis:
+The server answered 400 Bad Request with "Unexpected token } in JSON at position 212". The chaos test corrupted the request body, and the API correctly refused to process it. No record was created.
+
+## Solutions:
+* Serialize request bodies with a JSON library instead of string concatenation.
+* Validate the payload format before sending it.
+* Log the raw request body when a 400 response is received.
+""",
+]
+
+
+class Command(BaseCommand):
+    help = "Time the text fallback parsing of Gemini responses (RcaEngine._extract_structured_data_from_text)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corpus',
+            help="JSON file with a list of response texts, or a directory of .txt/.md files "
+                 "(default: built-in sample responses)"
+        )
+        parser.add_argument('--iterations', type=int, default=200, help="Parses per response (default 200)")
+        parser.add_argument(
+            '--scale', type=int, nargs='+', default=[1, 4, 16],
+            help="Repeat each response's body this many times to show how cost grows with length (default 1 4 16)"
+        )
+
+    def handle(self, *args, **options):
+        corpus = self._load_corpus(options['corpus'])
+        if not corpus:
+            raise CommandError("The corpus is empty")
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1")
+
+        context = {'source_type': 'api_response', 'response': {'status_code': 500}}
+        self.stdout.write(f"{len(corpus)} response(s), {options['iterations']} parse(s) each")
+        for scale in options['scale']:
+            texts = [self._scaled(text, scale) for text in corpus]
+            timings = []
+            for text in texts:
+                RcaEngine._extract_structured_data_from_text(text, context)  # warm up
+                start = time.perf_counter()
+                for _ in range(options['iterations']):
+                    RcaEngine._extract_structured_data_from_text(text, context)
+                timings.append((time.perf_counter() - start) / options['iterations'] * 1000)
+            chars = statistics.mean(len(text) for text in texts)
+            self.stdout.write(
+                f"x{scale}: {chars:.0f} chars on average, "
+                f"mean {statistics.mean(timings):.3f} ms, max {max(timings):.3f} ms per response"
+            )
+
+    @staticmethod
+    def _scaled(text, scale):
+        """Make a response longer by repeating everything after its first paragraph"""
+        head, _, body = text.partition('\n\n')
+        return head + '\n\n' + '\n\n'.join([body] * scale) if body else text * scale
+
+    @staticmethod
+    def _load_corpus(path):
+        if not path:
+            return SAMPLE_RESPONSES
+        path = Path(path)
+        if path.is_dir():
+            return [
+                file.read_text(encoding='utf-8')
+                for file in sorted(path.iterdir())
+                if file.suffix in ('.txt', '.md')
+            ]
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read corpus {path}: {e}")
+        if not isinstance(data, list) or not all(isinstance(item, str) for item in data):
+            raise CommandError("A corpus file must contain a JSON list of response texts")
+        return data
@@ -0,0 +1,13 @@
+from playground.management.worker_command import WorkerCommand
+from playground.utils.job_worker import JobWorker
+
+
+class Command(WorkerCommand):
+    help = "Run background workers that execute pending chaos matrix jobs and load tests"
+
+    run_worker = JobWorker.run_worker
+    worker_label = "job worker"
+    process_name = 'job-worker'
+    once_help = "Run the jobs currently pending and exit (single process)"
+    processes_help = "Number of worker processes, i.e. jobs run at once (default 1)"
+    done_message = "Ran {count} job(s)"
@@ -0,0 +1,12 @@
+from playground.management.worker_command import WorkerCommand
+from playground.utils.rca_queue import RcaQueue
+
+
+class Command(WorkerCommand):
+    help = "Run background workers that generate queued Root Cause Analyses"
+
+    run_worker = RcaQueue.run_worker
+    worker_label = "RCA worker"
+    process_name = 'rca-worker'
+    once_help = "Process the jobs currently queued and exit (single process)"
+    done_message = "Processed {count} RCA job(s)"
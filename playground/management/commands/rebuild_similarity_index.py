@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from playground.models import RootCauseAnalysis
+from playground.utils.similarity_index import SimilarityIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the similar-failure index from all root cause analyses, re-weighting every vector"
+
+    def handle(self, *args, **options):
+        if not SimilarityIndex.available():
+            raise CommandError("The similarity index is disabled or NumPy is not installed")
+
+        start = time.perf_counter()
+        rcas = RootCauseAnalysis.objects.select_related(
+            'chaos_test_run__chaos_test',
+            'chaos_test_run__modified_request',
+            'chaos_test_run__failed_response',
+            'api_response__request',
+        ).only(
+            'id', 'root_cause', 'detailed_analysis', 'failure_category', 'tags',
+            'chaos_test_run__chaos_test__fault_type',
+            'chaos_test_run__modified_request__url', 'chaos_test_run__modified_request__method',
+            'chaos_test_run__failed_response__status_code',
+            'api_response__status_code', 'api_response__request__url', 'api_response__request__method',
+        )
+        count = SimilarityIndex.rebuild(rcas.iterator(chunk_size=2000))
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} root cause analyses in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from playground.utils.dashboard_stats import DashboardStats
+from playground.utils.endpoint_latency import EndpointLatency
+from playground.utils.metric_rollup import MetricRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard rollup counters and endpoint latency histograms from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report counters and histograms that drifted from the source tables; change nothing"
+        )
+
+    def handle(self, *args, **options):
+        drift = MetricRollup.drift()
+        for (name, bucket), (stored, actual) in sorted(drift.items(), key=lambda item: (item[0][0], str(item[0][1]))):
+            label = f"{name}@{bucket.isoformat()}" if bucket else name
+            self.stdout.write(f"{label}: stored {stored}, actual {actual}")
+
+        latency_drift = EndpointLatency.drift()
+        for (method, endpoint, bucket), (stored, actual) in sorted(latency_drift.items()):
+            self.stdout.write(f"latency {method} {endpoint}@{bucket.isoformat()}: stored {stored}, actual {actual}")
+
+        if options['check']:
+            if drift or latency_drift:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(drift)} counter(s) and {len(latency_drift)} latency histogram(s) drifted"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS("All counters and latency histograms match the source tables"))
+            return
+
+        values = MetricRollup.rebuild()
+        DashboardStats.invalidate()
+        histograms = EndpointLatency.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(values)} counter(s), {len(drift)} had drifted; "
+            f"rebuilt {histograms} latency histogram(s), {len(latency_drift)} had drifted"
+        ))
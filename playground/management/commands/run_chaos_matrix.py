@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from playground.models import ApiRequest, ChaosTest, ChaosMatrixJob
+from playground.utils.chaos_injector import ChaosInjector
+
+
+class Command(BaseCommand):
+    help = "Apply every chaos test to the most recent API requests as one chaos matrix job"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help="Number of most recent API requests to include (default 200)"
+        )
+        parser.add_argument(
+            '--fault-types', nargs='*', default=None,
+            help="Only include chaos tests with these fault types (default: all)"
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Number of requests in flight at once"
+        )
+
+    def handle(self, *args, **options):
+        # Requests generated by earlier chaos runs are not used as matrix inputs
+        api_requests = ApiRequest.objects.exclude(
+            description__startswith='Chaos '
+        ).order_by('-created_at')[:options['requests']]
+        chaos_tests = ChaosTest.objects.all()
+        if options['fault_types']:
+            chaos_tests = chaos_tests.filter(fault_type__in=options['fault_types'])
+
+        if not api_requests or not chaos_tests:
+            raise CommandError("Need at least one API request and one chaos test")
+
+        job = ChaosMatrixJob.objects.create()
+        job.api_requests.set(api_requests)
+        job.chaos_tests.set(chaos_tests)
+
+        self.stdout.write(f"Running chaos matrix {job.id}: {len(api_requests)} requests x {chaos_tests.count()} tests")
+        if not ChaosInjector.run_matrix(job, max_workers=options['workers']):
+            raise CommandError(f"Chaos matrix {job.id} failed: {job.error}")
+
+        summary = job.summary
+        self.stdout.write(self.style.SUCCESS(
+            f"Completed {job.completed_cases} cases ({summary['unique_requests']} requests sent, "
+            f"{summary['deduplicated_cells']} deduplicated). Status codes: {summary['status_counts']}"
+        ))
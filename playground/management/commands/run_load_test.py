@@ -0,0 +1,46 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from playground.forms import LoadTestForm
+from playground.models import ApiRequest, LoadTestRun
+from playground.utils.load_generator import LoadGenerator
+
+
+class Command(BaseCommand):
+    help = "Replay a saved API request under load and print latency percentiles, errors and throughput"
+
+    def add_arguments(self, parser):
+        parser.add_argument('request_id', help="ID of the saved API request to replay")
+        load = parser.add_mutually_exclusive_group(required=True)
+        load.add_argument('--rps', type=float, help="Requests started per second (open loop)")
+        load.add_argument('--concurrency', type=int, help="Number of workers sending back to back (closed loop)")
+        parser.add_argument('--duration', type=int, default=10, help="Seconds to generate load (default 10)")
+
+    def handle(self, *args, **options):
+        try:
+            api_request = ApiRequest.objects.get(id=options['request_id'])
+        except (ApiRequest.DoesNotExist, ValidationError):
+            raise CommandError(f"API request {options['request_id']} not found")
+
+        form = LoadTestForm({
+            'mode': 'RPS' if options['rps'] else 'CONCURRENCY',
+            'target_rps': options['rps'],
+            'concurrency': options['concurrency'],
+            'duration_seconds': options['duration'],
+        })
+        if not form.is_valid():
+            raise CommandError(' '.join(error for errors in form.errors.values() for error in errors))
+
+        run = LoadTestRun.objects.create(api_request=api_request, **form.cleaned_data)
+        self.stdout.write(f"Running load test {run.id} against {api_request.method} {api_request.url}")
+        if not LoadGenerator.run(run):
+            raise CommandError(f"Load test {run.id} failed: {run.error}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{run.total_requests} requests, {run.throughput_rps} req/s, {run.get_error_rate()}% errors"
+            f"{f', {run.dropped_requests} dropped' if run.dropped_requests else ''}. "
+            f"Latency p50 {run.p50_ms} ms, p90 {run.p90_ms} ms, p99 {run.p99_ms} ms, max {run.max_ms} ms. "
+            f"Status codes: {run.status_counts}"
+        ))
+        first_throttled = run.get_first_throttled_second()
+        if first_throttled is not None:
+            self.stdout.write(f"First 429 response after {first_throttled}s")
@@ -0,0 +1,73 @@
+import signal
+import multiprocessing
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _worker_main(run_worker, name, stop_event):
+    """Entry point of a forked worker process"""
+    # Children must open their own database connections
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_worker(worker_id=name, stop_event=stop_event)
+
+
+class WorkerCommand(BaseCommand):
+    """
+    Base for commands that run a database-backed worker loop in one or more processes.
+
+    Subclasses set ``run_worker`` to the loop, a callable taking ``worker_id``,
+    ``stop_event`` and ``exit_when_empty`` and returning the number of jobs
+    processed, plus the labels below.
+    """
+
+    run_worker = None
+    worker_label = "worker"          # e.g. "RCA worker", used in messages
+    process_name = 'worker'          # multiprocessing process name
+    once_help = "Process the jobs currently pending and exit (single process)"
+    processes_help = "Number of worker processes (default 1)"
+    done_message = "Processed {count} job(s)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help=self.processes_help)
+        parser.add_argument('--once', action='store_true', help=self.once_help)
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = self.run_worker(exit_when_empty=True)
+            self.stdout.write(self.style.SUCCESS(self.done_message.format(count=processed)))
+            return
+
+        if options['processes'] <= 1:
+            self.stdout.write(f"Starting {self.worker_label} (Ctrl+C to stop)")
+            try:
+                self.run_worker()
+            except KeyboardInterrupt:
+                pass
+            return
+
+        stop_event = multiprocessing.Event()
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(self.run_worker, f"{self.process_name}-{index}", stop_event),
+                name=self.process_name
+            )
+            for index in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} {self.worker_label} processes (Ctrl+C to stop)")
+
+        def shutdown(signum, frame):
+            stop_event.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop_event.set()
+            for worker in workers:
+                worker.join()
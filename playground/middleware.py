@@ -0,0 +1,78 @@
+import re
+import logging
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from .utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitPolicy:
+    """A rate limit applied to requests whose path (and method) match"""
+
+    def __init__(self, name, path, methods=None, limit=None, window=None, algorithm=None):
+        self.name = name
+        self.pattern = re.compile(path)
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.limiter = RateLimiter(limit=limit, window=window, algorithm=algorithm, scope=name)
+
+    @classmethod
+    def from_setting(cls, config):
+        """Build a policy from one entry of ``settings.RATE_LIMIT['POLICIES']``"""
+        return cls(
+            name=config.get('NAME') or config['PATH'],
+            path=config['PATH'],
+            methods=config.get('METHODS'),
+            limit=config.get('MAX_REQUESTS'),
+            window=config.get('TIME_WINDOW'),
+            algorithm=config.get('ALGORITHM'),
+        )
+
+    def matches(self, request):
+        if self.methods is not None and request.method not in self.methods:
+            return False
+        return self.pattern.match(request.path_info) is not None
+
+
+class RateLimitMiddleware:
+    """
+    Rate limits requests per client IP before any view code runs.
+
+    Policies come from ``settings.RATE_LIMIT['POLICIES']``; the first policy
+    matching the request path applies and each policy keeps its own counters,
+    so every request is counted exactly once. Requests matching no policy are
+    not limited. Throttled requests get a 429 without reaching the URL
+    resolver, DRF, serializers or the ORM; allowed ones get RateLimit-*
+    headers on their response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not RateLimiter.get_setting('ENABLED'):
+            raise MiddlewareNotUsed("Rate limiting is disabled")
+        self.policies = [RateLimitPolicy.from_setting(config) for config in RateLimiter.get_setting('POLICIES')]
+        if not self.policies:
+            raise MiddlewareNotUsed("No rate limit policies configured")
+
+    def __call__(self, request):
+        policy = next((policy for policy in self.policies if policy.matches(request)), None)
+        if policy is None:
+            return self.get_response(request)
+
+        # Get client IP (or a default value if not available)
+        client_ip = request.META.get('REMOTE_ADDR', '0.0.0.0')
+        result = policy.limiter.check(client_ip)
+        headers = RateLimiter.headers(result)
+
+        if not result.allowed:
+            logger.info(f"Rate limited {client_ip} on {request.path_info} (policy {policy.name})")
+            return JsonResponse(
+                {"error": "Too many requests. Please try again later."},
+                status=429,
+                headers=headers,
+            )
+
+        response = self.get_response(request)
+        for name, value in headers.items():
+            response[name] = value
+        return response
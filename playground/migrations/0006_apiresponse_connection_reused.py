@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0005_rootcauseanalysis_api_response_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiresponse',
+            name='connection_reused',
+            field=models.BooleanField(blank=True, help_text='Whether the request reused a kept-alive connection (null if unknown)', null=True),
+        ),
+    ]
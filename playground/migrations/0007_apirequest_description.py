@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0006_apiresponse_connection_reused'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apirequest',
+            name='description',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:31
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0007_apirequest_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChaosMatrixJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('total_cases', models.IntegerField(default=0)),
+                ('completed_cases', models.IntegerField(default=0)),
+                ('summary', models.JSONField(blank=True, default=dict, help_text='Grid of status codes and latencies per request and chaos test')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('api_requests', models.ManyToManyField(related_name='chaos_matrix_jobs', to='playground.apirequest')),
+                ('chaos_tests', models.ManyToManyField(related_name='chaos_matrix_jobs', to='playground.chaostest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
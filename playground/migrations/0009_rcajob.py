@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0008_chaosmatrixjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RcaJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10)),
+                ('priority', models.IntegerField(default=0, help_text='Higher priority jobs are claimed first')),
+                ('dedupe_key', models.CharField(help_text='Identifies the failure this job analyses', max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('worker_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('api_response', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rca_jobs', to='playground.apiresponse')),
+                ('chaos_test_run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rca_jobs', to='playground.chaostestrun')),
+                ('rca', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='playground.rootcauseanalysis')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', '-priority', 'created_at'], name='playground__status_941cd2_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'RUNNING'])), fields=('dedupe_key',), name='unique_active_rca_job')],
+            },
+        ),
+    ]
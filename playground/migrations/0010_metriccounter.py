@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:47
+
+import uuid
+from datetime import timezone as dt_timezone
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncHour
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Seed the counters from the rows that already exist
+
+    A frozen copy of MetricRollup.compute as of this migration, so later
+    changes to the metrics don't alter what it does.
+    """
+    ApiRequest = apps.get_model('playground', 'ApiRequest')
+    ApiResponse = apps.get_model('playground', 'ApiResponse')
+    ChaosTestRun = apps.get_model('playground', 'ChaosTestRun')
+    RootCauseAnalysis = apps.get_model('playground', 'RootCauseAnalysis')
+    MetricCounter = apps.get_model('playground', 'MetricCounter')
+
+    values = {('api_requests.total', None): ApiRequest.objects.count()}
+
+    responses = ApiResponse.objects.order_by().aggregate(
+        total=Count('id'),
+        successful=Count('id', filter=Q(status_code__gte=200, status_code__lt=400)),
+    )
+    values[('api_responses.total', None)] = responses['total']
+    values[('api_responses.successful', None)] = responses['successful']
+
+    values[('chaos_runs.total', None)] = 0
+    hourly = (
+        ChaosTestRun.objects.order_by().annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('hour').annotate(count=Count('id'))
+    )
+    for row in hourly:
+        values[('chaos_runs.hourly', row['hour'])] = row['count']
+        values[('chaos_runs.total', None)] += row['count']
+
+    values[('rcas.total', None)] = 0
+    for row in RootCauseAnalysis.objects.order_by().values('confidence').annotate(count=Count('id')):
+        values[(f"rcas.confidence.{row['confidence']}", None)] = row['count']
+        values[('rcas.total', None)] += row['count']
+
+    MetricCounter.objects.all().delete()
+    MetricCounter.objects.bulk_create([
+        MetricCounter(name=name, bucket=bucket, value=value)
+        for (name, bucket), value in values.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0009_rcajob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricCounter',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text="Metric name, e.g. 'api_responses.total'", max_length=64)),
+                ('bucket', models.DateTimeField(blank=True, help_text='Start of the hour counted, or null for an all-time total', null=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('name', 'bucket'), name='unique_metric_counter_bucket'), models.UniqueConstraint(condition=models.Q(('bucket__isnull', True)), fields=('name',), name='unique_metric_counter_total')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
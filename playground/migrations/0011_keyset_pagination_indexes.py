@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0010_metriccounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apirequest',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_2f92ad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='apiresponse',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_16c5d6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chaostestrun',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_47b227_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_fb7b49_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rootcauseanalysis',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_b19301_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todoitem',
+            index=models.Index(fields=['-created_at', '-id'], name='playground__created_151a86_idx'),
+        ),
+    ]
@@ -0,0 +1,165 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:55
+
+import zlib
+import hashlib
+from collections import Counter
+import django.db.models.deletion
+from django.db import migrations, models
+
+try:
+    import zstandard
+except ImportError:  # only needed to restore zstd blobs written after this migration
+    zstandard = None
+
+# (model, text field, blob foreign key) moved to the body store
+STORED_TEXTS = (
+    ('ApiRequest', 'headers', 'headers_blob'),
+    ('ApiRequest', 'body', 'body_blob'),
+    ('ApiResponse', 'response_headers', 'response_headers_blob'),
+    ('ApiResponse', 'response_body', 'response_body_blob'),
+)
+CHUNK_SIZE = 500
+
+# Frozen copy of BodyStore's encoding as of this migration (zlib, level 6,
+# short texts raw), so later changes to BodyStore don't alter what it does
+MIN_COMPRESS_SIZE = 64
+ZLIB_LEVEL = 6
+
+
+def encode(text):
+    """(digest, codec, data, size) for a text"""
+    raw = text.encode('utf-8')
+    codec, data = 'raw', raw
+    if len(raw) >= MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(raw, ZLIB_LEVEL)
+        if len(compressed) < len(raw):
+            codec, data = 'zlib', compressed
+    return hashlib.sha256(raw).hexdigest(), codec, data, len(raw)
+
+
+def decode(blob):
+    """Text stored in a BodyBlob"""
+    data = bytes(blob.data)
+    if blob.codec == 'zlib':
+        data = zlib.decompress(data)
+    elif blob.codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"Body {blob.digest} is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data, max_output_size=blob.size)
+    return data.decode('utf-8')
+
+
+def move_texts_to_store(apps, schema_editor):
+    """Copy existing bodies and headers into BodyBlob and point the rows at them"""
+    BodyBlob = apps.get_model('playground', 'BodyBlob')
+    known = set(BodyBlob.objects.values_list('digest', flat=True))
+    refcounts = Counter()
+
+    for model_name in ('ApiRequest', 'ApiResponse'):
+        model = apps.get_model('playground', model_name)
+        fields = [(text_field, blob_field) for name, text_field, blob_field in STORED_TEXTS if name == model_name]
+        rows, new_blobs = [], []
+
+        def flush():
+            BodyBlob.objects.bulk_create(new_blobs)
+            model.objects.bulk_update(rows, [blob_field for _, blob_field in fields])
+            rows.clear()
+            new_blobs.clear()
+
+        for row in model.objects.only('pk', *(text_field for text_field, _ in fields)).iterator(chunk_size=CHUNK_SIZE):
+            for text_field, blob_field in fields:
+                text = getattr(row, text_field)
+                if text is None:
+                    continue
+                digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+                if digest not in known:
+                    digest, codec, data, size = encode(text)
+                    new_blobs.append(BodyBlob(digest=digest, codec=codec, data=data, size=size))
+                    known.add(digest)
+                setattr(row, f'{blob_field}_id', digest)
+                refcounts[digest] += 1
+            rows.append(row)
+            if len(rows) >= CHUNK_SIZE:
+                flush()
+        flush()
+
+    blobs = []
+    for blob in BodyBlob.objects.only('digest', 'refcount').iterator(chunk_size=CHUNK_SIZE):
+        blob.refcount = refcounts.get(blob.digest, 0)
+        blobs.append(blob)
+    BodyBlob.objects.bulk_update(blobs, ['refcount'], batch_size=CHUNK_SIZE)
+
+
+def restore_texts_from_store(apps, schema_editor):
+    """Write blob contents back into the text columns"""
+    for model_name in ('ApiRequest', 'ApiResponse'):
+        model = apps.get_model('playground', model_name)
+        fields = [(text_field, blob_field) for name, text_field, blob_field in STORED_TEXTS if name == model_name]
+        rows = []
+        for row in model.objects.select_related(*(blob_field for _, blob_field in fields)).iterator(chunk_size=CHUNK_SIZE):
+            for text_field, blob_field in fields:
+                blob = getattr(row, blob_field)
+                setattr(row, text_field, decode(blob) if blob is not None else None)
+            rows.append(row)
+            if len(rows) >= CHUNK_SIZE:
+                model.objects.bulk_update(rows, [text_field for text_field, _ in fields])
+                rows.clear()
+        model.objects.bulk_update(rows, [text_field for text_field, _ in fields])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0011_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BodyBlob',
+            fields=[
+                ('digest', models.CharField(help_text='SHA-256 hex digest of the uncompressed UTF-8 text', max_length=64, primary_key=True, serialize=False)),
+                ('codec', models.CharField(help_text='Compression used for data: raw, zlib or zstd', max_length=10)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField(help_text='Uncompressed size in bytes')),
+                ('refcount', models.IntegerField(default=0, help_text='Number of rows referencing this blob')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='apirequest',
+            name='body_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='playground.bodyblob'),
+        ),
+        migrations.AddField(
+            model_name='apirequest',
+            name='headers_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='playground.bodyblob'),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='response_body_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='playground.bodyblob'),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='response_headers_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='playground.bodyblob'),
+        ),
+        migrations.RunPython(move_texts_to_store, restore_texts_from_store),
+        migrations.RemoveField(
+            model_name='apirequest',
+            name='body',
+        ),
+        migrations.RemoveField(
+            model_name='apirequest',
+            name='headers',
+        ),
+        migrations.RemoveField(
+            model_name='apiresponse',
+            name='response_body',
+        ),
+        migrations.RemoveField(
+            model_name='apiresponse',
+            name='response_headers',
+        ),
+    ]
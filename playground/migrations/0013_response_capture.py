@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0012_body_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiresponse',
+            name='body_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 of the full response body as received', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='body_size',
+            field=models.BigIntegerField(blank=True, help_text='Bytes of response body received (null if no body was read)', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='body_truncated',
+            field=models.BooleanField(default=False, help_text='Whether response_body holds only the head and tail of a larger body'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0013_response_capture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiresponse',
+            name='connect_ms',
+            field=models.FloatField(blank=True, help_text='TCP connect (0 on a reused connection)', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='dns_ms',
+            field=models.FloatField(blank=True, help_text='DNS lookup (0 on a reused connection)', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='download_ms',
+            field=models.FloatField(blank=True, help_text='Reading the response body', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='host',
+            field=models.CharField(blank=True, default='', help_text='Scheme, host and port the request was sent to', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='persist_ms',
+            field=models.FloatField(blank=True, help_text='Saving the response record', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='tls_ms',
+            field=models.FloatField(blank=True, help_text='TLS handshake (0 on a reused or plain HTTP connection)', null=True),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='ttfb_ms',
+            field=models.FloatField(blank=True, help_text='From sending the request to receiving the response headers', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='apiresponse',
+            index=models.Index(fields=['host', '-created_at'], name='playground__host_8885d1_idx'),
+        ),
+    ]
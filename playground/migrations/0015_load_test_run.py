@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:04
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0014_response_phase_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadTestRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mode', models.CharField(choices=[('RPS', 'Target requests per second'), ('CONCURRENCY', 'Concurrent workers')], default='RPS', max_length=12)),
+                ('target_rps', models.FloatField(blank=True, help_text='Requests started per second (RPS mode)', null=True)),
+                ('concurrency', models.IntegerField(blank=True, help_text='Workers sending back to back (CONCURRENCY mode)', null=True)),
+                ('duration_seconds', models.IntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('total_requests', models.IntegerField(default=0)),
+                ('error_requests', models.IntegerField(default=0, help_text='Responses with status 400 or above, including connection failures')),
+                ('dropped_requests', models.IntegerField(default=0, help_text='Scheduled requests not sent because too many were already outstanding (RPS mode)')),
+                ('throughput_rps', models.FloatField(blank=True, help_text='Completed requests per second', null=True)),
+                ('p50_ms', models.FloatField(blank=True, null=True)),
+                ('p90_ms', models.FloatField(blank=True, null=True)),
+                ('p99_ms', models.FloatField(blank=True, null=True)),
+                ('max_ms', models.FloatField(blank=True, null=True)),
+                ('status_counts', models.JSONField(blank=True, default=dict, help_text='Number of responses per status code')),
+                ('latency_histogram', models.JSONField(blank=True, default=dict, help_text='LatencyHistogram of all latencies')),
+                ('timeline', models.JSONField(blank=True, default=list, help_text='Per-second completed, error and 429 counts with p99 latency')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('api_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='load_tests', to='playground.apirequest')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
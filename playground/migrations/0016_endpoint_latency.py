@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+import re
+import math
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of EndpointLatency's URL normalization and LatencyHistogram's
+# bucketing as of this migration, so later changes to either don't alter
+# what it does
+ID_SEGMENT = re.compile(
+    r'^(\d+|[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}|[0-9a-f]{16,}|[A-Za-z0-9_-]{32,})$',
+    re.IGNORECASE,
+)
+MIN_MS = 0.01
+MAX_MS = 3600 * 1000
+GROWTH = 1.02
+MAX_INDEX = math.ceil(math.log(MAX_MS / MIN_MS) / math.log(GROWTH))
+
+
+def normalize_url(url):
+    """Scheme, host and path of a URL with ID segments replaced by {id}"""
+    parts = urlsplit(url or '')
+    segments = ['{id}' if ID_SEGMENT.match(segment) else segment for segment in parts.path.split('/')]
+    return f"{parts.scheme}://{parts.netloc.lower()}{'/'.join(segments) or '/'}"[:500]
+
+
+def bucket_index(value):
+    """Histogram bucket holding a latency in ms"""
+    if value <= MIN_MS:
+        return 0
+    return min(math.ceil(math.log(value / MIN_MS) / math.log(GROWTH)), MAX_INDEX)
+
+
+def backfill_histograms(apps, schema_editor):
+    """Build the histograms of the responses that already exist"""
+    ApiResponse = apps.get_model('playground', 'ApiResponse')
+    EndpointLatencyBucket = apps.get_model('playground', 'EndpointLatencyBucket')
+    # The bucket width is configuration, so the live recorder's value is used
+    seconds = getattr(settings, 'ENDPOINT_LATENCY', {}).get('BUCKET_SECONDS', 300)
+
+    histograms = {}
+    rows = ApiResponse.objects.order_by().values_list('request__method', 'request__url', 'created_at', 'response_time_ms')
+    for method, url, created_at, response_time_ms in rows.iterator(chunk_size=2000):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=dt_timezone.utc)
+        epoch = int(created_at.timestamp())
+        bucket = datetime.fromtimestamp(epoch - epoch % seconds, tz=dt_timezone.utc)
+        key = ((method or 'GET').upper(), normalize_url(url), bucket)
+        histogram = histograms.setdefault(key, {'buckets': {}, 'count': 0, 'total': 0.0, 'min': None, 'max': None})
+        index = bucket_index(response_time_ms)
+        histogram['buckets'][index] = histogram['buckets'].get(index, 0) + 1
+        histogram['count'] += 1
+        histogram['total'] += response_time_ms
+        histogram['min'] = response_time_ms if histogram['min'] is None else min(histogram['min'], response_time_ms)
+        histogram['max'] = response_time_ms if histogram['max'] is None else max(histogram['max'], response_time_ms)
+
+    EndpointLatencyBucket.objects.bulk_create([
+        EndpointLatencyBucket(
+            method=method, endpoint=endpoint, bucket=bucket, count=histogram['count'],
+            histogram={**histogram, 'buckets': {str(index): count for index, count in sorted(histogram['buckets'].items())}},
+        )
+        for (method, endpoint, bucket), histogram in histograms.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0015_load_test_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointLatencyBucket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('method', models.CharField(max_length=10)),
+                ('endpoint', models.CharField(help_text='URL without query string, with ID segments replaced by {id}', max_length=500)),
+                ('bucket', models.DateTimeField(help_text='Start of the time bucket (UTC)')),
+                ('count', models.BigIntegerField(default=0)),
+                ('histogram', models.JSONField(default=dict, help_text='LatencyHistogram of response_time_ms')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['endpoint', 'method', 'bucket'],
+                'indexes': [models.Index(fields=['bucket'], name='playground__bucket_f8ecf6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('method', 'endpoint', 'bucket'), name='unique_endpoint_latency_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,186 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:19
+
+import json
+import zlib
+from urllib.parse import urlsplit, parse_qsl
+from django.db import migrations, models
+
+try:
+    import zstandard
+except ImportError:  # only needed for zstd-compressed blobs
+    zstandard = None
+
+CHUNK_SIZE = 500
+
+# Frozen copy of RequestDiff.compute (and BodyStore.decode) as of this
+# migration, so later changes to the diff format don't alter what it stores
+MAX_CHANGES = 100
+MAX_VALUE_CHARS = 200
+SECRET_HEADERS = ('authorization', 'proxy-authorization', 'cookie', 'set-cookie', 'x-api-key', 'api-key', 'x-auth-token')
+
+
+def decode(blob):
+    """Text stored in a BodyBlob, or None"""
+    if blob is None:
+        return None
+    data = bytes(blob.data)
+    if blob.codec == 'zlib':
+        data = zlib.decompress(data)
+    elif blob.codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"Body {blob.digest} is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data, max_output_size=blob.size)
+    return data.decode('utf-8')
+
+
+def parse(value):
+    """JSON text as the decoded object; other text unchanged, empty values as None"""
+    if isinstance(value, str):
+        if not value.strip():
+            return None
+        if value.lstrip()[:1] in ('{', '['):
+            try:
+                return json.loads(value)
+            except ValueError:
+                pass
+    elif value in ({}, []):
+        return None
+    return value
+
+
+def request_parts(request):
+    url = urlsplit(request.url or '')
+    query = {}
+    for name, value in parse_qsl(url.query, keep_blank_values=True):
+        query.setdefault(name, []).append(value)
+
+    headers = parse(decode(request.headers_blob))
+    if isinstance(headers, dict):
+        headers = {str(name).lower(): (name, value) for name, value in headers.items()}
+    else:
+        headers = {}
+
+    return {
+        'method': (request.method or 'GET').upper(),
+        'url': {'scheme': url.scheme, 'host': url.netloc.lower(), 'path': url.path, 'fragment': url.fragment},
+        'query': {name: (name, values[0] if len(values) == 1 else values) for name, values in query.items()},
+        'headers': headers,
+        'body': parse(decode(request.body_blob)),
+    }
+
+
+def mask(value):
+    if value is None:
+        return None
+    value = str(value)
+    scheme, _, secret = value.partition(' ')
+    if secret and scheme.isalpha():
+        return f"{scheme} <redacted, {len(secret)} chars>"
+    return f"<redacted, {len(value)} chars>"
+
+
+def cut(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    if len(text) <= MAX_VALUE_CHARS:
+        return value
+    return f"{text[:MAX_VALUE_CHARS]}... [{len(text) - MAX_VALUE_CHARS} more chars]"
+
+
+def change(section, op, path, before, after):
+    if section == 'header' and path.lower() in SECRET_HEADERS:
+        before, after = mask(before), mask(after)
+    return {'section': section, 'op': op, 'path': path, 'before': cut(before), 'after': cut(after)}
+
+
+def diff_mapping(changes, section, before, after):
+    for key, (name, value) in before.items():
+        if key not in after:
+            changes.append(change(section, 'removed', name, value, None))
+        elif after[key][1] != value:
+            changes.append(change(section, 'changed', after[key][0], value, after[key][1]))
+    for key, (name, value) in after.items():
+        if key not in before:
+            changes.append(change(section, 'added', name, None, value))
+
+
+def diff_value(changes, before, after, path):
+    if isinstance(before, dict) and isinstance(after, dict):
+        for key, value in before.items():
+            key_path = f"{path}.{key}" if path else str(key)
+            if key not in after:
+                changes.append(change('body', 'removed', key_path, value, None))
+            elif after[key] != value:
+                diff_value(changes, value, after[key], key_path)
+        for key, value in after.items():
+            if key not in before:
+                changes.append(change('body', 'added', f"{path}.{key}" if path else str(key), None, value))
+    elif isinstance(before, list) and isinstance(after, list):
+        for index in range(max(len(before), len(after))):
+            item_path = f"{path}[{index}]"
+            if index >= len(after):
+                changes.append(change('body', 'removed', item_path, before[index], None))
+            elif index >= len(before):
+                changes.append(change('body', 'added', item_path, None, after[index]))
+            elif before[index] != after[index]:
+                diff_value(changes, before[index], after[index], item_path)
+    else:
+        changes.append(change('body', 'changed', path, before, after))
+
+
+def request_diff(original, modified):
+    """{'changes': [...], 'omitted': int} between two requests"""
+    before = request_parts(original)
+    after = request_parts(modified)
+    changes = []
+
+    if before['method'] != after['method']:
+        changes.append(change('method', 'changed', '', before['method'], after['method']))
+    for part in ('scheme', 'host', 'path', 'fragment'):
+        if before['url'][part] != after['url'][part]:
+            changes.append(change('url', 'changed', part, before['url'][part], after['url'][part]))
+    diff_mapping(changes, 'query', before['query'], after['query'])
+    diff_mapping(changes, 'header', before['headers'], after['headers'])
+
+    if isinstance(before['body'], (dict, list)) and isinstance(after['body'], (dict, list)):
+        diff_value(changes, before['body'], after['body'], '')
+    elif before['body'] != after['body']:
+        op = 'added' if before['body'] is None else 'removed' if after['body'] is None else 'changed'
+        changes.append(change('body', op, '', before['body'], after['body']))
+
+    return {'changes': changes[:MAX_CHANGES], 'omitted': max(0, len(changes) - MAX_CHANGES)}
+
+
+def backfill_request_diffs(apps, schema_editor):
+    """Diff the requests of the chaos runs that already exist"""
+    ChaosTestRun = apps.get_model('playground', 'ChaosTestRun')
+
+    runs = ChaosTestRun.objects.filter(request_diff__isnull=True).select_related(
+        'original_request__headers_blob', 'original_request__body_blob',
+        'modified_request__headers_blob', 'modified_request__body_blob',
+    )
+    rows = []
+    for run in runs.iterator(chunk_size=CHUNK_SIZE):
+        run.request_diff = request_diff(run.original_request, run.modified_request)
+        rows.append(run)
+        if len(rows) >= CHUNK_SIZE:
+            ChaosTestRun.objects.bulk_update(rows, ['request_diff'])
+            rows.clear()
+    ChaosTestRun.objects.bulk_update(rows, ['request_diff'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0016_endpoint_latency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chaostestrun',
+            name='request_diff',
+            field=models.JSONField(blank=True, help_text='Changes from the original to the modified request, as computed by RequestDiff', null=True),
+        ),
+        migrations.RunPython(backfill_request_diffs, migrations.RunPython.noop),
+    ]
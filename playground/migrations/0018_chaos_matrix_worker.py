@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0017_chaos_run_request_diff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chaosmatrixjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life of the worker running the job', null=True),
+        ),
+        migrations.AddField(
+            model_name='chaosmatrixjob',
+            name='worker_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0018_chaos_matrix_worker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rcajob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Refreshed by the worker while the job runs', null=True),
+        ),
+    ]
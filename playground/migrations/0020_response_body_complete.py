@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0019_rca_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiresponse',
+            name='body_complete',
+            field=models.BooleanField(default=True, help_text="False if reading stopped at RESPONSE_CAPTURE['MAX_READ_BYTES'], so body_size and body_sha256 cover part of the body"),
+        ),
+        migrations.AddField(
+            model_name='apiresponse',
+            name='body_spool_path',
+            field=models.CharField(blank=True, help_text="File holding the full received body of a truncated response (RESPONSE_CAPTURE['SPOOL_DIR'])", max_length=500, null=True),
+        ),
+        migrations.AlterField(
+            model_name='apiresponse',
+            name='body_sha256',
+            field=models.CharField(blank=True, help_text='SHA-256 of the response body bytes received (only the bytes read when body_complete is False)', max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0020_response_body_complete'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='apiresponse',
+            name='persist_ms',
+            field=models.FloatField(blank=True, help_text='Storing the response headers and body in the blob store (the row insert is not included)', null=True),
+        ),
+    ]
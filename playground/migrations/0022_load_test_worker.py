@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('playground', '0021_response_persist_ms_help'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loadtestrun',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last sign of life of the worker running the load test', null=True),
+        ),
+        migrations.AddField(
+            model_name='loadtestrun',
+            name='worker_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
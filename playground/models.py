@@ -1,37 +1,244 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 import uuid
+from .signals import post_bulk_create
 
-class ApiRequest(models.Model):
+
+class TrackedQuerySet(models.QuerySet):
+    """QuerySet whose bulk_create announces the new rows (see signals.post_bulk_create)"""
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        if issubclass(self.model, StoredTextModel):
+            # Bodies go to the blob store first so the rows can reference them
+            objs = list(objs)
+            with transaction.atomic(using=self.db):
+                StoredTextModel.store_pending_texts(objs)
+                objs = super().bulk_create(objs, *args, **kwargs)
+        else:
+            objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            post_bulk_create.send(sender=self.model, instances=objs)
+        return objs
+
+
+class BodyBlob(models.Model):
+    """
+    A request/response body or header text stored once per distinct content.
+
+    Rows point at blobs through foreign keys and read them through
+    ``stored_text`` attributes; see utils.body_store.BodyStore.
+    """
+    digest = models.CharField(
+        primary_key=True, max_length=64,
+        help_text="SHA-256 hex digest of the uncompressed UTF-8 text"
+    )
+    codec = models.CharField(max_length=10, help_text="Compression used for data: raw, zlib or zstd")
+    data = models.BinaryField()
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    refcount = models.IntegerField(default=0, help_text="Number of rows referencing this blob")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.size} bytes, {self.codec})"
+
+
+# Marks a stored_text value assigned but not yet written to the blob store
+_PENDING = object()
+
+
+def stored_text(blob_field):
+    """
+    Text attribute kept in the BodyBlob referenced by the ``blob_field`` foreign key.
+
+    Reading decompresses the blob on first access and caches the text on the
+    instance; assigning keeps the text pending until the row is saved.
+    """
+    cache_name = f'_{blob_field}_text'
+    attname = f'{blob_field}_id'
+
+    def get(self):
+        cached = self.__dict__.get(cache_name)
+        if cached is not None and cached[0] is _PENDING:
+            return cached[1]
+        blob_id = getattr(self, attname)
+        if cached is not None and cached[0] == blob_id:
+            return cached[1]
+        if blob_id is None:
+            return None
+        from .utils.body_store import BodyStore
+        text = BodyStore.decode(getattr(self, blob_field))
+        self.__dict__[cache_name] = (blob_id, text)
+        return text
+
+    def set(self, value):
+        self.__dict__[cache_name] = (_PENDING, value)
+
+    return property(get, set, doc=f"Text stored in the BodyBlob referenced by {blob_field}")
+
+
+class StoredTextModel(models.Model):
+    """Model whose large text attributes live in BodyBlob (see stored_text)"""
+
+    # Names of the BodyBlob foreign keys backing stored_text attributes
+    STORED_TEXT_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def _pending_texts(self):
+        """(blob_field, text) for each stored_text assigned since the last save"""
+        for blob_field in self.STORED_TEXT_FIELDS:
+            cached = self.__dict__.get(f'_{blob_field}_text')
+            if cached is not None and cached[0] is _PENDING:
+                yield blob_field, cached[1]
+
+    @staticmethod
+    def store_pending_texts(instances):
+        """
+        Write the pending texts of several instances to the blob store and point
+        their foreign keys at the blobs
+
+        Returns:
+            list: Digests the instances referenced before, whose references are now spare
+        """
+        from .utils.body_store import BodyStore
+
+        pending = [
+            (instance, blob_field, text)
+            for instance in instances
+            for blob_field, text in instance._pending_texts()
+        ]
+        if not pending:
+            return []
+
+        digests = iter(BodyStore.put_many([text for _, _, text in pending if text is not None]))
+        replaced = []
+        for instance, blob_field, text in pending:
+            digest = next(digests) if text is not None else None
+            replaced.append(getattr(instance, f'{blob_field}_id'))
+            setattr(instance, f'{blob_field}_id', digest)
+            instance.__dict__[f'_{blob_field}_text'] = (digest, text)
+        return [digest for digest in replaced if digest]
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Drop assigned and decoded texts so they are read again from the reloaded blobs
+        for blob_field in self.STORED_TEXT_FIELDS:
+            if fields is None or blob_field in fields or f'{blob_field}_id' in fields:
+                self.__dict__.pop(f'_{blob_field}_text', None)
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+    def save(self, *args, **kwargs):
+        pending_fields = [blob_field for blob_field, _ in self._pending_texts()]
+        if not pending_fields:
+            return super().save(*args, **kwargs)
+
+        from .utils.body_store import BodyStore
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | set(pending_fields)
+        with transaction.atomic():
+            replaced = self.store_pending_texts([self])
+            super().save(*args, **kwargs)
+            BodyStore.release_many(replaced)
+
+
+class ApiRequest(StoredTextModel):
     """Model to store API request details"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     url = models.URLField(max_length=500)
     method = models.CharField(max_length=10)
-    headers = models.TextField(blank=True, null=True)
-    body = models.TextField(blank=True, null=True)
+    headers_blob = models.ForeignKey(
+        BodyBlob, on_delete=models.PROTECT, related_name='+', null=True, blank=True, editable=False
+    )
+    body_blob = models.ForeignKey(
+        BodyBlob, on_delete=models.PROTECT, related_name='+', null=True, blank=True, editable=False
+    )
+    description = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = TrackedQuerySet.as_manager()
+    
+    # Stored compressed and deduplicated in BodyBlob, read on first access
+    headers = stored_text('headers_blob')
+    body = stored_text('body_blob')
+    STORED_TEXT_FIELDS = ('headers_blob', 'body_blob')
+    
     def __str__(self):
         return f"{self.method} {self.url} ({self.created_at.strftime('%Y-%m-%d %H:%M:%S')})"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
 
-class ApiResponse(models.Model):
+class ApiResponse(StoredTextModel):
     """Model to store API response details"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     request = models.ForeignKey(ApiRequest, on_delete=models.CASCADE, related_name='responses')
     status_code = models.IntegerField()
-    response_headers = models.TextField(blank=True, null=True)
-    response_body = models.TextField(blank=True, null=True)
+    response_headers_blob = models.ForeignKey(
+        BodyBlob, on_delete=models.PROTECT, related_name='+', null=True, blank=True, editable=False
+    )
+    response_body_blob = models.ForeignKey(
+        BodyBlob, on_delete=models.PROTECT, related_name='+', null=True, blank=True, editable=False
+    )
     response_time_ms = models.IntegerField()
+    body_size = models.BigIntegerField(
+        null=True, blank=True,
+        help_text="Bytes of response body received (null if no body was read)"
+    )
+    body_sha256 = models.CharField(
+        max_length=64, null=True, blank=True,
+        help_text="SHA-256 of the response body bytes received (only the bytes read when body_complete is False)"
+    )
+    body_truncated = models.BooleanField(
+        default=False,
+        help_text="Whether response_body holds only the head and tail of a larger body"
+    )
+    body_complete = models.BooleanField(
+        default=True,
+        help_text="False if reading stopped at RESPONSE_CAPTURE['MAX_READ_BYTES'], so body_size and body_sha256 cover part of the body"
+    )
+    body_spool_path = models.CharField(
+        max_length=500, null=True, blank=True,
+        help_text="File holding the full received body of a truncated response (RESPONSE_CAPTURE['SPOOL_DIR'])"
+    )
+    connection_reused = models.BooleanField(
+        null=True, blank=True,
+        help_text="Whether the request reused a kept-alive connection (null if unknown)"
+    )
+    host = models.CharField(
+        max_length=255, blank=True, default='',
+        help_text="Scheme, host and port the request was sent to"
+    )
+    # Per-phase timings in ms (null if the phase was never reached)
+    dns_ms = models.FloatField(null=True, blank=True, help_text="DNS lookup (0 on a reused connection)")
+    connect_ms = models.FloatField(null=True, blank=True, help_text="TCP connect (0 on a reused connection)")
+    tls_ms = models.FloatField(null=True, blank=True, help_text="TLS handshake (0 on a reused or plain HTTP connection)")
+    ttfb_ms = models.FloatField(null=True, blank=True, help_text="From sending the request to receiving the response headers")
+    download_ms = models.FloatField(null=True, blank=True, help_text="Reading the response body")
+    persist_ms = models.FloatField(
+        null=True, blank=True,
+        help_text="Storing the response headers and body in the blob store (the row insert is not included)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = TrackedQuerySet.as_manager()
+    
+    response_headers = stored_text('response_headers_blob')
+    response_body = stored_text('response_body_blob')
+    STORED_TEXT_FIELDS = ('response_headers_blob', 'response_body_blob')
+    
     def __str__(self):
         return f"Response {self.status_code} for {self.request}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['host', '-created_at']),
+        ]
 
 
 class ChaosTest(models.Model):
@@ -73,13 +280,162 @@ class ChaosTestRun(models.Model):
     failed_response = models.ForeignKey(
         ApiResponse, on_delete=models.CASCADE, related_name='failure_for_chaos_runs'
     )
+    request_diff = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Changes from the original to the modified request, as computed by RequestDiff"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = TrackedQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.chaos_test.name} on {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
+
+class ChaosMatrixJob(models.Model):
+    """
+    Model to store a background job applying every selected chaos test
+    to every selected API request.
+    
+    The job records its progress while running and, once finished, a summary
+    grid of status codes and latencies (one row per request, one cell per
+    chaos test) so the results page never has to re-aggregate the runs.
+    Pending jobs are claimed by ``manage.py job_worker``, which refreshes
+    ``heartbeat_at`` while the job runs.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    
+    api_requests = models.ManyToManyField(ApiRequest, related_name='chaos_matrix_jobs')
+    chaos_tests = models.ManyToManyField(ChaosTest, related_name='chaos_matrix_jobs')
+    
+    total_cases = models.IntegerField(default=0)
+    completed_cases = models.IntegerField(default=0)
+    summary = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Grid of status codes and latencies per request and chaos test"
+    )
+    error = models.TextField(blank=True, null=True)
+    worker_id = models.CharField(max_length=100, blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last sign of life of the worker running the job"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Chaos matrix {self.get_status_display()} ({self.created_at.strftime('%Y-%m-%d %H:%M:%S')})"
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def get_progress_percentage(self):
+        """Returns the completed share of the matrix as a whole percentage"""
+        if not self.total_cases:
+            return 100 if self.status == 'COMPLETED' else 0
+        return int(self.completed_cases * 100 / self.total_cases)
+
+
+class LoadTestRun(models.Model):
+    """
+    Model to store an aggregated load test of one saved API request.
+    
+    The request is replayed at a target rate (open loop) or by a fixed number
+    of concurrent workers (closed loop) for a fixed duration. Individual hits
+    are not stored; the run keeps a latency histogram, status code counts and
+    a per-second timeline, plus the headline figures for listing. Pending
+    runs are claimed by ``manage.py job_worker``, which refreshes
+    ``heartbeat_at`` while the run is in progress.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    api_request = models.ForeignKey(ApiRequest, on_delete=models.CASCADE, related_name='load_tests')
+    
+    MODE_CHOICES = [
+        ('RPS', 'Target requests per second'),
+        ('CONCURRENCY', 'Concurrent workers'),
+    ]
+    mode = models.CharField(max_length=12, choices=MODE_CHOICES, default='RPS')
+    target_rps = models.FloatField(null=True, blank=True, help_text="Requests started per second (RPS mode)")
+    concurrency = models.IntegerField(null=True, blank=True, help_text="Workers sending back to back (CONCURRENCY mode)")
+    duration_seconds = models.IntegerField()
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    error = models.TextField(blank=True, null=True)
+    worker_id = models.CharField(max_length=100, blank=True, null=True)
+    
+    total_requests = models.IntegerField(default=0)
+    error_requests = models.IntegerField(default=0, help_text="Responses with status 400 or above, including connection failures")
+    dropped_requests = models.IntegerField(
+        default=0,
+        help_text="Scheduled requests not sent because too many were already outstanding (RPS mode)"
+    )
+    throughput_rps = models.FloatField(null=True, blank=True, help_text="Completed requests per second")
+    p50_ms = models.FloatField(null=True, blank=True)
+    p90_ms = models.FloatField(null=True, blank=True)
+    p99_ms = models.FloatField(null=True, blank=True)
+    max_ms = models.FloatField(null=True, blank=True)
+    status_counts = models.JSONField(default=dict, blank=True, help_text="Number of responses per status code")
+    latency_histogram = models.JSONField(default=dict, blank=True, help_text="LatencyHistogram of all latencies")
+    timeline = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Per-second completed, error and 429 counts with p99 latency"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last sign of life of the worker running the load test"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Load test {self.get_status_display()} of {self.api_request}"
+    
+    def get_error_rate(self):
+        """Share of completed requests that failed, as a percentage"""
+        if not self.total_requests:
+            return 0
+        return round(self.error_requests * 100 / self.total_requests, 2)
+    
+    def get_progress_percentage(self):
+        """Elapsed share of the run's duration as a whole percentage"""
+        if self.status in ('COMPLETED', 'FAILED'):
+            return 100
+        if not self.started_at:
+            return 0
+        elapsed = (timezone.now() - self.started_at).total_seconds()
+        return min(99, int(elapsed * 100 / self.duration_seconds))
+    
+    def get_first_throttled_second(self):
+        """Second of the run in which the first 429 response was sent, or None"""
+        return next((row['second'] for row in self.timeline if row['throttled']), None)
+    
+    class Meta:
+        ordering = ['-created_at']
 
 
 class RootCauseAnalysis(models.Model):
@@ -177,6 +533,8 @@ class RootCauseAnalysis(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     
+    objects = TrackedQuerySet.as_manager()
+    
     def __str__(self):
         if self.chaos_test_run:
             return f"RCA for {self.chaos_test_run} ({self.confidence})"
@@ -188,6 +546,7 @@ class RootCauseAnalysis(models.Model):
         ordering = ['-created_at']
         verbose_name_plural = "Root cause analyses"
         indexes = [
+            models.Index(fields=['-created_at', '-id']),
             models.Index(fields=['failure_category']),
             models.Index(fields=['impact_severity']),
             models.Index(fields=['confidence']),
@@ -204,6 +563,131 @@ class RootCauseAnalysis(models.Model):
         return self.affected_components
 
 
+class RcaJob(models.Model):
+    """
+    Model to store a queued Root Cause Analysis request.
+    
+    RCAs are generated by background workers (``manage.py rca_worker``)
+    instead of inside the HTTP request. Workers claim the highest-priority
+    queued job, generate the RCA and link it here. Only one active job may
+    exist per failure (``dedupe_key``), so repeated submissions of the same
+    failure share one job.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    chaos_test_run = models.ForeignKey(
+        ChaosTestRun, on_delete=models.CASCADE, related_name='rca_jobs', null=True, blank=True
+    )
+    api_response = models.ForeignKey(
+        ApiResponse, on_delete=models.CASCADE, related_name='rca_jobs', null=True, blank=True
+    )
+    
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('QUEUED', 'RUNNING')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    priority = models.IntegerField(default=0, help_text="Higher priority jobs are claimed first")
+    dedupe_key = models.CharField(max_length=100, help_text="Identifies the failure this job analyses")
+    
+    rca = models.ForeignKey(
+        RootCauseAnalysis, on_delete=models.SET_NULL, related_name='jobs', null=True, blank=True
+    )
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    worker_id = models.CharField(max_length=100, blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Refreshed by the worker while the job runs"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"RCA job {self.dedupe_key} ({self.status})"
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status__in=['QUEUED', 'RUNNING']),
+                name='unique_active_rca_job',
+            ),
+        ]
+    
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+
+class MetricCounter(models.Model):
+    """
+    Model to store rollup counters behind the dashboard metrics.
+    
+    Counters are adjusted incrementally as counted rows are created or deleted
+    (see utils.metric_rollup), so reading a metric never scans the underlying
+    tables. Totals have no bucket; time series are kept per hour.
+    Rebuild with ``manage.py reconcile_metrics``.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=64, help_text="Metric name, e.g. 'api_responses.total'")
+    bucket = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Start of the hour counted, or null for an all-time total"
+    )
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name}@{self.bucket or 'total'} = {self.value}"
+    
+    class Meta:
+        ordering = ['name', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'bucket'], name='unique_metric_counter_bucket'),
+            # NULL buckets are distinct in a unique index, so totals need their own constraint
+            models.UniqueConstraint(
+                fields=['name'], condition=models.Q(bucket__isnull=True), name='unique_metric_counter_total'
+            ),
+        ]
+
+
+class EndpointLatencyBucket(models.Model):
+    """
+    Model to store the latency histogram of one endpoint for one time bucket.
+    
+    Histograms are merged in as responses are stored (see
+    utils.endpoint_latency), so percentiles over a window read a few rows per
+    endpoint instead of every response. Rebuild with ``manage.py reconcile_metrics``.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    method = models.CharField(max_length=10)
+    endpoint = models.CharField(max_length=500, help_text="URL without query string, with ID segments replaced by {id}")
+    bucket = models.DateTimeField(help_text="Start of the time bucket (UTC)")
+    count = models.BigIntegerField(default=0)
+    histogram = models.JSONField(default=dict, help_text="LatencyHistogram of response_time_ms")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.method} {self.endpoint}@{self.bucket.isoformat()} ({self.count})"
+    
+    class Meta:
+        ordering = ['endpoint', 'method', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['method', 'endpoint', 'bucket'], name='unique_endpoint_latency_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+
+
 class TodoItem(models.Model):
     """Model for Todo items in our internal REST API"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -215,6 +699,11 @@ class TodoItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -230,5 +719,10 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,197 @@
+import json
+import base64
+import binascii
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset.
+
+    Exposes the subset of the Django ``Page`` API the templates use, with
+    cursor tokens instead of page numbers. Page numbers and totals are not
+    available because keyset pagination never counts the rows.
+    """
+
+    def __init__(self, object_list, has_next, has_previous, paginator):
+        self.object_list = object_list
+        self.has_next_page = has_next
+        self.has_previous_page = has_previous
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.has_next_page
+
+    def has_previous(self):
+        return self.has_previous_page
+
+    def has_other_pages(self):
+        return self.has_next_page or self.has_previous_page
+
+    @property
+    def next_cursor(self):
+        """Token of the page after this one, or None"""
+        if not self.has_next_page:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], KeysetPaginator.FORWARD)
+
+    @property
+    def previous_cursor(self):
+        """Token of the page before this one, or None"""
+        if not self.has_previous_page:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], KeysetPaginator.BACKWARD)
+
+    @property
+    def last_cursor(self):
+        """Token of the oldest page"""
+        return KeysetPaginator.LAST
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset newest first by ``(created_at, id)`` using cursors.
+
+    Each page is fetched with a ``WHERE (created_at, id) < (cursor)`` range
+    condition served by the composite ``(-created_at, -id)`` index, so deep
+    pages cost the same as the first one and no ``COUNT(*)`` is issued.
+    Cursors are opaque URL-safe tokens; an invalid token yields the first page.
+    """
+
+    FORWARD = 'n'   # rows older than the cursor
+    BACKWARD = 'p'  # rows newer than the cursor
+    LAST = 'last'   # the oldest page
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @staticmethod
+    def encode_cursor(obj, direction):
+        """Build the cursor token for a position just past ``obj``"""
+        payload = json.dumps([obj.created_at.isoformat(), str(obj.pk), direction], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        """
+        Parse a cursor token
+
+        Returns:
+            tuple: (created_at, pk, direction), or None if the token is invalid
+        """
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = parse_datetime(created_at)
+        except (TypeError, ValueError, binascii.Error):
+            return None
+        if created_at is None or direction not in (KeysetPaginator.FORWARD, KeysetPaginator.BACKWARD):
+            return None
+        return created_at, pk, direction
+
+    def get_page(self, token=None):
+        """
+        Return the page identified by a cursor token (the newest page by default)
+
+        Args:
+            token (str): Cursor from a page's next/previous/last cursor, or None
+
+        Returns:
+            KeysetPage: The rows of the page, newest first
+        """
+        newest_first = self.queryset.order_by('-created_at', '-pk')
+        oldest_first = self.queryset.order_by('created_at', 'pk')
+
+        if token == self.LAST:
+            rows = list(oldest_first[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            return KeysetPage(rows[:self.per_page][::-1], has_next=False, has_previous=has_more, paginator=self)
+
+        cursor = self.decode_cursor(token) if token else None
+        if cursor is not None:
+            try:
+                cursor = (cursor[0], self.queryset.model._meta.pk.to_python(cursor[1]), cursor[2])
+            except ValidationError:
+                cursor = None
+        if cursor is None:
+            rows = list(newest_first[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], has_next=len(rows) > self.per_page, has_previous=False, paginator=self)
+
+        created_at, pk, direction = cursor
+        if direction == self.FORWARD:
+            older = Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            rows = list(newest_first.filter(older)[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], has_next=len(rows) > self.per_page, has_previous=True, paginator=self)
+
+        newer = Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        rows = list(oldest_first.filter(newer)[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page][::-1], has_next=True, has_previous=len(rows) > self.per_page, paginator=self)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination class built on KeysetPaginator (newest first).
+
+    Responses have the shape ``{"next": url, "previous": url, "results": [...]}``;
+    the page size comes from ``REST_FRAMEWORK['PAGE_SIZE']`` and can be
+    lowered per request with ``?page_size=``.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    page_size = 20
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or self.page_size
+        try:
+            requested = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            requested = page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        self.page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        return list(self.page)
+
+    def _link(self, token):
+        """Absolute URL of the current request with the cursor replaced"""
+        if token is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link(self.page.next_cursor),
+            'previous': self._link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
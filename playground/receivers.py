@@ -0,0 +1,101 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .models import ApiRequest, ApiResponse, ChaosTestRun, RootCauseAnalysis
+from .signals import post_bulk_create
+from .utils.body_store import BodyStore
+from .utils.dashboard_stats import DashboardStats
+from .utils.endpoint_latency import EndpointLatency
+from .utils.metric_rollup import MetricRollup
+from .utils.response_capture import ResponseCapture
+from .utils.similarity_index import SimilarityIndex
+
+# Models counted on the dashboard
+DASHBOARD_MODELS = (ApiRequest, ApiResponse, ChaosTestRun, RootCauseAnalysis)
+
+
+def count_saved_row(sender, instance, created, raw=False, **kwargs):
+    """Count a newly created row in the rollup counters"""
+    if raw:
+        return
+    if created:
+        MetricRollup.record([instance], +1)
+    DashboardStats.invalidate()
+
+
+def count_deleted_row(sender, instance, **kwargs):
+    """Remove a deleted row from the rollup counters"""
+    MetricRollup.record([instance], -1)
+    DashboardStats.invalidate()
+
+
+def count_bulk_created_rows(sender, instances, **kwargs):
+    """Count rows inserted with bulk_create in the rollup counters"""
+    MetricRollup.record(instances, +1)
+    DashboardStats.invalidate()
+
+
+def record_response_latency(sender, instance, created, raw=False, **kwargs):
+    """Add a newly stored response to its endpoint latency histogram"""
+    if created and not raw:
+        EndpointLatency.record([instance])
+
+
+def record_bulk_response_latencies(sender, instances, **kwargs):
+    """Add responses inserted with bulk_create to their endpoint latency histograms"""
+    EndpointLatency.record(instances)
+
+
+def index_rca(sender, instance, created, raw=False, **kwargs):
+    """Add a new RCA to the similar-failure index once it is committed"""
+    if created and not raw:
+        transaction.on_commit(lambda: SimilarityIndex.add(instance), robust=True)
+
+
+def index_bulk_created_rcas(sender, instances, **kwargs):
+    """Add RCAs inserted with bulk_create to the similar-failure index once they are committed"""
+    def add():
+        for instance in instances:
+            SimilarityIndex.add(instance)
+    transaction.on_commit(add, robust=True)
+
+
+def unindex_rca(sender, instance, **kwargs):
+    """Drop a deleted RCA from the similar-failure index"""
+    rca_id = instance.pk
+    transaction.on_commit(lambda: SimilarityIndex.remove(rca_id), robust=True)
+
+
+def release_stored_texts(sender, instance, **kwargs):
+    """Drop a deleted row's references to its body and header blobs"""
+    BodyStore.release_many(getattr(instance, f'{blob_field}_id') for blob_field in sender.STORED_TEXT_FIELDS)
+
+
+def delete_spooled_body(sender, instance, **kwargs):
+    """Delete the spooled copy of a deleted response's body once no response refers to it"""
+    path = instance.body_spool_path
+    if not path:
+        return
+
+    def delete():
+        # Spool files are named by content, so identical bodies share one
+        if not ApiResponse.objects.filter(body_spool_path=path).exists():
+            ResponseCapture.delete_spooled(path)
+    transaction.on_commit(delete, robust=True)
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(count_saved_row, sender=model, dispatch_uid=f'metrics_save_{model.__name__}')
+    post_delete.connect(count_deleted_row, sender=model, dispatch_uid=f'metrics_delete_{model.__name__}')
+    post_bulk_create.connect(count_bulk_created_rows, sender=model, dispatch_uid=f'metrics_bulk_{model.__name__}')
+
+for model in (ApiRequest, ApiResponse):
+    post_delete.connect(release_stored_texts, sender=model, dispatch_uid=f'body_store_delete_{model.__name__}')
+
+post_delete.connect(delete_spooled_body, sender=ApiResponse, dispatch_uid='response_spool_delete')
+
+post_save.connect(record_response_latency, sender=ApiResponse, dispatch_uid='endpoint_latency_save')
+post_bulk_create.connect(record_bulk_response_latencies, sender=ApiResponse, dispatch_uid='endpoint_latency_bulk')
+
+post_save.connect(index_rca, sender=RootCauseAnalysis, dispatch_uid='similarity_index_save')
+post_bulk_create.connect(index_bulk_created_rcas, sender=RootCauseAnalysis, dispatch_uid='similarity_index_bulk')
+post_delete.connect(unindex_rca, sender=RootCauseAnalysis, dispatch_uid='similarity_index_delete')
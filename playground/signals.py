@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by TrackedQuerySet.bulk_create, which bypasses post_save.
+# Arguments: sender (the model class), instances (the created objects)
+post_bulk_create = Signal()
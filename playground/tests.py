@@ -1,3 +1,312 @@
-from django.test import TestCase
+import threading
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.signals import connection_created
+from unittest import skipUnless
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import ApiRequest, ApiResponse, ChaosTest, ChaosTestRun, RootCauseAnalysis
+from .utils.api_client import ApiClient
+from .utils.rca_engine import RcaEngine
+from .utils.rca_rules import RcaRules
+from .utils.similarity_index import SimilarityIndex
 
-# Create your tests here.
+
+@override_settings(SIMILARITY_INDEX={'PATH': None})
+class ListingQueryCountTests(TestCase):
+    """
+    Listing pages must run a constant number of queries however many rows they show.
+
+    Each page is rendered against a small and a larger data set; the query
+    count has to be identical for both and stay within the page's budget. A
+    template or view that starts dereferencing a relation per row (N+1) fails
+    here before it reaches production.
+    """
+
+    # Max queries per page with data present; raise only with a reason
+    QUERY_BUDGETS = {
+        'index': 11,
+        'api_tester': 1,
+        'break_app': 4,
+        'chaos_test_runs': 1,
+        'chaos_test_run_detail': 2,
+        'rca_generator': 3,
+        # One query for the related RCAs, found by the similarity index or by category
+        'rca_detail': 3,
+        'view_api_rca': 4,
+        'endpoint_latency': 1,
+    }
+
+    def setUp(self):
+        # Dashboard stats and rollups are cached; start every page from a cold cache
+        cache.clear()
+        # Related RCAs come from the similarity index when it has entries; start empty
+        SimilarityIndex.rebuild([])
+        self.chaos_tests = []
+        self.runs = []
+        self.responses = []
+        self.rcas = []
+
+    def add_rows(self, count):
+        """Create ``count`` chaos tests, requests, responses, runs and RCAs"""
+        offset = len(self.runs)
+        for i in range(offset, offset + count):
+            chaos_test = ChaosTest.objects.create(
+                name=f"Test {i}", fault_type='MISSING_FIELD', description=f"Chaos test {i}"
+            )
+            original = ApiRequest.objects.create(url=f"https://api.example.com/items/{i}", method='POST', body='{"a": 1}')
+            modified = ApiRequest.objects.create(url=f"https://api.example.com/items/{i}", method='POST', body='{}')
+            ApiResponse.objects.create(request=original, status_code=201, response_body='{}', response_time_ms=12)
+            failed = ApiResponse.objects.create(
+                request=modified, status_code=400, response_body='{"error": "a is required"}', response_time_ms=9
+            )
+            run = ChaosTestRun.objects.create(
+                chaos_test=chaos_test, original_request=original, modified_request=modified, failed_response=failed
+            )
+            rca = RootCauseAnalysis.objects.create(
+                chaos_test_run=run,
+                confidence='HIGH',
+                root_cause=f"Field a missing ({i})",
+                detailed_analysis='The request body omitted a required field.',
+                potential_solutions='Validate the payload before sending it.',
+                failure_category='API Validation',
+            )
+            response_rca = RootCauseAnalysis.objects.create(
+                api_response=failed,
+                confidence='MEDIUM',
+                root_cause=f"Bad request ({i})",
+                detailed_analysis='The API rejected the payload.',
+                potential_solutions='Send the required fields.',
+                failure_category='API Validation',
+            )
+            self.chaos_tests.append(chaos_test)
+            self.runs.append(run)
+            self.responses.append(failed)
+            self.rcas.extend([rca, response_rca])
+
+        # A run without an RCA so the generator form has options to render
+        ChaosTestRun.objects.create(
+            chaos_test=self.chaos_tests[0],
+            original_request=self.runs[0].original_request,
+            modified_request=self.runs[0].modified_request,
+            failed_response=self.runs[0].failed_response,
+        )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(context.captured_queries), context
+
+    def assertConstantQueries(self, page, url_for):
+        """Render a page with 2 and then 15 rows of data and compare query counts"""
+        self.add_rows(2)
+        small, _ = self.count_queries(url_for())
+        self.add_rows(13)
+        large, context = self.count_queries(url_for())
+
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertEqual(small, large, f"{page} queries grow with the number of rows:\n{queries}")
+        self.assertLessEqual(large, self.QUERY_BUDGETS[page], f"{page} exceeds its query budget:\n{queries}")
+
+    def test_index(self):
+        self.assertConstantQueries('index', lambda: reverse('index'))
+
+    def test_index_deep_pages(self):
+        self.add_rows(15)
+        first, _ = self.count_queries(reverse('index'))
+        last, _ = self.count_queries(reverse('index') + '?page=last&rca_page=last')
+        self.assertEqual(first, last)
+
+    def test_api_tester(self):
+        self.assertConstantQueries('api_tester', lambda: reverse('api_tester'))
+
+    def test_break_app(self):
+        self.assertConstantQueries('break_app', lambda: reverse('break_app'))
+
+    def test_break_app_run_counts(self):
+        self.add_rows(2)
+        response = self.client.get(reverse('break_app'))
+        counts = {test.name: test.run_count for test in response.context['chaos_tests']}
+        self.assertEqual(counts['Test 0'], 2)
+        self.assertEqual(counts['Test 1'], 1)
+
+    def test_chaos_test_runs(self):
+        self.assertConstantQueries('chaos_test_runs', lambda: reverse('chaos_test_runs'))
+
+    def test_chaos_test_run_detail(self):
+        self.assertConstantQueries(
+            'chaos_test_run_detail', lambda: reverse('chaos_test_run_detail', args=[self.runs[-1].id])
+        )
+
+    def test_rca_generator(self):
+        self.assertConstantQueries('rca_generator', lambda: reverse('rca_generator'))
+
+    def test_rca_generator_lists_runs_without_rca(self):
+        self.add_rows(2)
+        response = self.client.get(reverse('rca_generator'))
+        self.assertEqual(response.context['form'].fields['chaos_test_run'].queryset.count(), 1)
+
+    def test_rca_detail(self):
+        self.assertConstantQueries('rca_detail', lambda: reverse('rca_detail', args=[self.rcas[-2].id]))
+
+    @skipUnless(SimilarityIndex.available(), "NumPy is not installed")
+    def test_rca_detail_related_by_similarity(self):
+        self.add_rows(5)
+        SimilarityIndex.rebuild(RootCauseAnalysis.objects.all())
+        rca = self.rcas[-2]
+        queries, _ = self.count_queries(reverse('rca_detail', args=[rca.id]))
+        self.assertLessEqual(queries, self.QUERY_BUDGETS['rca_detail'])
+
+        related = self.client.get(reverse('rca_detail', args=[rca.id])).context['related_rcas']
+        self.assertEqual(len(related), 3)
+        for other in related:
+            self.assertNotEqual(other.id, rca.id)
+            # Chaos test RCAs share the fault type and wording, so they outrank the API response ones
+            self.assertTrue(other.root_cause.startswith('Field a missing'), other.root_cause)
+            self.assertGreater(other.similarity, 0)
+
+    def test_view_api_rca(self):
+        self.assertConstantQueries('view_api_rca', lambda: reverse('view_api_rca', args=[self.responses[-1].id]))
+
+    def test_endpoint_latency(self):
+        self.assertConstantQueries('endpoint_latency', lambda: reverse('endpoint_latency'))
+
+
+class BatchExecutionTests(TestCase):
+    """ApiClient.execute_batch keeps database work on the calling thread"""
+
+    def test_worker_threads_open_no_connections(self):
+        for i in range(4):
+            # Nothing listens on the discard port, so every request fails fast without leaving the host
+            ApiRequest.objects.create(
+                url=f"http://127.0.0.1:9/items/{i}", method='POST',
+                headers='{"Content-Type": "application/json"}', body=f'{{"n": {i}}}'
+            )
+
+        threads = []
+
+        def record(sender, connection, **kwargs):
+            threads.append(threading.current_thread().name)
+
+        connection_created.connect(record)
+        try:
+            responses = ApiClient.execute_batch(ApiRequest.objects.all(), max_workers=4)
+        finally:
+            connection_created.disconnect(record)
+
+        self.assertEqual(len(responses), 4)
+        self.assertEqual([name for name in threads if name != threading.current_thread().name], [])
+
+
+class RcaRulesTests(SimpleTestCase):
+    """Rule dispatch, the confidence threshold and rule validation of RcaRules"""
+
+    def classify(self, status_code, body=None, headers=None, fault_type=None):
+        response = {'status_code': status_code, 'body': body, 'headers': headers or {}}
+        request = {'url': 'https://api.example.com/items', 'method': 'POST', 'headers': {}, 'body': '{"a": 1}'}
+        if fault_type is None:
+            context = {'source_type': 'api_response', 'request': request, 'response': response}
+        else:
+            context = {
+                'source_type': 'chaos_test', 'chaos_test': {'fault_type': fault_type},
+                'original_request': request, 'modified_request': {**request, 'body': '{}'},
+                'failed_response': response,
+            }
+        return RcaRules.classify(context)
+
+    def test_dispatch_by_status(self):
+        self.assertEqual(self.classify(404).rule, 'not-found')
+        self.assertEqual(self.classify(418).rule, 'client-error')
+        self.assertEqual(self.classify(302).rule, 'unexpected-status')
+
+    def test_dispatch_by_fault_type(self):
+        match = self.classify(400, fault_type='MISSING_FIELD')
+        self.assertEqual(match.rule, 'missing-field-expected-status')
+        self.assertIn('body.a: removed', match.rca_data['root_cause'])
+        # A status the fault should not cause gives a tentative match
+        self.assertEqual(self.classify(200, fault_type='MISSING_FIELD').rule, 'missing-field')
+        self.assertEqual(self.classify(200, fault_type='UNKNOWN_FAULT').rule, 'chaos-fault')
+
+    def test_dispatch_by_body_pattern(self):
+        self.assertEqual(self.classify(401, body='{"error": "Token expired"}').rule, 'expired-credentials')
+        self.assertEqual(self.classify(401, body='{"error": "Who are you?"}').rule, 'unauthorized')
+        self.assertEqual(self.classify(503, body='too many connections').rule, 'database-error')
+
+    def test_dispatch_by_header_pattern(self):
+        match = self.classify(401, headers={'WWW-Authenticate': 'Bearer error="invalid_token"'})
+        self.assertEqual(match.rule, 'invalid-token-header')
+        self.assertEqual(self.classify(401, headers={'WWW-Authenticate': 'Bearer'}).rule, 'unauthorized')
+
+        match = self.classify(429, headers={'Retry-After': '30'})
+        self.assertEqual(match.rule, 'rate-limited-retry-after')
+        self.assertIn('retry after 30', match.rca_data['root_cause'])
+        self.assertEqual(self.classify(429).rule, 'rate-limited')
+
+    def test_confidence_threshold(self):
+        self.assertTrue(RcaRules.is_confident(self.classify(404)))       # 0.85
+        self.assertFalse(RcaRules.is_confident(self.classify(500)))      # 0.5
+        self.assertFalse(RcaRules.is_confident(None))
+        with override_settings(RCA_RULES={'MIN_CONFIDENCE': 0.9}):
+            self.assertFalse(RcaRules.is_confident(self.classify(404)))
+        with override_settings(RCA_RULES={'ENABLED': False}):
+            self.assertFalse(RcaRules.is_confident(self.classify(404)))
+
+    def test_extra_rules_setting(self):
+        rule = {'name': 'teapot', 'status': (418,), 'confidence': 0.9, 'root_cause': "Teapot at {url}"}
+        with override_settings(RCA_RULES={'RULES': [rule]}):
+            match = self.classify(418)
+        self.assertEqual(match.rule, 'teapot')
+        self.assertEqual(match.rca_data['root_cause'], "Teapot at https://api.example.com/items")
+        self.assertEqual(self.classify(418).rule, 'client-error')
+
+    def test_compile_rejects_malformed_rules(self):
+        malformed = [
+            {'name': 'no-confidence', 'status': (400,)},
+            {'name': 'too-confident', 'confidence': 1.5},
+            {'name': 'unknown-key', 'confidence': 0.5, 'stauts': (400,)},
+            {'name': 'bad-status', 'confidence': 0.5, 'status': ('4x',)},
+            {'name': 'bad-body', 'confidence': 0.5, 'body': '(unclosed'},
+            {'name': 'bad-header', 'confidence': 0.5, 'headers': {'x-error': '[a-'}},
+        ]
+        for rule in malformed:
+            with self.subTest(rule=rule['name']):
+                with self.assertRaises(ImproperlyConfigured):
+                    RcaRules.compile([rule])
+                with override_settings(RCA_RULES={'RULES': [rule]}):
+                    with self.assertRaises(ImproperlyConfigured):
+                        self.classify(404)
+
+
+class RcaRulesEngineTests(TestCase):
+    """RcaEngine answers confident rule matches locally and sends the rest to Gemini"""
+
+    def setUp(self):
+        cache.clear()
+        self.request = ApiRequest.objects.create(url="https://api.example.com/items/1", method='GET')
+
+    def generate(self, status_code):
+        response = ApiResponse.objects.create(
+            request=self.request, status_code=status_code, response_body='{}', response_time_ms=5
+        )
+        with patch.object(RcaEngine, '_call_gemini_api', side_effect=RuntimeError("Gemini unavailable")) as gemini:
+            rca = RcaEngine.generate_rca(api_response=response)
+        return rca, gemini
+
+    def test_confident_match_skips_gemini(self):
+        rca, gemini = self.generate(404)
+        gemini.assert_not_called()
+        self.assertIn('not-found', rca.tags)
+
+    def test_low_confidence_match_goes_to_gemini(self):
+        _, gemini = self.generate(500)
+        gemini.assert_called_once()
+
+    @override_settings(RCA_RULES={'MIN_CONFIDENCE': 0.9})
+    def test_threshold_setting(self):
+        _, gemini = self.generate(404)
+        gemini.assert_called_once()
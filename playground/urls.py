@@ -14,6 +14,13 @@ urlpatterns = [
     # API Tester
     path('api-tester/', views.api_tester, name='api_tester'),
     path('api-response/<uuid:response_id>/', views.api_response_detail, name='api_response_detail'),
+    path('response-timings/', views.response_timing_stats, name='response_timing_stats'),
+    path('load-test/<uuid:request_id>/', views.load_test, name='load_test'),
+    path('load-test-run/<uuid:load_test_id>/', views.load_test_detail, name='load_test_detail'),
+    
+    # Latency histograms per endpoint
+    path('latency/', views.endpoint_latency, name='endpoint_latency'),
+    path('latency/stats/', views.latency_stats, name='latency_stats'),
     
     # API RCA Generation
     path('generate-api-rca/', views.generate_api_rca, name='generate_api_rca'),
@@ -22,12 +29,17 @@ urlpatterns = [
     # Break the App
     path('break-app/', views.break_app, name='break_app'),
     path('apply-chaos/', views.apply_chaos, name='apply_chaos'),
+    path('chaos-matrix/', views.chaos_matrix, name='chaos_matrix'),
+    path('chaos-matrix/<uuid:job_id>/', views.chaos_matrix_detail, name='chaos_matrix_detail'),
     path('chaos-test-runs/', views.chaos_test_runs, name='chaos_test_runs'),
     path('chaos-test-run/<uuid:run_id>/', views.chaos_test_run_detail, name='chaos_test_run_detail'),
     
     # RCA Generator
     path('rca-generator/', views.rca_generator, name='rca_generator'),
     path('rca-detail/<uuid:rca_id>/', views.rca_detail, name='rca_detail'),
+    path('rca-detail/<uuid:rca_id>/similar/', views.similar_rcas, name='similar_rcas'),
+    path('rca-job/<uuid:job_id>/', views.rca_job_status, name='rca_job_status'),
+    path('rca-status/', views.rca_engine_status, name='rca_engine_status'),
     
     # REST API
     path('api/', include(router.urls)),
@@ -1,9 +1,17 @@
 import json
 import time
 import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 from ..models import ApiRequest, ApiResponse
+from .http_pool import SessionPool
+from .request_timing import PhaseTimer
+from .response_capture import ResponseCapture
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +20,11 @@ class ApiClient:
     
     DEFAULT_TIMEOUT = 30  # Increased timeout from 10 to 30 seconds
     
+    # Batch execution limits
+    BATCH_MAX_WORKERS = 16     # Total requests in flight for one batch
+    BATCH_PER_HOST_LIMIT = 4   # Requests in flight against a single host
+    BATCH_CREATE_SIZE = 500    # Rows per bulk_create statement
+    
     @staticmethod
     def execute_request(api_request):
         """
@@ -23,6 +36,102 @@ class ApiClient:
         Returns:
             ApiResponse: The recorded API response
         """
+        api_response = ApiClient._perform_request(api_request)
+        with transaction.atomic():
+            ApiClient._store_bodies([api_response])
+            api_response.save()
+        return api_response
+    
+    @staticmethod
+    def execute_batch(api_requests, max_workers=None, per_host_limit=None,
+                      timeouts=None, progress_callback=None):
+        """
+        Execute many API requests concurrently and record all responses at once
+        
+        Requests run on a bounded thread pool, with a per-host cap so a large
+        batch does not hammer a single API. The stored headers and bodies of
+        the requests are loaded before any request is sent, so no database
+        work happens in the worker threads; all responses are stored with a
+        single bulk_create.
+        
+        Args:
+            api_requests (iterable): ApiRequest instances or a queryset
+            max_workers (int): Max requests in flight (default BATCH_MAX_WORKERS)
+            per_host_limit (int): Max requests in flight per host (default BATCH_PER_HOST_LIMIT)
+            timeouts (list): Optional per-request timeout in seconds, aligned with api_requests
+            progress_callback (callable): Optional callback(completed, total) called as requests finish
+            
+        Returns:
+            list: The recorded ApiResponse objects, in the same order as the input
+        """
+        if isinstance(api_requests, QuerySet):
+            api_requests = api_requests.select_related('headers_blob', 'body_blob')
+        api_requests = list(api_requests)
+        if not api_requests:
+            return []
+        
+        # stored_text attributes load their blobs on first access; do it here, not in the worker threads
+        for api_request in api_requests:
+            api_request.headers, api_request.body
+        
+        max_workers = max_workers or ApiClient.BATCH_MAX_WORKERS
+        per_host_limit = per_host_limit or ApiClient.BATCH_PER_HOST_LIMIT
+        timeouts = timeouts or [None] * len(api_requests)
+        
+        host_slots = defaultdict(lambda: threading.BoundedSemaphore(per_host_limit))
+        for api_request in api_requests:
+            host_slots[SessionPool._host_key(api_request.url or '')]
+        
+        def run(api_request, timeout):
+            with host_slots[SessionPool._host_key(api_request.url or '')]:
+                return ApiClient._perform_request(api_request, timeout=timeout)
+        
+        api_responses = [None] * len(api_requests)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(api_requests))) as executor:
+            futures = {
+                executor.submit(run, api_request, timeout): index
+                for index, (api_request, timeout) in enumerate(zip(api_requests, timeouts))
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                api_responses[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(completed, len(api_requests))
+        
+        with transaction.atomic():
+            ApiClient._store_bodies(api_responses)
+            ApiResponse.objects.bulk_create(api_responses, batch_size=ApiClient.BATCH_CREATE_SIZE)
+        logger.info(f"Executed batch of {len(api_responses)} API requests")
+        return api_responses
+    
+    @staticmethod
+    def _store_bodies(api_responses):
+        """
+        Write the headers and bodies of unsaved responses to the blob store and
+        set their persist_ms (a batch shares the time evenly)
+        
+        Compressing and storing the bodies is the bulk of saving a response.
+        Timing it before the rows are inserted lets persist_ms go out with the
+        INSERT instead of a second UPDATE; the row insert itself is not counted.
+        """
+        started = time.perf_counter()
+        ApiResponse.store_pending_texts(api_responses)
+        persist_ms = round((time.perf_counter() - started) * 1000 / len(api_responses), 3)
+        for api_response in api_responses:
+            api_response.persist_ms = persist_ms
+    
+    @staticmethod
+    def _perform_request(api_request, timeout=None, spool=True):
+        """
+        Send an API request and build its (unsaved) response record
+        
+        Args:
+            api_request (ApiRequest): The API request to execute
+            timeout (float): Request timeout in seconds (default DEFAULT_TIMEOUT)
+            spool (bool): Keep a full copy of truncated bodies in RESPONSE_CAPTURE['SPOOL_DIR']
+            
+        Returns:
+            ApiResponse: An unsaved API response describing the outcome
+        """
         try:
             # Prepare headers
             headers = {}
@@ -79,8 +188,9 @@ class ApiClient:
                 elif isinstance(api_request.body, (dict, list)):
                     data = json.dumps(api_request.body)
             
-            # Record start time
-            start_time = time.time()
+            # Record start time (monotonic, so clock adjustments can't skew it)
+            start_time = time.perf_counter()
+            timer = PhaseTimer()
             
             # Execute request - using a more consistent approach
             response = None
@@ -88,7 +198,9 @@ class ApiClient:
                 method = api_request.method.upper() if api_request.method else 'GET'
                 kwargs = {
                     'headers': headers,
-                    'timeout': ApiClient.DEFAULT_TIMEOUT
+                    'timeout': timeout or ApiClient.DEFAULT_TIMEOUT,
+                    # The body is read in chunks by ResponseCapture
+                    'stream': True,
                 }
                 
                 # Add data or json parameter based on content type and method
@@ -112,36 +224,45 @@ class ApiClient:
                 if not api_request.url or not api_request.url.startswith(('http://', 'https://')):
                     raise ValueError(f"Invalid URL: {api_request.url}")
                 
-                # Execute the request using the appropriate method
-                if method == 'GET':
-                    response = requests.get(api_request.url, **kwargs)
-                elif method == 'POST':
-                    response = requests.post(api_request.url, **kwargs)
-                elif method == 'PUT':
-                    response = requests.put(api_request.url, **kwargs)
-                elif method == 'DELETE':
-                    response = requests.delete(api_request.url, **kwargs)
-                elif method == 'PATCH':
-                    response = requests.patch(api_request.url, **kwargs)
-                else:
-                    # Default to GET for unknown methods
+                # Unknown methods fall back to GET
+                if method not in ('GET', 'POST', 'PUT', 'DELETE', 'PATCH'):
                     logger.warning(f"Unknown HTTP method: {method}, defaulting to GET")
-                    response = requests.get(api_request.url, **kwargs)
-                    
-                # Calculate response time
-                response_time = (time.time() - start_time) * 1000  # Convert to ms
+                    method = 'GET'
                 
-                # Parse response body depending on content type
-                response_body = response.text
+                # Execute the request on the pooled keep-alive session for this host
+                session = SessionPool.get_session(api_request.url)
+                connections_before = SessionPool.connections_opened(session, api_request.url)
+                with timer:
+                    response = session.request(method, api_request.url, **kwargs)
+                connections_after = SessionPool.connections_opened(session, api_request.url)
+                connection_reused = None
+                if connections_before is not None and connections_after is not None:
+                    connection_reused = connections_after == connections_before
+                    
+                # Stream the body, keeping only a bounded head and tail in memory
+                download_started = time.perf_counter()
+                captured = ResponseCapture.capture(response, spool=spool)
+                timer.add('download', time.perf_counter() - download_started)
                 response_headers = dict(response.headers)
                 
-                # Create and return API response record
-                api_response = ApiResponse.objects.create(
+                # Calculate response time
+                response_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
+                
+                # Build the API response record
+                api_response = ApiResponse(
                     request=api_request,
                     status_code=response.status_code,
                     response_headers=json.dumps(response_headers),
-                    response_body=response_body,
-                    response_time_ms=int(response_time)
+                    response_body=captured.text,
+                    body_size=captured.size,
+                    body_sha256=captured.sha256,
+                    body_truncated=captured.truncated,
+                    body_complete=captured.complete,
+                    body_spool_path=captured.spool_path,
+                    response_time_ms=int(response_time),
+                    connection_reused=connection_reused,
+                    host=SessionPool._host_key(api_request.url),
+                    **timer.as_ms()
                 )
                 
                 return api_response
@@ -151,7 +272,7 @@ class ApiClient:
                 logger.error(f"Request error: {str(e)}")
                 
                 # Calculate elapsed time
-                response_time = (time.time() - start_time) * 1000
+                response_time = (time.perf_counter() - start_time) * 1000
                 
                 # Create API response with error
                 error_status = 500
@@ -162,7 +283,7 @@ class ApiClient:
                 elif isinstance(e, requests.exceptions.HTTPError):
                     error_status = e.response.status_code if e.response else 400
                 
-                api_response = ApiResponse.objects.create(
+                api_response = ApiResponse(
                     request=api_request,
                     status_code=error_status,
                     response_headers=json.dumps({"Content-Type": "application/json"}),
@@ -170,7 +291,9 @@ class ApiClient:
                         "error": str(e),
                         "type": type(e).__name__
                     }),
-                    response_time_ms=int(response_time)
+                    response_time_ms=int(response_time),
+                    host=SessionPool._host_key(api_request.url),
+                    **timer.as_ms()
                 )
                 
                 return api_response
@@ -180,7 +303,7 @@ class ApiClient:
             logger.error(f"Error in execute_request: {str(e)}")
             
             # Create API response with the error
-            api_response = ApiResponse.objects.create(
+            api_response = ApiResponse(
                 request=api_request,
                 status_code=500,  # Server-side issue
                 response_headers=json.dumps({"Content-Type": "application/json"}),
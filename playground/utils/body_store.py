@@ -0,0 +1,211 @@
+import zlib
+import hashlib
+import logging
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F, ProtectedError
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is used instead
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+class BodyStore:
+    """
+    Content-addressed, compressed storage for request/response bodies and headers.
+
+    Each distinct text is stored once in a BodyBlob row keyed by its SHA-256
+    digest and compressed with zstd (when installed) or zlib. Rows reference
+    blobs through foreign keys; the blob keeps a reference count and is
+    deleted when the last row referencing it goes away. Chaos runs replay the
+    same payloads and error responses many times, so most writes only bump a
+    counter.
+
+    Settings (``settings.BODY_STORE``, all optional):
+    - CODEC: 'zstd' or 'zlib' ('zstd' falls back to zlib if zstandard is missing)
+    - LEVEL: compression level
+    - MIN_COMPRESS_SIZE: texts shorter than this many bytes are stored uncompressed
+    """
+
+    DEFAULTS = {
+        'CODEC': 'zlib',
+        'LEVEL': 6,
+        'MIN_COMPRESS_SIZE': 64,
+    }
+
+    CODEC_RAW = 'raw'
+    CODEC_ZLIB = 'zlib'
+    CODEC_ZSTD = 'zstd'
+
+    _warned_zstd = False
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a body store setting, falling back to the class default"""
+        return getattr(settings, 'BODY_STORE', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def digest(text):
+        """SHA-256 hex digest identifying a text"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _codec(cls):
+        codec = cls.get_setting('CODEC')
+        if codec == cls.CODEC_ZSTD and zstandard is None:
+            if not cls._warned_zstd:
+                logger.warning("BODY_STORE CODEC is 'zstd' but zstandard is not installed; using zlib")
+                cls._warned_zstd = True
+            return cls.CODEC_ZLIB
+        return codec
+
+    @classmethod
+    def encode(cls, text):
+        """
+        Compress a text for storage
+
+        Returns:
+            tuple: (digest, codec, data, size) where size is the uncompressed byte length
+        """
+        raw = text.encode('utf-8')
+        codec, data = cls.CODEC_RAW, raw
+        if len(raw) >= cls.get_setting('MIN_COMPRESS_SIZE'):
+            level = cls.get_setting('LEVEL')
+            if cls._codec() == cls.CODEC_ZSTD:
+                compressed = zstandard.ZstdCompressor(level=level).compress(raw)
+                codec_used = cls.CODEC_ZSTD
+            else:
+                compressed = zlib.compress(raw, level)
+                codec_used = cls.CODEC_ZLIB
+            # Keep the raw bytes when compression does not pay off
+            if len(compressed) < len(raw):
+                codec, data = codec_used, compressed
+        return hashlib.sha256(raw).hexdigest(), codec, data, len(raw)
+
+    @classmethod
+    def decode(cls, blob):
+        """Return the text stored in a BodyBlob"""
+        data = bytes(blob.data)
+        if blob.codec == cls.CODEC_ZLIB:
+            data = zlib.decompress(data)
+        elif blob.codec == cls.CODEC_ZSTD:
+            if zstandard is None:
+                raise ImproperlyConfigured(f"Body {blob.digest} is zstd-compressed but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompress(data, max_output_size=blob.size)
+        return data.decode('utf-8')
+
+    @classmethod
+    def put_many(cls, texts):
+        """
+        Store texts and take one reference per occurrence
+
+        Args:
+            texts (list): Texts to store; duplicates share a blob
+
+        Returns:
+            list: The blob digest for each text, in order
+        """
+        from ..models import BodyBlob
+
+        digests = [cls.digest(text) for text in texts]
+        counts = Counter(digests)
+        if not counts:
+            return digests
+
+        first_text = {}
+        for digest, text in zip(digests, texts):
+            first_text.setdefault(digest, text)
+
+        with transaction.atomic():
+            existing = set(BodyBlob.objects.filter(digest__in=list(counts)).values_list('digest', flat=True))
+            for digest, count in counts.items():
+                if digest in existing and BodyBlob.objects.filter(digest=digest).update(
+                    refcount=F('refcount') + count
+                ):
+                    continue
+                cls._create(BodyBlob, first_text[digest], count)
+        return digests
+
+    @classmethod
+    def _create(cls, model, text, count):
+        """Insert a new blob, or add to its count if another writer just created it"""
+        digest, codec, data, size = cls.encode(text)
+        try:
+            with transaction.atomic():
+                model.objects.create(digest=digest, codec=codec, data=data, size=size, refcount=count)
+        except IntegrityError:
+            model.objects.filter(digest=digest).update(refcount=F('refcount') + count)
+
+    @classmethod
+    def put(cls, text):
+        """Store a text and take a reference to it; returns its digest"""
+        return cls.put_many([text])[0]
+
+    @classmethod
+    def release_many(cls, digests):
+        """Drop one reference per digest and delete blobs nobody references any more"""
+        from ..models import BodyBlob
+
+        counts = Counter(digest for digest in digests if digest)
+        if not counts:
+            return
+        with transaction.atomic():
+            for digest, count in counts.items():
+                BodyBlob.objects.filter(digest=digest).update(refcount=F('refcount') - count)
+            try:
+                with transaction.atomic():
+                    BodyBlob.objects.filter(digest__in=list(counts), refcount__lte=0).delete()
+            except ProtectedError:
+                # A count drifted below the real number of references; keep the blobs
+                logger.warning("Body blobs with a zero reference count are still referenced; run BodyStore.recount()")
+
+    @classmethod
+    def recount(cls, apps=None):
+        """
+        Recompute every blob's reference count from the rows that use it and
+        delete unreferenced blobs
+
+        Args:
+            apps: App registry to load models from (a migration's historical apps)
+
+        Returns:
+            int: Number of blobs whose count was corrected or that were deleted
+        """
+        if apps is None:
+            from django.apps import apps
+        BodyBlob = apps.get_model('playground', 'BodyBlob')
+
+        counts = Counter()
+        for model_name, fields in cls.referencing_fields().items():
+            model = apps.get_model('playground', model_name)
+            for field in fields:
+                column = f'{field}_id'
+                for digest in model.objects.filter(**{f'{column}__isnull': False}).values_list(column, flat=True).iterator():
+                    counts[digest] += 1
+
+        changed = []
+        orphans = []
+        for blob in BodyBlob.objects.only('digest', 'refcount').iterator():
+            refcount = counts.get(blob.digest, 0)
+            if refcount == 0:
+                orphans.append(blob.digest)
+            elif blob.refcount != refcount:
+                blob.refcount = refcount
+                changed.append(blob)
+        BodyBlob.objects.bulk_update(changed, ['refcount'], batch_size=500)
+        for start in range(0, len(orphans), 500):
+            BodyBlob.objects.filter(digest__in=orphans[start:start + 500]).delete()
+        return len(changed) + len(orphans)
+
+    @staticmethod
+    def referencing_fields():
+        """Blob foreign keys per model name"""
+        return {
+            'ApiRequest': ('body_blob', 'headers_blob'),
+            'ApiResponse': ('response_body_blob', 'response_headers_blob'),
+        }
@@ -1,262 +1,544 @@
 import json
+import time
 import random
+import hashlib
 import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from django.utils import timezone
-from ..models import ApiRequest, ChaosTestRun
+from ..models import ApiRequest, ChaosTestRun, ChaosMatrixJob
 from .api_client import ApiClient
+from .request_diff import RequestDiff
 
 logger = logging.getLogger(__name__)
 
+
+class ParsedRequest:
+    """
+    An ApiRequest parsed once for mutation.
+    
+    Holds the URL parts, query params, headers and body as Python objects so
+    every chaos variant can be derived without re-parsing JSON. Mutators must
+    treat these values as read-only and copy what they change.
+    """
+    
+    BODY_METHODS = ('POST', 'PUT', 'PATCH')
+    
+    def __init__(self, api_request):
+        self.api_request = api_request
+        self.method = (api_request.method or 'GET').upper()
+        self.url_parts = urlsplit(api_request.url or '')
+        self.query = parse_qsl(self.url_parts.query, keep_blank_values=True)
+        
+        self.headers = {}
+        if api_request.headers and api_request.headers.strip():
+            try:
+                parsed_headers = json.loads(api_request.headers)
+                if isinstance(parsed_headers, dict):
+                    self.headers = parsed_headers
+            except json.JSONDecodeError:
+                logger.warning(f"Failed to parse headers for chaos mutation: {api_request.headers}")
+        
+        self.body = None
+        self.body_is_json = False
+        if api_request.body and api_request.body.strip():
+            try:
+                self.body = json.loads(api_request.body)
+                self.body_is_json = True
+            except json.JSONDecodeError:
+                self.body = api_request.body
+        
+        # Every key path in the JSON body, computed once for field-level mutators
+        self.body_paths = list(self._walk_paths(self.body)) if self.body_is_json else []
+    
+    @staticmethod
+    def _walk_paths(value, prefix=()):
+        """Yield the path of every dict key in a JSON document"""
+        if isinstance(value, dict):
+            for key, child in value.items():
+                yield prefix + (key,)
+                yield from ParsedRequest._walk_paths(child, prefix + (key,))
+        elif isinstance(value, list):
+            for index, child in enumerate(value):
+                yield from ParsedRequest._walk_paths(child, prefix + (index,))
+    
+    @property
+    def sends_body(self):
+        return self.method in self.BODY_METHODS
+    
+    def build_url(self, path=None, query=None):
+        """Rebuild the URL with an optional replacement path and query params"""
+        parts = self.url_parts
+        return urlunsplit((
+            parts.scheme,
+            parts.netloc,
+            parts.path if path is None else path,
+            urlencode(self.query if query is None else query),
+            parts.fragment,
+        ))
+
+
+def _copy_along_path(value, path):
+    """Shallow-copy the containers along a path so the leaf can be changed safely"""
+    root = value.copy()
+    node = root
+    for key in path[:-1]:
+        node[key] = node[key].copy()
+        node = node[key]
+    return root, node
+
+
+def _path_label(path):
+    return '.'.join(str(key) for key in path)
+
+
 class ChaosInjector:
     """Utility for simulating API failures and errors"""
     
+    DEFAULT_WORKERS = 8          # Chaos cases executed in parallel
+    DEFAULT_CASE_DEADLINE = 15   # Per-case timeout in seconds
+    
+    # Mutator for each ChaosTest.fault_type
+    FAULT_MUTATORS = {
+        'MISSING_FIELD': '_mutate_missing_field',
+        'AUTH_FAILURE': '_mutate_auth_failure',
+        'CORRUPT_PAYLOAD': '_mutate_corrupt_payload',
+        'TIMEOUT': '_mutate_timeout',
+        'MISSING_DB': '_mutate_missing_db',
+        'INVALID_PARAM': '_mutate_invalid_param',
+        'OTHER': '_mutate_other',
+    }
+    
+    AUTH_HEADERS = ('authorization', 'x-api-key', 'api-key', 'x-auth-token', 'cookie', 'proxy-authorization')
+    
+    @staticmethod
+    def inject_chaos(original_request, chaos_test, seed=None, progress_callback=None):
+        """
+        Apply a chaos test to an API request and record the outcome
+        
+        Args:
+            original_request (ApiRequest): The request to break
+            chaos_test (ChaosTest): The fault to inject
+            seed (int): Optional seed; defaults to one derived from the request and fault type
+            progress_callback (callable): Optional callback(completed, total) called as requests finish
+            
+        Returns:
+            ChaosTestRun: The recorded run with its modified request and failed response,
+                or None when the fault does not apply to the request (nothing is recorded)
+        """
+        test_runs = ChaosInjector.inject_chaos_variants(
+            original_request, chaos_test, count=1, seed=seed, progress_callback=progress_callback
+        )
+        return test_runs[0] if test_runs else None
+    
+    @staticmethod
+    def inject_chaos_variants(original_request, chaos_test, count=1, seed=None, max_workers=None,
+                              progress_callback=None):
+        """
+        Fan one request out into several chaos variants of the same fault
+        
+        The request is parsed once, every variant is generated in a single
+        pass, and the modified requests, failed responses and chaos runs are
+        each stored with one bulk_create.
+        
+        Args:
+            original_request (ApiRequest): The request to break
+            chaos_test (ChaosTest): The fault to inject
+            count (int): Number of variants to generate
+            seed (int): Optional seed; defaults to one derived from the request and fault type
+            max_workers (int): Number of variants executed in parallel (default DEFAULT_WORKERS)
+            progress_callback (callable): Optional callback(completed, total) called as variants finish
+            
+        Returns:
+            list: The recorded ChaosTestRun objects, one per distinct variant
+        """
+        variants = ChaosInjector.generate_variants(original_request, chaos_test, count=count, seed=seed)
+        if not variants:
+            logger.info(f"'{chaos_test.fault_type}' does not apply to {original_request.url}; nothing recorded")
+            return []
+        
+        modified_requests = ApiRequest.objects.bulk_create([request for request, _ in variants])
+        workers = max_workers or ChaosInjector.DEFAULT_WORKERS
+        failed_responses = ApiClient.execute_batch(
+            modified_requests,
+            max_workers=workers,
+            per_host_limit=workers,
+            timeouts=[deadline for _, deadline in variants],
+            progress_callback=progress_callback
+        )
+        
+        test_runs = ChaosTestRun.objects.bulk_create([
+            ChaosTestRun(
+                chaos_test=chaos_test,
+                original_request=original_request,
+                modified_request=modified_request,
+                failed_response=failed_response,
+                request_diff=RequestDiff.compute(original_request, modified_request)
+            )
+            for modified_request, failed_response in zip(modified_requests, failed_responses)
+        ])
+        
+        logger.info(f"Injected {len(test_runs)} '{chaos_test.fault_type}' variant(s) into {original_request.url}")
+        return test_runs
+    
     @staticmethod
-    def run_chaos_test(chaos_test_run):
+    def run_matrix(job, max_workers=None):
         """
-        Execute a chaos test run with API requests that have various error conditions
+        Apply every chaos test of a job to every request of the job
+        
+        All variants are generated up front (each request is parsed once),
+        identical mutated requests are sent only once, requests and responses
+        are executed and stored through execute_batch, and all ChaosTestRun
+        rows are inserted with one bulk_create. The job keeps its progress and
+        heartbeat up to date and ends with a summary grid of status codes and
+        latencies. Jobs started from the UI are run by ``manage.py job_worker``.
         
         Args:
-            chaos_test_run (ChaosTestRun): The chaos test run to execute
+            job (ChaosMatrixJob): The job to run
+            max_workers (int): Number of requests in flight (default ApiClient.BATCH_MAX_WORKERS)
             
         Returns:
-            bool: True if the test completed successfully
+            bool: True if the job completed successfully
         """
         try:
-            if not chaos_test_run:
-                logger.error("Cannot run chaos test: No chaos test run provided")
-                return False
-                
-            logger.info(f"Starting chaos test run '{chaos_test_run.name}'")
+            api_requests = list(job.api_requests.order_by('-created_at'))
+            chaos_tests = list(job.chaos_tests.order_by('name'))
             
-            # Update test run status
-            chaos_test_run.start_time = timezone.now()
-            chaos_test_run.status = 'IN_PROGRESS'
-            chaos_test_run.save()
+            job.status = 'RUNNING'
+            job.started_at = job.heartbeat_at = timezone.now()
+            job.total_cases = len(api_requests) * len(chaos_tests)
+            job.completed_cases = 0
+            job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'total_cases', 'completed_cases'])
+            logger.info(f"Starting chaos matrix {job.id}: {len(api_requests)} requests x {len(chaos_tests)} tests")
             
-            # Generate and execute requests for each chaos type
-            try:
-                ChaosInjector._generate_malformed_json_requests(chaos_test_run)
-                ChaosInjector._generate_invalid_param_requests(chaos_test_run)
-                ChaosInjector._generate_timeout_requests(chaos_test_run)
-                ChaosInjector._generate_rate_limit_requests(chaos_test_run)
-                ChaosInjector._generate_data_validation_requests(chaos_test_run)
-            except Exception as e:
-                logger.error(f"Error during chaos test run: {str(e)}")
-                chaos_test_run.status = 'FAILED'
-                chaos_test_run.end_time = timezone.now()
-                chaos_test_run.save()
-                return False
+            # Generate every cell, sending identical mutated requests only once
+            unique_requests = []
+            unique_deadlines = []
+            unique_index = {}
+            # (original request, chaos test, index into unique_requests or None if the fault does not apply, deduplicated)
+            cells = []
+            for original_request in api_requests:
+                parsed = ParsedRequest(original_request)
+                for chaos_test in chaos_tests:
+                    variants = ChaosInjector.generate_variants(original_request, chaos_test, count=1, parsed=parsed)
+                    if not variants:
+                        cells.append((original_request, chaos_test, None, False))
+                        continue
+                    request, deadline = variants[0]
+                    signature = ChaosInjector.request_signature(request, deadline)
+                    deduplicated = signature in unique_index
+                    if not deduplicated:
+                        unique_index[signature] = len(unique_requests)
+                        unique_requests.append(request)
+                        unique_deadlines.append(deadline)
+                    cells.append((original_request, chaos_test, unique_index[signature], deduplicated))
+            
+            ApiRequest.objects.bulk_create(unique_requests)
+            
+            last_update = [0.0]
+            def report_progress(completed, total):
+                # Throttle progress writes to about one per second; they double as heartbeats
+                now = time.monotonic()
+                if completed == total or now - last_update[0] >= 1:
+                    last_update[0] = now
+                    ChaosMatrixJob.objects.filter(pk=job.pk).update(
+                        completed_cases=int(completed * len(cells) / total),
+                        heartbeat_at=timezone.now()
+                    )
+            
+            responses = ApiClient.execute_batch(
+                unique_requests,
+                max_workers=max_workers,
+                timeouts=unique_deadlines,
+                progress_callback=report_progress
+            )
+            
+            test_runs = ChaosTestRun.objects.bulk_create([
+                ChaosTestRun(
+                    chaos_test=chaos_test,
+                    original_request=original_request,
+                    modified_request=unique_requests[index],
+                    failed_response=responses[index],
+                    request_diff=RequestDiff.compute(original_request, unique_requests[index])
+                )
+                for original_request, chaos_test, index, _ in cells
+                if index is not None
+            ])
             
-            # Complete the test run
-            chaos_test_run.status = 'COMPLETED'
-            chaos_test_run.end_time = timezone.now()
-            chaos_test_run.save()
+            job.summary = ChaosInjector._build_matrix_summary(api_requests, chaos_tests, cells, responses, test_runs)
+            job.completed_cases = len(cells)
+            job.status = 'COMPLETED'
+            job.finished_at = timezone.now()
+            job.save(update_fields=['summary', 'completed_cases', 'status', 'finished_at'])
             
-            logger.info(f"Completed chaos test run '{chaos_test_run.name}'")
+            logger.info(f"Completed chaos matrix {job.id}: {len(cells)} cells, {len(unique_requests)} requests sent")
             return True
         
         except Exception as e:
-            logger.error(f"Error in run_chaos_test: {str(e)}")
-            
-            # Update test run status if possible
-            if chaos_test_run:
-                chaos_test_run.status = 'FAILED'
-                chaos_test_run.end_time = timezone.now()
-                chaos_test_run.save()
-            
+            logger.error(f"Error in run_matrix: {str(e)}")
+            job.status = 'FAILED'
+            job.error = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
             return False
     
     @staticmethod
-    def _generate_malformed_json_requests(chaos_test_run):
-        """Generate API requests with malformed JSON body"""
-        base_url = chaos_test_run.base_url
+    def _build_matrix_summary(api_requests, chaos_tests, cells, responses, test_runs):
+        """Build the JSON grid stored on a ChaosMatrixJob"""
+        rows = {
+            original_request.id: {
+                'request_id': str(original_request.id),
+                'method': original_request.method,
+                'url': original_request.url,
+                'cells': [],
+            }
+            for original_request in api_requests
+        }
+        status_counts = {}
+        latencies = []
         
-        if not base_url:
-            base_url = "https://httpbin.org/post"  # Default fallback
+        test_runs = iter(test_runs)
+        for original_request, chaos_test, index, deduplicated in cells:
+            if index is None:
+                rows[original_request.id]['cells'].append({'test_id': str(chaos_test.id), 'skipped': True})
+                continue
+            test_run = next(test_runs)
+            response = responses[index]
+            rows[original_request.id]['cells'].append({
+                'test_id': str(chaos_test.id),
+                'run_id': str(test_run.id),
+                'status_code': response.status_code,
+                'response_time_ms': response.response_time_ms,
+                'deduplicated': deduplicated,
+            })
+            status_counts[str(response.status_code)] = status_counts.get(str(response.status_code), 0) + 1
+            latencies.append(response.response_time_ms)
         
-        # Ensure base URL ends with proper path if needed
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
-            
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = 'https://' + base_url
-            
-        malformed_json_cases = [
-            {
-                "description": "Missing closing brace",
-                "body": '{"key": "value"',
-                "headers": json.dumps({"Content-Type": "application/json"})
-            },
-            {
-                "description": "Invalid JSON with unquoted property",
-                "body": '{key: "value"}',
-                "headers": json.dumps({"Content-Type": "application/json"})
-            },
-            {
-                "description": "Trailing comma in JSON object",
-                "body": '{"key": "value",}',
-                "headers": json.dumps({"Content-Type": "application/json"})
-            }
-        ]
-        
-        for case in malformed_json_cases:
-            # Create request
-            request = ApiRequest.objects.create(
-                chaos_test_run=chaos_test_run,
-                url=f"{base_url}/test-json",
-                method="POST",
-                headers=case["headers"],
-                body=case["body"],
-                description=f"Malformed JSON test: {case['description']}"
-            )
-            
-            # Execute request
-            ApiClient.execute_request(request)
+        latencies.sort()
+        return {
+            'tests': [
+                {'id': str(test.id), 'name': test.name, 'fault_type': test.fault_type}
+                for test in chaos_tests
+            ],
+            'rows': list(rows.values()),
+            'status_counts': status_counts,
+            'unique_requests': len(set(index for _, _, index, _ in cells if index is not None)),
+            'deduplicated_cells': sum(1 for cell in cells if cell[3]),
+            'skipped_cells': sum(1 for cell in cells if cell[2] is None),
+            'median_response_time_ms': latencies[len(latencies) // 2] if latencies else 0,
+            'max_response_time_ms': latencies[-1] if latencies else 0,
+        }
     
     @staticmethod
-    def _generate_invalid_param_requests(chaos_test_run):
-        """Generate API requests with invalid parameters"""
-        base_url = chaos_test_run.base_url
+    def generate_variants(original_request, chaos_test, count=1, seed=None, parsed=None):
+        """
+        Generate mutated copies of a request for one fault type without executing them
+        
+        The same seed always yields the same variants. Identical variants are
+        dropped, so fewer than count may be returned for requests with little
+        to mutate, and none when the fault does not apply to the request
+        (e.g. MISSING_FIELD on a request without fields).
         
-        if not base_url:
-            base_url = "https://httpbin.org/get"  # Default fallback
+        Args:
+            original_request (ApiRequest): The request to break
+            chaos_test (ChaosTest): The fault to inject
+            count (int): Number of variants to generate
+            seed (int): Optional seed; defaults to one derived from the request and fault type
+            parsed (ParsedRequest): Optional pre-parsed request, to share parsing across faults
+            
+        Returns:
+            list: (unsaved ApiRequest, deadline in seconds) tuples
+        """
+        if parsed is None:
+            parsed = ParsedRequest(original_request)
+        if seed is None:
+            seed = ChaosInjector.default_seed(original_request, chaos_test)
+        rng = random.Random(seed)
+        mutator = getattr(ChaosInjector, ChaosInjector.FAULT_MUTATORS.get(chaos_test.fault_type, '_mutate_other'))
         
-        # Ensure base URL ends with proper path if needed
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
+        variants = []
+        seen = set()
+        for _ in range(max(1, count)):
+            mutation = mutator(parsed, rng)
+            if mutation is None:
+                break
             
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = 'https://' + base_url
+            headers = original_request.headers
+            if 'headers' in mutation:
+                headers = json.dumps(mutation['headers']) if mutation['headers'] else None
+            body = original_request.body
+            if 'body' in mutation:
+                body = mutation['body']
+                if body is not None and not isinstance(body, str):
+                    body = json.dumps(body)
             
-        invalid_param_cases = [
-            {
-                "description": "Invalid parameter type (string instead of number)",
-                "url_suffix": "?id=abc",
-                "expected_error": "Parameter 'id' must be a number"
-            },
-            {
-                "description": "Missing required parameter",
-                "url_suffix": "",
-                "expected_error": "Missing required parameter"
-            },
-            {
-                "description": "Parameter value out of range",
-                "url_suffix": "?limit=1000000",
-                "expected_error": "Parameter 'limit' out of range"
-            }
-        ]
-        
-        for case in invalid_param_cases:
-            # Create request
-            request = ApiRequest.objects.create(
-                chaos_test_run=chaos_test_run,
-                url=f"{base_url}/test-params{case['url_suffix']}",
-                method="GET",
-                headers=json.dumps({"Content-Type": "application/json"}),
-                description=f"Invalid parameter test: {case['description']}"
+            request = ApiRequest(
+                url=mutation.get('url', original_request.url),
+                method=mutation.get('method', original_request.method),
+                headers=headers,
+                body=body,
+                description=f"Chaos {chaos_test.fault_type}: {mutation['note']}"[:255]
             )
+            deadline = mutation.get('deadline', ChaosInjector.DEFAULT_CASE_DEADLINE)
             
-            # Execute request
-            ApiClient.execute_request(request)
+            signature = ChaosInjector.request_signature(request, deadline)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            variants.append((request, deadline))
+        
+        return variants
     
     @staticmethod
-    def _generate_timeout_requests(chaos_test_run):
-        """Generate API requests that should timeout"""
-        base_url = chaos_test_run.base_url
+    def default_seed(original_request, chaos_test):
+        """
+        Derive a stable seed from the request content and the fault type
         
-        if not base_url:
-            base_url = "https://httpbin.org/delay"  # Default fallback
+        Identical requests broken with the same fault type therefore produce
+        identical variants, which lets matrix runs send them only once.
+        """
+        key = f"{ChaosInjector.request_signature(original_request)}:{chaos_test.fault_type}"
+        return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], 'big')
+    
+    @staticmethod
+    def request_signature(api_request, deadline=None):
+        """Hash of everything that affects how a request is sent, for deduplication"""
+        key = '\x1f'.join(str(part) for part in (
+            api_request.method, api_request.url, api_request.headers, api_request.body,
+            'Malformed JSON test' in (api_request.description or ''), deadline
+        ))
+        return hashlib.sha1(key.encode()).hexdigest()
+    
+    # Fault mutators: each takes (ParsedRequest, Random) and returns a dict with
+    # a 'note' plus any of url / method / headers / body / deadline to override,
+    # or None when the fault cannot be applied to the request.
+    
+    @staticmethod
+    def _mutate_missing_field(parsed, rng):
+        """Remove one field from the JSON body, or one query param if there is no body; None if there is neither"""
+        if parsed.body_paths and parsed.sends_body:
+            path = rng.choice(parsed.body_paths)
+            body, parent = _copy_along_path(parsed.body, path)
+            del parent[path[-1]]
+            return {'body': body, 'note': f"removed body field '{_path_label(path)}'"}
         
-        # Ensure base URL ends with proper path if needed
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
-            
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = 'https://' + base_url
-            
-        # Create request with expected timeout (using httpbin.org/delay/15 which waits 15 seconds)
-        request = ApiRequest.objects.create(
-            chaos_test_run=chaos_test_run,
-            url=f"{base_url}/test-timeout",
-            method="GET",
-            headers=json.dumps({"Content-Type": "application/json"}),
-            description="Request expected to timeout"
-        )
+        if parsed.query:
+            index = rng.randrange(len(parsed.query))
+            query = parsed.query[:index] + parsed.query[index + 1:]
+            return {'url': parsed.build_url(query=query), 'note': f"removed query param '{parsed.query[index][0]}'"}
         
-        # Execute request (should timeout based on client timeout setting)
-        ApiClient.execute_request(request)
+        # Sending the request unchanged would record a chaos run that injected nothing
+        return None
     
     @staticmethod
-    def _generate_rate_limit_requests(chaos_test_run):
-        """Generate API requests that should trigger rate limiting"""
-        base_url = chaos_test_run.base_url
+    def _mutate_auth_failure(parsed, rng):
+        """Strip or invalidate the credentials carried in the headers"""
+        auth_keys = [key for key in parsed.headers if key.lower() in ChaosInjector.AUTH_HEADERS]
+        headers = {key: value for key, value in parsed.headers.items() if key not in auth_keys}
         
-        if not base_url:
-            base_url = "https://httpbin.org/get"  # Default fallback
+        strategy = rng.choice(('strip', 'invalid_token', 'expired_token'))
+        if strategy == 'strip' and auth_keys:
+            return {'headers': headers, 'note': f"removed {', '.join(auth_keys)} header(s)"}
         
-        # Ensure base URL ends with proper path if needed
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
-            
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = 'https://' + base_url
-            
-        # Create multiple requests in rapid succession
-        for i in range(10):
-            request = ApiRequest.objects.create(
-                chaos_test_run=chaos_test_run,
-                url=f"{base_url}/test-rate-limit?request={i}",
-                method="GET",
-                headers=json.dumps({"Content-Type": "application/json"}),
-                description=f"Rate limit test request #{i+1}"
-            )
-            
-            # Execute request - should eventually trigger rate limiting on many APIs
-            ApiClient.execute_request(request)
+        token = '%032x' % rng.getrandbits(128)
+        if strategy == 'expired_token':
+            headers['Authorization'] = f"Bearer expired.{token}"
+            return {'headers': headers, 'note': 'replaced credentials with an expired bearer token'}
+        headers['Authorization'] = f"Bearer invalid-{token}"
+        return {'headers': headers, 'note': 'replaced credentials with an invalid bearer token'}
     
     @staticmethod
-    def _generate_data_validation_requests(chaos_test_run):
-        """Generate API requests with data validation issues"""
-        base_url = chaos_test_run.base_url
+    def _mutate_corrupt_payload(parsed, rng):
+        """Corrupt the serialized body, or the query string for body-less methods"""
+        if not parsed.sends_body:
+            url = parsed.build_url().split('#', 1)[0]
+            url += ('&' if parsed.query else '?') + f"q=%E0%A4%{rng.choice('GHXZ')}"
+            return {'url': url, 'note': 'appended invalid percent-encoding to the query string'}
         
-        if not base_url:
-            base_url = "https://httpbin.org/post"  # Default fallback
+        if parsed.body is None:
+            text = '{"key": "value"}'
+        elif parsed.body_is_json:
+            text = json.dumps(parsed.body)
+        else:
+            text = parsed.body
         
-        # Ensure base URL ends with proper path if needed
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
-            
-        if not base_url.startswith(('http://', 'https://')):
-            base_url = 'https://' + base_url
-            
-        validation_cases = [
-            {
-                "description": "Missing required field",
-                "body": json.dumps({"optional_field": "value"}),
-                "expected_error": "Missing required field"
-            },
-            {
-                "description": "Invalid email format",
-                "body": json.dumps({"email": "not-an-email"}),
-                "expected_error": "Invalid email format"
-            },
-            {
-                "description": "Value exceeds maximum length",
-                "body": json.dumps({"name": "a" * 1000}),
-                "expected_error": "Value exceeds maximum length"
-            }
-        ]
-        
-        for case in validation_cases:
-            # Create request
-            request = ApiRequest.objects.create(
-                chaos_test_run=chaos_test_run,
-                url=f"{base_url}/test-validation",
-                method="POST",
-                headers=json.dumps({"Content-Type": "application/json"}),
-                body=case["body"],
-                description=f"Data validation test: {case['description']}"
-            )
-            
-            # Execute request
-            ApiClient.execute_request(request)
\ No newline at end of file
+        strategy = rng.choice(('truncate', 'drop_closing', 'trailing_comma', 'unquote_key', 'garbage'))
+        if strategy == 'truncate' and len(text) > 1:
+            cut = rng.randrange(1, len(text))
+            text, note = text[:cut], f"truncated the body at byte {cut}"
+        elif strategy == 'trailing_comma' and text.rstrip()[-1:] in ('}', ']'):
+            stripped = text.rstrip()
+            text, note = stripped[:-1] + ',' + stripped[-1], 'added a trailing comma'
+        elif strategy == 'unquote_key' and '":' in text:
+            start = text.find('"')
+            end = text.find('":', start + 1)
+            text, note = text[:start] + text[start + 1:end] + text[end + 1:], 'removed the quotes around a key'
+        elif strategy == 'garbage':
+            position = rng.randrange(len(text) + 1)
+            text, note = text[:position] + '}{' + text[position:], f"inserted garbage at byte {position}"
+        else:
+            text, note = text[:-1] or '{', 'dropped the closing character'
+        
+        headers = dict(parsed.headers)
+        if not any(key.lower() == 'content-type' for key in headers):
+            headers['Content-Type'] = 'application/json'
+        # ApiClient sends bodies of malformed JSON tests verbatim instead of re-encoding them
+        return {'headers': headers, 'body': text, 'note': f"Malformed JSON test: {note}"}
+    
+    @staticmethod
+    def _mutate_timeout(parsed, rng):
+        """
+        Keep the request intact but give our client a deadline it cannot meet
+        
+        The server is not slowed down: the run records a timeout raised by
+        our own client after 1-10 ms, which shows how a caller copes with a
+        timeout, not how the API behaves under a slow dependency.
+        """
+        deadline = round(rng.uniform(0.001, 0.01), 4)
+        return {'deadline': deadline, 'note': f"client-side timeout: our deadline cut to {deadline * 1000:.1f} ms (server not slowed)"}
+    
+    @staticmethod
+    def _mutate_missing_db(parsed, rng):
+        """Point the request at a record that does not exist"""
+        segments = parsed.url_parts.path.rstrip('/').split('/')
+        missing_id = rng.choice((str(rng.randrange(10 ** 8, 10 ** 9)), '%032x' % rng.getrandbits(128)))
+        
+        last = segments[-1] if segments else ''
+        if last.isdigit() or len(last.replace('-', '')) == 32:
+            segments[-1] = missing_id
+            note = f"replaced record id '{last}' with '{missing_id}'"
+        else:
+            segments.append(missing_id)
+            note = f"appended non-existent record id '{missing_id}'"
+        
+        trailing = '/' if parsed.url_parts.path.endswith('/') else ''
+        return {'url': parsed.build_url(path='/'.join(segments) + trailing), 'note': note}
+    
+    @staticmethod
+    def _mutate_invalid_param(parsed, rng):
+        """Give a query param (or body field) a value of the wrong type or range"""
+        bad_values = ('abc', '-1', '999999999999', '', 'null', '1e309', '../../etc/passwd')
+        bad_value = rng.choice(bad_values)
+        
+        if parsed.query:
+            index = rng.randrange(len(parsed.query))
+            name = parsed.query[index][0]
+            query = list(parsed.query)
+            query[index] = (name, bad_value)
+            return {'url': parsed.build_url(query=query), 'note': f"set query param '{name}' to '{bad_value}'"}
+        
+        if parsed.sends_body and parsed.body_paths:
+            path = rng.choice(parsed.body_paths)
+            body, parent = _copy_along_path(parsed.body, path)
+            parent[path[-1]] = rng.choice((bad_value, -1, 10 ** 12, None, [], {}))
+            return {'body': body, 'note': f"set body field '{_path_label(path)}' to an invalid value"}
+        
+        query = list(parsed.query) + [('id', bad_value)]
+        return {'url': parsed.build_url(query=query), 'note': f"added invalid query param id='{bad_value}'"}
+    
+    @staticmethod
+    def _mutate_other(parsed, rng):
+        """Send the request with a content type the API is unlikely to accept"""
+        headers = {key: value for key, value in parsed.headers.items() if key.lower() != 'content-type'}
+        content_type = rng.choice(('text/plain', 'application/xml', 'application/x-www-form-urlencoded'))
+        headers['Content-Type'] = content_type
+        return {'headers': headers, 'note': f"changed Content-Type to {content_type}"}
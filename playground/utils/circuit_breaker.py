@@ -0,0 +1,198 @@
+import time
+import random
+import logging
+import threading
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit breaker is open"""
+
+    def __init__(self, name, retry_in):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_in:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Process-wide circuit breaker guarding calls to an external service.
+
+    CLOSED: calls go through; consecutive failures are counted and the breaker
+    opens once FAILURE_THRESHOLD is reached.
+    OPEN: calls are rejected immediately until the open period has passed. The
+    period grows exponentially (with jitter) each time the breaker re-opens, and
+    is never shorter than a Retry-After the service asked for.
+    HALF_OPEN: a limited number of trial calls go through; a success closes the
+    breaker, a failure opens it again with a longer period.
+
+    Breakers are shared by all threads of a process and looked up by name with
+    ``CircuitBreaker.get(name)``.
+
+    Settings (``settings.CIRCUIT_BREAKERS[name]``, all optional):
+    - FAILURE_THRESHOLD: consecutive failures that open the breaker
+    - RECOVERY_TIMEOUT: seconds the breaker stays open the first time
+    - MAX_RECOVERY_TIMEOUT: upper bound for the open period
+    - BACKOFF_MULTIPLIER: growth factor of the open period on each re-open
+    - JITTER: fraction of the open period randomised to spread out recovery probes
+    - HALF_OPEN_MAX_CALLS: trial calls allowed at once while half-open
+    """
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    DEFAULTS = {
+        'FAILURE_THRESHOLD': 3,
+        'RECOVERY_TIMEOUT': 30,
+        'MAX_RECOVERY_TIMEOUT': 600,
+        'BACKOFF_MULTIPLIER': 2.0,
+        'JITTER': 0.2,
+        'HALF_OPEN_MAX_CALLS': 1,
+    }
+
+    _registry_lock = threading.Lock()
+    _registry = {}
+
+    @classmethod
+    def get(cls, name):
+        """Return the process-wide breaker with the given name, creating it if needed"""
+        with cls._registry_lock:
+            breaker = cls._registry.get(name)
+            if breaker is None:
+                breaker = cls._registry[name] = cls(name)
+            return breaker
+
+    @classmethod
+    def stats(cls):
+        """Return a snapshot of every breaker for monitoring"""
+        with cls._registry_lock:
+            breakers = list(cls._registry.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._open_count = 0  # consecutive times the breaker opened without recovering
+        self._opened_until = 0.0
+        self._half_open_calls = 0
+        self._last_error = None
+        self._rejected = 0
+
+    def get_setting(self, name):
+        """Return a setting for this breaker, falling back to the class default"""
+        return getattr(settings, 'CIRCUIT_BREAKERS', {}).get(self.name, {}).get(name, self.DEFAULTS[name])
+
+    @property
+    def state(self):
+        """Current state, moving OPEN to HALF_OPEN once the open period has passed"""
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def _refresh(self, now):
+        """Apply the time-based OPEN -> HALF_OPEN transition (lock held)"""
+        if self._state == self.OPEN and now >= self._opened_until:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit '{self.name}' half-open, allowing trial calls")
+
+    def before_call(self):
+        """
+        Reserve permission for a call
+
+        Raises:
+            CircuitOpenError: If the breaker is open or all half-open trial slots are taken
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refresh(now)
+            if self._state == self.OPEN:
+                self._rejected += 1
+                raise CircuitOpenError(self.name, self._opened_until - now)
+            if self._state == self.HALF_OPEN:
+                if self._half_open_calls >= self.get_setting('HALF_OPEN_MAX_CALLS'):
+                    self._rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._half_open_calls += 1
+
+    def record_success(self):
+        """Record a successful call, closing the breaker"""
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit '{self.name}' closed after successful call")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._open_count = 0
+            self._half_open_calls = 0
+
+    def record_failure(self, error=None, retry_after=None):
+        """
+        Record a failed call, opening the breaker when the threshold is reached
+
+        A Retry-After from the service opens the breaker straight away, for at
+        least the requested time.
+
+        Args:
+            error: The exception or message describing the failure
+            retry_after (float): Seconds the service asked callers to wait, if any
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refresh(now)
+            self._failures += 1
+            self._last_error = str(error) if error else None
+
+            should_open = (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.get_setting('FAILURE_THRESHOLD')
+                or retry_after is not None
+            )
+            if should_open:
+                self._open(now, retry_after)
+
+    def _open(self, now, retry_after=None):
+        """Move to OPEN for a jittered, exponentially growing period (lock held)"""
+        self._open_count += 1
+        period = min(
+            self.get_setting('MAX_RECOVERY_TIMEOUT'),
+            self.get_setting('RECOVERY_TIMEOUT') * self.get_setting('BACKOFF_MULTIPLIER') ** (self._open_count - 1),
+        )
+        jitter = self.get_setting('JITTER')
+        period *= random.uniform(1 - jitter, 1 + jitter)
+        if retry_after is not None:
+            period = max(period, retry_after)
+
+        self._state = self.OPEN
+        self._opened_until = now + period
+        self._half_open_calls = 0
+        logger.warning(f"Circuit '{self.name}' opened for {period:.1f}s after {self._failures} failure(s)")
+
+    def snapshot(self):
+        """Return the breaker state as a dict"""
+        now = time.monotonic()
+        with self._lock:
+            self._refresh(now)
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'open_count': self._open_count,
+                'retry_in_seconds': round(max(0.0, self._opened_until - now), 1) if self._state == self.OPEN else 0.0,
+                'rejected_calls': self._rejected,
+                'last_error': self._last_error,
+            }
+
+    def reset(self):
+        """Close the breaker and clear its counters"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._open_count = 0
+            self._opened_until = 0.0
+            self._half_open_calls = 0
+            self._last_error = None
+            self._rejected = 0
@@ -0,0 +1,101 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .metric_rollup import MetricRollup
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardStats:
+    """
+    Statistics shown on the dashboard stat cards.
+
+    Figures are read from the incrementally maintained rollup counters (see
+    MetricRollup), so the cost does not grow with the history; ``manage.py
+    reconcile_metrics --check`` compares them with the source tables. The
+    result is cached for a short TTL. Creating or deleting rows
+    of the counted models drops the cache entry (see playground.receivers), so
+    the TTL only bounds staleness between processes that do not share the cache.
+
+    Settings (``settings.DASHBOARD_STATS``, all optional):
+    - TTL: seconds the computed stats are cached
+    - CACHE_ALIAS: alias in ``settings.CACHES`` holding the cached stats
+    """
+
+    DEFAULTS = {
+        'TTL': 15,
+        'CACHE_ALIAS': 'default',
+    }
+
+    CACHE_KEY = 'dashboard:stats'
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a stats setting, falling back to the class default"""
+        return getattr(settings, 'DASHBOARD_STATS', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def _cache(cls):
+        from django.core.cache import caches
+        return caches[cls.get_setting('CACHE_ALIAS')]
+
+    @classmethod
+    def get(cls):
+        """
+        Return the dashboard statistics, from the cache when fresh
+
+        Returns:
+            dict: Counts and rates keyed by the names used in the index template
+        """
+        try:
+            stats = cls._cache().get(cls.CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Dashboard stats cache lookup failed: {str(e)}")
+            stats = None
+
+        if stats is None:
+            stats = cls.compute()
+            try:
+                cls._cache().set(cls.CACHE_KEY, stats, timeout=cls.get_setting('TTL'))
+            except Exception as e:
+                logger.warning(f"Dashboard stats cache write failed: {str(e)}")
+        return stats
+
+    @classmethod
+    def compute(cls):
+        """Read the statistics from the rollup counters (two indexed queries)"""
+        since = timezone.now() - timedelta(hours=24)
+        totals = MetricRollup.totals()
+        return cls._build(
+            api_requests=totals.get('api_requests.total', 0),
+            responses=totals.get('api_responses.total', 0),
+            successful=totals.get('api_responses.successful', 0),
+            chaos_runs=totals.get('chaos_runs.total', 0),
+            # Hourly buckets: the first hour may be counted in full
+            chaos_runs_24h=MetricRollup.sum_since('chaos_runs.hourly', since),
+            rcas=totals.get('rcas.total', 0),
+            high_confidence=totals.get('rcas.confidence.HIGH', 0),
+        )
+
+    @staticmethod
+    def _build(api_requests, responses, successful, chaos_runs, chaos_runs_24h, rcas, high_confidence):
+        """Shape raw counts into the dict used by the index template"""
+        return {
+            'api_requests_count': api_requests,
+            'total_responses': responses,
+            'successful_responses': successful,
+            'api_success_rate': int((successful / responses) * 100) if responses > 0 else 0,
+            'chaos_runs_count': chaos_runs,
+            'recent_chaos_tests': chaos_runs_24h,
+            'rca_count': rcas,
+            'fixed_issues_count': high_confidence,
+        }
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the cached statistics so the next read recomputes them"""
+        try:
+            cls._cache().delete(cls.CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Dashboard stats cache invalidation failed: {str(e)}")
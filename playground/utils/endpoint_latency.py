@@ -0,0 +1,265 @@
+import re
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from urllib.parse import urlsplit
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Path segments that identify a resource rather than an endpoint
+_ID_SEGMENT = re.compile(
+    r'^(\d+|[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}|[0-9a-f]{16,}|[A-Za-z0-9_-]{32,})$',
+    re.IGNORECASE,
+)
+
+
+class EndpointLatency:
+    """
+    Latency histograms per endpoint and time bucket in EndpointLatencyBucket.
+
+    Every stored ApiResponse adds its ``response_time_ms`` to the
+    LatencyHistogram of its ``(method, normalized URL)`` for the time bucket
+    it was created in (see playground.receivers). Percentiles over any
+    window merge the few bucket histograms it covers instead of reading raw
+    responses, so the cost depends on the number of endpoints and buckets,
+    not on the number of responses. Windows are widened to whole buckets.
+
+    Responses that are deleted later stay in the histograms, which record
+    what was observed; ``rebuild`` recomputes them from the responses still
+    stored (``manage.py reconcile_metrics``).
+
+    Settings (``settings.ENDPOINT_LATENCY``, all optional):
+    - BUCKET_SECONDS: width of a time bucket
+    - WINDOW_HOURS: default window of the percentile views
+    - PERCENTILES: percentiles reported
+    """
+
+    DEFAULTS = {
+        'BUCKET_SECONDS': 300,
+        'WINDOW_HOURS': 24,
+        'PERCENTILES': (50, 90, 99),
+    }
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return an endpoint latency setting, falling back to the class default"""
+        return getattr(settings, 'ENDPOINT_LATENCY', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def normalize_url(url):
+        """
+        Endpoint of a URL: scheme, host and path with IDs replaced by ``{id}``
+
+        The query string and fragment are dropped, so
+        ``https://api.example.com/todos/42/?page=2`` becomes
+        ``https://api.example.com/todos/{id}/``.
+        """
+        parts = urlsplit(url or '')
+        segments = ['{id}' if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split('/')]
+        endpoint = f"{parts.scheme}://{parts.netloc.lower()}{'/'.join(segments) or '/'}"
+        return endpoint[:500]  # EndpointLatencyBucket.endpoint max_length
+
+    @classmethod
+    def bucket_start(cls, moment):
+        """Start (in UTC) of the time bucket containing a datetime"""
+        if timezone.is_aware(moment):
+            moment = moment.astimezone(dt_timezone.utc)
+        else:
+            moment = moment.replace(tzinfo=dt_timezone.utc)
+        seconds = cls.get_setting('BUCKET_SECONDS')
+        epoch = int(moment.timestamp())
+        return datetime.fromtimestamp(epoch - epoch % seconds, tz=dt_timezone.utc)
+
+    @classmethod
+    def _requests_for(cls, responses):
+        """Map request_id -> (method, url), loading the requests not already cached"""
+        ApiRequest = global_apps.get_model('playground', 'ApiRequest')
+        found = {}
+        missing = set()
+        for response in responses:
+            if response.request_id is None:
+                continue
+            if type(response).request.is_cached(response):
+                found[response.request_id] = (response.request.method, response.request.url)
+            else:
+                missing.add(response.request_id)
+        missing -= set(found)
+        if missing:
+            for request_id, method, url in ApiRequest.objects.filter(id__in=missing).values_list('id', 'method', 'url'):
+                found[request_id] = (method, url)
+        return found
+
+    @classmethod
+    def record(cls, responses):
+        """
+        Add newly stored responses to their endpoint histograms
+
+        Args:
+            responses: Iterable of saved ApiResponse instances
+        """
+        responses = list(responses)
+        requests = cls._requests_for(responses)
+        changes = defaultdict(LatencyHistogram)
+        for response in responses:
+            if response.request_id not in requests or response.response_time_ms is None:
+                continue
+            method, url = requests[response.request_id]
+            key = ((method or 'GET').upper(), cls.normalize_url(url), cls.bucket_start(response.created_at or timezone.now()))
+            changes[key].record(response.response_time_ms)
+        if changes:
+            cls.apply(changes)
+
+    @classmethod
+    def apply(cls, changes):
+        """Merge a {(method, endpoint, bucket): LatencyHistogram} mapping into the stored rows"""
+        EndpointLatencyBucket = global_apps.get_model('playground', 'EndpointLatencyBucket')
+        for (method, endpoint, bucket), histogram in changes.items():
+            for _ in range(2):
+                try:
+                    with transaction.atomic():
+                        row = EndpointLatencyBucket.objects.select_for_update().filter(
+                            method=method, endpoint=endpoint, bucket=bucket
+                        ).first()
+                        if row is None:
+                            EndpointLatencyBucket.objects.create(
+                                method=method, endpoint=endpoint, bucket=bucket,
+                                count=histogram.count, histogram=histogram.to_dict(),
+                            )
+                        else:
+                            merged = LatencyHistogram.from_dict(row.histogram).merge(histogram)
+                            row.count = merged.count
+                            row.histogram = merged.to_dict()
+                            row.save(update_fields=['count', 'histogram', 'updated_at'])
+                    break
+                except IntegrityError:
+                    # Created concurrently; the retry merges into it
+                    continue
+
+    @classmethod
+    def window(cls, start=None, end=None, hours=None):
+        """
+        Resolve a window to (start, end), defaulting to the last WINDOW_HOURS
+
+        Args:
+            start (datetime): Window start, or None
+            end (datetime): Window end, or None for now
+            hours (float): Window length used when start is None
+        """
+        end = end or timezone.now()
+        start = start or end - timedelta(hours=hours or cls.get_setting('WINDOW_HOURS'))
+        return start, end
+
+    @classmethod
+    def _buckets(cls, start, end, method=None, endpoint=None):
+        EndpointLatencyBucket = global_apps.get_model('playground', 'EndpointLatencyBucket')
+        rows = EndpointLatencyBucket.objects.filter(bucket__gte=cls.bucket_start(start), bucket__lte=end)
+        if method:
+            rows = rows.filter(method=method.upper())
+        if endpoint:
+            rows = rows.filter(endpoint=endpoint)
+        return rows
+
+    @classmethod
+    def _summary(cls, histogram):
+        summary = {'count': histogram.count}
+        summary.update(histogram.percentiles(cls.get_setting('PERCENTILES')))
+        summary['mean'] = round(histogram.mean, 2) if histogram.count else None
+        return summary
+
+    @classmethod
+    def percentiles(cls, start, end, method=None, endpoint=None):
+        """
+        Latency percentiles per endpoint over a window
+
+        Returns:
+            list: {'method', 'endpoint', 'count', 'p50', ..., 'max', 'mean'} dicts, busiest endpoint first
+        """
+        merged = defaultdict(LatencyHistogram)
+        for row_method, row_endpoint, data in cls._buckets(start, end, method, endpoint).values_list(
+            'method', 'endpoint', 'histogram'
+        ).iterator():
+            merged[(row_method, row_endpoint)].merge(LatencyHistogram.from_dict(data))
+
+        endpoints = [
+            {'method': row_method, 'endpoint': row_endpoint, **cls._summary(histogram)}
+            for (row_method, row_endpoint), histogram in merged.items()
+        ]
+        endpoints.sort(key=lambda item: (-item['count'], item['endpoint'], item['method']))
+        return endpoints
+
+    @classmethod
+    def series(cls, start, end, method, endpoint):
+        """Percentiles of one endpoint per time bucket over a window, oldest first"""
+        rows = cls._buckets(start, end, method, endpoint).order_by('bucket').values_list('bucket', 'histogram')
+        return [
+            {'bucket': bucket.isoformat(), **cls._summary(LatencyHistogram.from_dict(data))}
+            for bucket, data in rows
+        ]
+
+    @classmethod
+    def compute(cls, apps=None):
+        """
+        Compute every histogram from the stored responses
+
+        Returns:
+            dict: {(method, endpoint, bucket): LatencyHistogram}
+        """
+        apps = apps or global_apps
+        ApiResponse = apps.get_model('playground', 'ApiResponse')
+        histograms = defaultdict(LatencyHistogram)
+        rows = ApiResponse.objects.order_by().values_list(
+            'request__method', 'request__url', 'created_at', 'response_time_ms'
+        )
+        for method, url, created_at, response_time_ms in rows.iterator(chunk_size=2000):
+            key = ((method or 'GET').upper(), cls.normalize_url(url), cls.bucket_start(created_at))
+            histograms[key].record(response_time_ms)
+        return histograms
+
+    @classmethod
+    def rebuild(cls, apps=None):
+        """
+        Replace every histogram with one recomputed from the stored responses
+
+        Returns:
+            int: Number of histogram rows stored
+        """
+        apps = apps or global_apps
+        EndpointLatencyBucket = apps.get_model('playground', 'EndpointLatencyBucket')
+        with transaction.atomic():
+            histograms = cls.compute(apps)
+            EndpointLatencyBucket.objects.all().delete()
+            EndpointLatencyBucket.objects.bulk_create([
+                EndpointLatencyBucket(
+                    method=method, endpoint=endpoint, bucket=bucket,
+                    count=histogram.count, histogram=histogram.to_dict(),
+                )
+                for (method, endpoint, bucket), histogram in histograms.items()
+            ], batch_size=500)
+        return len(histograms)
+
+    @classmethod
+    def drift(cls):
+        """
+        Compare stored histogram counts with the stored responses
+
+        Returns:
+            dict: {(method, endpoint, bucket): (stored, actual)} for every count that differs
+        """
+        EndpointLatencyBucket = global_apps.get_model('playground', 'EndpointLatencyBucket')
+        stored = {
+            (method, endpoint, bucket): count
+            for method, endpoint, bucket, count in EndpointLatencyBucket.objects.values_list(
+                'method', 'endpoint', 'bucket', 'count'
+            )
+        }
+        actual = {key: histogram.count for key, histogram in cls.compute().items()}
+        return {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(stored) | set(actual)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
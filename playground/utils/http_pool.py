@@ -0,0 +1,152 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from .request_timing import TimedHTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Per-process pool of keep-alive HTTP sessions, one per target host.
+
+    Each host gets its own ``requests.Session`` with a sized connection pool so
+    repeated calls to the same API reuse TCP/TLS connections instead of paying
+    the handshake on every request. Sessions that sit idle are closed and the
+    number of hosts kept open is capped (least recently used first).
+
+    Settings (``settings.HTTP_POOL``, all optional):
+    - POOL_CONNECTIONS: number of urllib3 pools cached per session
+    - POOL_MAXSIZE: max connections kept alive per host
+    - POOL_BLOCK: block when the pool is exhausted instead of opening extra connections
+    - IDLE_TIMEOUT: seconds a host session may sit unused before it is closed
+    - MAX_HOSTS: max number of host sessions kept open at once
+    """
+
+    DEFAULTS = {
+        'POOL_CONNECTIONS': 10,
+        'POOL_MAXSIZE': 20,
+        'POOL_BLOCK': False,
+        'IDLE_TIMEOUT': 90,
+        'MAX_HOSTS': 100,
+    }
+
+    _lock = threading.Lock()
+    _sessions = OrderedDict()  # host key -> [session, last_used]
+    _pid = None
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a pool setting, falling back to the class default"""
+        return getattr(settings, 'HTTP_POOL', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def _host_key(url):
+        """Build the pool key (scheme, host, port) for a URL"""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return f"{parts.scheme}://{(parts.hostname or '').lower()}:{port}"
+
+    @classmethod
+    def _build_session(cls):
+        """Create a session with a sized, timed adapter and no cookie persistence"""
+        session = requests.Session()
+        adapter = TimedHTTPAdapter(
+            pool_connections=cls.get_setting('POOL_CONNECTIONS'),
+            pool_maxsize=cls.get_setting('POOL_MAXSIZE'),
+            pool_block=cls.get_setting('POOL_BLOCK'),
+            max_retries=0,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # Requests recorded by the tester must not leak cookies into each other
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    @classmethod
+    def get_session(cls, url):
+        """
+        Get the pooled session for the host of the given URL
+
+        Args:
+            url (str): The URL that is about to be requested
+
+        Returns:
+            requests.Session: A keep-alive session dedicated to that host
+        """
+        key = cls._host_key(url)
+        now = time.monotonic()
+        with cls._lock:
+            # Sessions must never be shared across forked worker processes
+            if cls._pid != os.getpid():
+                cls._sessions.clear()
+                cls._pid = os.getpid()
+
+            cls._evict_idle(now)
+
+            entry = cls._sessions.get(key)
+            if entry is None:
+                entry = [cls._build_session(), now]
+                cls._sessions[key] = entry
+                while len(cls._sessions) > cls.get_setting('MAX_HOSTS'):
+                    _, (old_session, _) = cls._sessions.popitem(last=False)
+                    old_session.close()
+            else:
+                entry[1] = now
+                cls._sessions.move_to_end(key)
+
+            return entry[0]
+
+    @classmethod
+    def _evict_idle(cls, now):
+        """Close host sessions that have been idle longer than IDLE_TIMEOUT (lock held)"""
+        idle_timeout = cls.get_setting('IDLE_TIMEOUT')
+        # The dict is kept in LRU order, so stop at the first fresh entry
+        while cls._sessions:
+            key, (session, last_used) = next(iter(cls._sessions.items()))
+            if now - last_used <= idle_timeout:
+                break
+            del cls._sessions[key]
+            session.close()
+            logger.debug(f"Closed idle HTTP session for {key}")
+
+    @staticmethod
+    def connections_opened(session, url):
+        """
+        Return how many connections the session has opened so far for a URL.
+
+        Sessions are per host, so the total over the adapter's urllib3 pools is
+        the host's count. Comparing the value before and after a request tells
+        whether the request reused a kept-alive connection. Concurrent requests
+        to the same host make this best-effort.
+        """
+        try:
+            pools = session.get_adapter(url).poolmanager.pools
+            return sum(pools[key].num_connections for key in pools.keys())
+        except Exception:
+            return None
+
+    @classmethod
+    def stats(cls):
+        """Return a snapshot of the open host sessions for monitoring"""
+        now = time.monotonic()
+        with cls._lock:
+            return {
+                key: {'idle_seconds': round(now - last_used, 1)}
+                for key, (session, last_used) in cls._sessions.items()
+            }
+
+    @classmethod
+    def close_all(cls):
+        """Close every pooled session"""
+        with cls._lock:
+            for session, _ in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
@@ -0,0 +1,43 @@
+from django.utils import timezone
+
+
+class JobClaim:
+    """
+    Claims rows of a job table for a worker without locks or a broker.
+
+    The next waiting row is picked with a plain SELECT and flipped to RUNNING
+    with an UPDATE conditioned on its status still being the waiting one, so
+    when several workers pick the same row only one UPDATE matches and the
+    others try again with the next row. Used by RcaQueue and JobWorker; job
+    models need ``status``, ``worker_id``, ``started_at`` and ``heartbeat_at``.
+    """
+
+    ATTEMPTS = 5  # rows tried before giving up when other workers keep winning
+
+    @classmethod
+    def claim(cls, queryset, worker_id, waiting_status, order_by):
+        """
+        Claim the first waiting job of a queryset for a worker
+
+        Args:
+            queryset (QuerySet): Jobs to pick from; its select_related applies to the returned job
+            worker_id (str): Name recorded on the claimed job
+            waiting_status (str): Status of jobs that can be claimed
+            order_by (tuple): Order in which waiting jobs are claimed
+
+        Returns:
+            The claimed job, or None when there is none
+        """
+        for _ in range(cls.ATTEMPTS):
+            candidate = queryset.filter(status=waiting_status).order_by(*order_by).values_list('pk', flat=True).first()
+            if candidate is None:
+                return None
+
+            # Only one worker can flip the row out of the waiting status
+            now = timezone.now()
+            claimed = queryset.filter(pk=candidate, status=waiting_status).update(
+                status='RUNNING', worker_id=worker_id, started_at=now, heartbeat_at=now
+            )
+            if claimed:
+                return queryset.get(pk=candidate)
+        return None
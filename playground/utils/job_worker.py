@@ -0,0 +1,119 @@
+import os
+import time
+import socket
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from ..models import ChaosMatrixJob, LoadTestRun
+from .job_claim import JobClaim
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Runs long background jobs (chaos matrix jobs and load tests) outside the web server.
+
+    Views only create PENDING jobs; worker processes started with
+    ``manage.py job_worker`` claim them with JobClaim's conditional UPDATE, as
+    RcaQueue does, and run them to completion. A web worker restart
+    therefore never interrupts a job. Running jobs refresh ``heartbeat_at``
+    as they make progress; a job whose worker stopped sending heartbeats
+    for STALE_AFTER seconds is marked FAILED instead of staying RUNNING
+    forever. Jobs are not retried, since a partial run has already sent its
+    requests.
+
+    Settings (``settings.JOB_WORKER``, all optional):
+    - POLL_INTERVAL: seconds an idle worker waits before polling again
+    - STALE_AFTER: seconds without a heartbeat after which a RUNNING job is marked FAILED
+    """
+
+    DEFAULTS = {
+        'POLL_INTERVAL': 1.0,
+        'STALE_AFTER': 120,
+    }
+
+    STALE_CHECK_INTERVAL = 60  # seconds between checks for abandoned jobs
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a job worker setting, falling back to the class default"""
+        return getattr(settings, 'JOB_WORKER', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def kinds():
+        """(model, runner) per kind of job, in the order they are claimed"""
+        from .chaos_injector import ChaosInjector
+        from .load_generator import LoadGenerator
+        return ((ChaosMatrixJob, ChaosInjector.run_matrix), (LoadTestRun, LoadGenerator.run))
+
+    @classmethod
+    def claim(cls, model, worker_id):
+        """
+        Claim the oldest pending job of a model for a worker
+
+        Returns:
+            The claimed job, or None when there is none
+        """
+        return JobClaim.claim(model.objects.all(), worker_id, 'PENDING', ('created_at',))
+
+    @classmethod
+    def fail_stale(cls):
+        """Mark RUNNING jobs whose worker stopped sending heartbeats as FAILED"""
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=cls.get_setting('STALE_AFTER'))
+        count = 0
+        for model, _ in cls.kinds():
+            count += model.objects.filter(
+                Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+                status='RUNNING',
+            ).update(status='FAILED', error='Abandoned: the worker running this job stopped', finished_at=now)
+        if count:
+            logger.warning(f"Marked {count} abandoned background job(s) as failed")
+        return count
+
+    @classmethod
+    def run_worker(cls, worker_id=None, max_jobs=None, stop_event=None, exit_when_empty=False):
+        """
+        Run jobs until stopped
+
+        Args:
+            worker_id (str): Name recorded on claimed jobs (default host:pid)
+            max_jobs (int): Stop after running this many jobs
+            stop_event: Optional threading/multiprocessing Event that stops the loop
+            exit_when_empty (bool): Stop as soon as no job is pending
+
+        Returns:
+            int: Number of jobs run
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        poll_interval = cls.get_setting('POLL_INTERVAL')
+        processed = 0
+        last_stale_check = 0.0
+
+        logger.info(f"Job worker {worker_id} started")
+        while not (stop_event and stop_event.is_set()):
+            if time.monotonic() - last_stale_check > cls.STALE_CHECK_INTERVAL:
+                cls.fail_stale()
+                last_stale_check = time.monotonic()
+
+            ran = False
+            for model, runner in cls.kinds():
+                job = cls.claim(model, worker_id)
+                if job is not None:
+                    runner(job)
+                    processed += 1
+                    ran = True
+                    break
+
+            if max_jobs and processed >= max_jobs:
+                break
+            if not ran:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_interval)
+
+        logger.info(f"Job worker {worker_id} stopped after {processed} job(s)")
+        return processed
@@ -0,0 +1,111 @@
+import math
+
+
+class LatencyHistogram:
+    """
+    Compact, mergeable latency histogram with logarithmic buckets.
+
+    Bucket ``i`` holds values up to ``MIN_MS * GROWTH ** i``, so every value
+    is known to within ``GROWTH - 1`` (2%) relative error whatever its
+    magnitude, and the whole range from MIN_MS to MAX_MS needs a fixed number
+    of buckets (about 1000). Only non-empty buckets are stored, which keeps
+    typical histograms to a few dozen entries. Histograms built with the same
+    constants can be merged by adding bucket counts, so per-worker or
+    per-time-bucket histograms combine into exact aggregates.
+    """
+
+    MIN_MS = 0.01          # values at or below this land in bucket 0
+    MAX_MS = 3600 * 1000   # values above this are clamped to the last bucket
+    GROWTH = 1.02          # ratio between consecutive bucket bounds
+
+    _LOG_GROWTH = math.log(GROWTH)
+    MAX_INDEX = math.ceil(math.log(MAX_MS / MIN_MS) / _LOG_GROWTH)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def bucket_index(cls, value):
+        """Index of the bucket holding a value in ms"""
+        if value <= cls.MIN_MS:
+            return 0
+        index = math.ceil(math.log(value / cls.MIN_MS) / cls._LOG_GROWTH)
+        return min(index, cls.MAX_INDEX)
+
+    @classmethod
+    def bucket_upper_bound(cls, index):
+        """Largest value (in ms) that falls in a bucket"""
+        return cls.MIN_MS * cls.GROWTH ** index
+
+    def record(self, value, count=1):
+        """Add ``count`` observations of a latency in ms"""
+        index = self.bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Add the observations of another histogram to this one; returns self"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """
+        Latency in ms below which ``percent`` of the observations fall
+
+        The bucket's upper bound is returned, clamped to the observed min/max,
+        so the result overestimates by at most the bucket width.
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(max(self.bucket_upper_bound(index), self.min), self.max)
+        return self.max
+
+    def percentiles(self, percents=(50, 90, 99)):
+        """``{'p50': ..., 'p90': ..., 'max': ...}`` rounded to 0.01 ms"""
+        summary = {f'p{p}': self.percentile(p) for p in percents}
+        summary['max'] = self.max
+        return {key: round(value, 2) if value is not None else None for key, value in summary.items()}
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        """JSON-serialisable form (bucket indexes become string keys)"""
+        return {
+            'buckets': {str(index): count for index, count in sorted(self.buckets.items())},
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a histogram from ``to_dict`` output (None or {} gives an empty one)"""
+        histogram = cls()
+        if data:
+            histogram.buckets = {int(index): count for index, count in data.get('buckets', {}).items()}
+            histogram.count = data.get('count', 0)
+            histogram.total = data.get('total', 0.0)
+            histogram.min = data.get('min')
+            histogram.max = data.get('max')
+        return histogram
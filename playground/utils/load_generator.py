@@ -0,0 +1,236 @@
+import time
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.utils import timezone
+from ..models import LoadTestRun
+from .api_client import ApiClient
+from .latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class LoadStats:
+    """Thread-safe aggregate of the hits of one load test"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histogram = LatencyHistogram()
+        self.status_counts = Counter()
+        self.errors = 0
+        self.seconds = {}  # second of the run -> [completed, errors, throttled, histogram]
+        self.last_completed_at = None
+
+    def record(self, second, status_code, latency_ms):
+        with self._lock:
+            self.histogram.record(latency_ms)
+            self.status_counts[status_code] += 1
+            bucket = self.seconds.get(second)
+            if bucket is None:
+                bucket = self.seconds[second] = [0, 0, 0, LatencyHistogram()]
+            bucket[0] += 1
+            bucket[3].record(latency_ms)
+            if status_code >= 400:
+                self.errors += 1
+                bucket[1] += 1
+            if status_code == 429:
+                bucket[2] += 1
+            self.last_completed_at = time.perf_counter()
+
+    @property
+    def completed(self):
+        return self.histogram.count
+
+    def timeline(self):
+        """Per-second rows for LoadTestRun.timeline"""
+        with self._lock:
+            return [
+                {
+                    'second': second,
+                    'completed': completed,
+                    'errors': errors,
+                    'throttled': throttled,
+                    'p99_ms': histogram.percentiles((99,))['p99'],
+                }
+                for second, (completed, errors, throttled, histogram) in sorted(self.seconds.items())
+            ]
+
+
+class LoadGenerator:
+    """
+    Replays one saved API request under load and stores aggregated results.
+
+    RPS mode is open loop: request ``i`` is scheduled at ``start + i / rps``
+    whatever happens to earlier requests, and its latency is measured from
+    that scheduled time. A slow server therefore shows up as growing latency
+    instead of silently lowering the offered rate (no coordinated omission).
+    Requests that would exceed MAX_OUTSTANDING in flight are counted as
+    dropped rather than queued without bound. CONCURRENCY mode is closed
+    loop: N workers send back to back and latency is measured per request.
+
+    Hits go through ApiClient's request path (same headers, body handling
+    and pooled keep-alive sessions) but no ApiResponse rows are written; the
+    run keeps a LatencyHistogram, status counts and a per-second timeline.
+    The request's headers and body are loaded before any thread starts, so
+    the sending threads never touch the database.
+
+    Runs started from the UI are executed by ``manage.py job_worker`` (see
+    JobWorker), never inside a web worker, so the number of job worker
+    processes caps how many load tests run at once. Progress writes double
+    as heartbeats; a run whose worker dies is marked FAILED.
+
+    Settings (``settings.LOAD_TEST``, all optional):
+    - MAX_DURATION: longest allowed run in seconds
+    - MAX_RPS: highest allowed target rate
+    - MAX_CONCURRENCY: most allowed concurrent workers
+    - WORKERS: threads sending requests in RPS mode
+    - MAX_OUTSTANDING: requests allowed in flight or waiting for a thread in RPS mode
+    - TIMEOUT: per-request timeout in seconds
+    """
+
+    DEFAULTS = {
+        'MAX_DURATION': 300,
+        'MAX_RPS': 500,
+        'MAX_CONCURRENCY': 100,
+        'WORKERS': 100,
+        'MAX_OUTSTANDING': 1000,
+        'TIMEOUT': 10,
+    }
+
+    PROGRESS_INTERVAL = 1  # seconds between progress writes
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a load test setting, falling back to the class default"""
+        return getattr(settings, 'LOAD_TEST', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def run(cls, load_test):
+        """
+        Execute a load test and store its aggregated results
+
+        Args:
+            load_test (LoadTestRun): The run to execute
+
+        Returns:
+            bool: True if the run completed
+        """
+        try:
+            api_request = load_test.api_request
+            # stored_text attributes load their blobs on first access; do it here, not in the sending threads
+            api_request.headers, api_request.body
+            load_test.status = 'RUNNING'
+            load_test.started_at = load_test.heartbeat_at = timezone.now()
+            load_test.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+            logger.info(f"Starting load test {load_test.id} against {api_request.url}")
+
+            stats = LoadStats()
+            started = time.perf_counter()
+            if load_test.mode == 'CONCURRENCY':
+                dropped = cls._run_closed_loop(load_test, api_request, stats, started)
+            else:
+                dropped = cls._run_open_loop(load_test, api_request, stats, started)
+
+            elapsed = (stats.last_completed_at or time.perf_counter()) - started
+            summary = stats.histogram.percentiles((50, 90, 99))
+            load_test.total_requests = stats.completed
+            load_test.error_requests = stats.errors
+            load_test.dropped_requests = dropped
+            load_test.throughput_rps = round(stats.completed / elapsed, 2) if elapsed > 0 else None
+            load_test.p50_ms = summary['p50']
+            load_test.p90_ms = summary['p90']
+            load_test.p99_ms = summary['p99']
+            load_test.max_ms = summary['max']
+            load_test.status_counts = {str(code): count for code, count in sorted(stats.status_counts.items())}
+            load_test.latency_histogram = stats.histogram.to_dict()
+            load_test.timeline = stats.timeline()
+            load_test.status = 'COMPLETED'
+            load_test.finished_at = timezone.now()
+            load_test.save()
+
+            logger.info(
+                f"Completed load test {load_test.id}: {stats.completed} requests, "
+                f"{load_test.get_error_rate()}% errors, p99 {load_test.p99_ms} ms"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Error in load test {load_test.id}: {str(e)}")
+            load_test.status = 'FAILED'
+            load_test.error = str(e)
+            load_test.finished_at = timezone.now()
+            load_test.save(update_fields=['status', 'error', 'finished_at'])
+            return False
+
+    @classmethod
+    def _hit(cls, api_request, stats, started, sent_at):
+        """Send one request and record its latency since ``sent_at``"""
+        # Hits are not stored, so nothing would ever refer to (or delete) a spooled body
+        response = ApiClient._perform_request(api_request, timeout=cls.get_setting('TIMEOUT'), spool=False)
+        latency_ms = (time.perf_counter() - sent_at) * 1000
+        stats.record(int(sent_at - started), response.status_code, latency_ms)
+
+    @classmethod
+    def _run_open_loop(cls, load_test, api_request, stats, started):
+        """Start requests on a fixed schedule; returns the number dropped"""
+        interval = 1 / load_test.target_rps
+        total = int(load_test.target_rps * load_test.duration_seconds)
+        max_outstanding = cls.get_setting('MAX_OUTSTANDING')
+        outstanding = [0]
+        lock = threading.Lock()
+        dropped = 0
+
+        def hit(scheduled):
+            try:
+                cls._hit(api_request, stats, started, scheduled)
+            finally:
+                with lock:
+                    outstanding[0] -= 1
+
+        last_progress = started
+        with ThreadPoolExecutor(max_workers=cls.get_setting('WORKERS'), thread_name_prefix='load') as executor:
+            for i in range(total):
+                scheduled = started + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                with lock:
+                    if outstanding[0] >= max_outstanding:
+                        dropped += 1
+                        continue
+                    outstanding[0] += 1
+                executor.submit(hit, scheduled)
+
+                if time.perf_counter() - last_progress >= cls.PROGRESS_INTERVAL:
+                    last_progress = time.perf_counter()
+                    cls._report_progress(load_test, stats)
+        return dropped
+
+    @classmethod
+    def _run_closed_loop(cls, load_test, api_request, stats, started):
+        """Keep N requests in flight until the duration ends; nothing is dropped"""
+        deadline = started + load_test.duration_seconds
+
+        def worker():
+            while time.perf_counter() < deadline:
+                cls._hit(api_request, stats, started, time.perf_counter())
+
+        threads = [
+            threading.Thread(target=worker, name=f"load-{load_test.id}-{n}", daemon=True)
+            for n in range(load_test.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=cls.PROGRESS_INTERVAL)
+                cls._report_progress(load_test, stats)
+        return 0
+
+    @staticmethod
+    def _report_progress(load_test, stats):
+        LoadTestRun.objects.filter(pk=load_test.pk).update(
+            total_requests=stats.completed, error_requests=stats.errors, heartbeat_at=timezone.now()
+        )
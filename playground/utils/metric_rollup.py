@@ -0,0 +1,193 @@
+import logging
+from collections import Counter
+from datetime import timezone as dt_timezone
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class MetricRollup:
+    """
+    Incrementally maintained dashboard counters stored in MetricCounter.
+
+    Signal receivers (playground.receivers) call ``record`` with +1 or -1 as
+    rows are created or deleted, so reads are a lookup of a few counter rows
+    however large the history grows. ``rebuild`` recomputes every counter
+    from the source tables to repair drift (e.g. after raw SQL changes).
+
+    Metrics:
+    - api_requests.total
+    - api_responses.total, api_responses.successful (2xx/3xx)
+    - chaos_runs.total, chaos_runs.hourly (bucketed by hour)
+    - rcas.total, rcas.confidence.<HIGH|MEDIUM|LOW>
+    """
+
+    @staticmethod
+    def hour_bucket(moment):
+        """Truncate a datetime to the start of its hour (in UTC)"""
+        if timezone.is_aware(moment):
+            moment = moment.astimezone(dt_timezone.utc)
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def counters_for(cls, instance):
+        """
+        Return the (name, bucket) counters a row contributes to
+
+        Args:
+            instance: ApiRequest, ApiResponse, ChaosTestRun or RootCauseAnalysis instance
+
+        Returns:
+            list: (metric name, bucket or None) tuples
+        """
+        model_name = instance._meta.model_name
+        if model_name == 'apirequest':
+            return [('api_requests.total', None)]
+        if model_name == 'apiresponse':
+            counters = [('api_responses.total', None)]
+            if 200 <= instance.status_code < 400:
+                counters.append(('api_responses.successful', None))
+            return counters
+        if model_name == 'chaostestrun':
+            created_at = instance.created_at or timezone.now()
+            return [('chaos_runs.total', None), ('chaos_runs.hourly', cls.hour_bucket(created_at))]
+        if model_name == 'rootcauseanalysis':
+            return [('rcas.total', None), (f'rcas.confidence.{instance.confidence}', None)]
+        return []
+
+    @classmethod
+    def record(cls, instances, delta):
+        """
+        Add ``delta`` to the counters of the given rows
+
+        Args:
+            instances: Iterable of counted model instances
+            delta (int): +1 for created rows, -1 for deleted rows
+        """
+        changes = Counter()
+        for instance in instances:
+            for counter in cls.counters_for(instance):
+                changes[counter] += delta
+        if changes:
+            cls.apply(changes)
+
+    @classmethod
+    def apply(cls, changes):
+        """Apply a {(name, bucket): delta} mapping with atomic increments"""
+        MetricCounter = global_apps.get_model('playground', 'MetricCounter')
+        for (name, bucket), delta in changes.items():
+            if not delta:
+                continue
+            for _ in range(2):
+                updated = MetricCounter.objects.filter(name=name, bucket=bucket).update(
+                    value=F('value') + delta, updated_at=timezone.now()
+                )
+                if updated:
+                    break
+                try:
+                    with transaction.atomic():
+                        MetricCounter.objects.create(name=name, bucket=bucket, value=delta)
+                    break
+                except IntegrityError:
+                    # Created concurrently; the retried update will find it
+                    continue
+
+    @classmethod
+    def totals(cls):
+        """
+        Return every all-time counter
+
+        Returns:
+            dict: metric name -> value
+        """
+        MetricCounter = global_apps.get_model('playground', 'MetricCounter')
+        return dict(MetricCounter.objects.filter(bucket__isnull=True).values_list('name', 'value'))
+
+    @classmethod
+    def sum_since(cls, name, since):
+        """Sum an hourly metric over the buckets from the hour containing ``since``"""
+        MetricCounter = global_apps.get_model('playground', 'MetricCounter')
+        total = MetricCounter.objects.filter(name=name, bucket__gte=cls.hour_bucket(since)).aggregate(total=Sum('value'))['total']
+        return total or 0
+
+    @classmethod
+    def compute(cls, apps=None):
+        """
+        Compute every counter from the source tables
+
+        Args:
+            apps: App registry to load models from (the historical one in migrations)
+
+        Returns:
+            dict: {(name, bucket): value}
+        """
+        apps = apps or global_apps
+        ApiRequest = apps.get_model('playground', 'ApiRequest')
+        ApiResponse = apps.get_model('playground', 'ApiResponse')
+        ChaosTestRun = apps.get_model('playground', 'ChaosTestRun')
+        RootCauseAnalysis = apps.get_model('playground', 'RootCauseAnalysis')
+
+        values = {('api_requests.total', None): ApiRequest.objects.count()}
+
+        responses = ApiResponse.objects.order_by().aggregate(
+            total=Count('id'),
+            successful=Count('id', filter=Q(status_code__gte=200, status_code__lt=400)),
+        )
+        values[('api_responses.total', None)] = responses['total']
+        values[('api_responses.successful', None)] = responses['successful']
+
+        values[('chaos_runs.total', None)] = 0
+        hourly = (
+            ChaosTestRun.objects.order_by().annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc))
+            .values('hour').annotate(count=Count('id'))
+        )
+        for row in hourly:
+            values[('chaos_runs.hourly', row['hour'])] = row['count']
+            values[('chaos_runs.total', None)] += row['count']
+
+        values[('rcas.total', None)] = 0
+        for row in RootCauseAnalysis.objects.order_by().values('confidence').annotate(count=Count('id')):
+            values[(f"rcas.confidence.{row['confidence']}", None)] = row['count']
+            values[('rcas.total', None)] += row['count']
+
+        return values
+
+    @classmethod
+    def rebuild(cls, apps=None):
+        """
+        Replace every counter with values recomputed from the source tables
+
+        Returns:
+            dict: {(name, bucket): value} as stored
+        """
+        apps = apps or global_apps
+        MetricCounter = apps.get_model('playground', 'MetricCounter')
+        with transaction.atomic():
+            values = cls.compute(apps)
+            MetricCounter.objects.all().delete()
+            MetricCounter.objects.bulk_create([
+                MetricCounter(name=name, bucket=bucket, value=value)
+                for (name, bucket), value in values.items()
+            ])
+        return values
+
+    @classmethod
+    def drift(cls):
+        """
+        Compare stored counters with the source tables
+
+        Returns:
+            dict: {(name, bucket): (stored, actual)} for every counter that differs
+        """
+        MetricCounter = global_apps.get_model('playground', 'MetricCounter')
+        stored = {(row.name, row.bucket): row.value for row in MetricCounter.objects.all()}
+        actual = cls.compute()
+        return {
+            key: (stored.get(key, 0), actual.get(key, 0))
+            for key in set(stored) | set(actual)
+            if stored.get(key, 0) != actual.get(key, 0)
+        }
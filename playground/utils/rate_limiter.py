@@ -1,54 +1,357 @@
+import os
+import math
+import mmap
 import time
-from datetime import datetime
-from collections import defaultdict, deque
-from rest_framework.response import Response
-from rest_framework import status
-
-class WeakRateLimiter:
-    """
-    A deliberately weak rate limiter that will fail after ~10 requests
-    in a short time period. This is designed to be vulnerable to high traffic.
-    """
-    # Track request timestamps per IP address
-    request_history = defaultdict(lambda: deque(maxlen=100))
-    
-    # Increased threshold to allow more API requests
-    MAX_REQUESTS = 50  # Maximum number of requests allowed (increased from 10)
-    TIME_WINDOW = 10   # Time window in seconds
-    
-    @classmethod
-    def is_rate_limited(cls, request):
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# Outcome of a rate limit check; times are in seconds from now
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'limit', 'remaining', 'reset_after', 'retry_after'])
+
+
+class SlidingWindowCounter:
+    """
+    Sliding-window counter: the count of the current fixed window plus the
+    previous window's count weighted by how much of it still overlaps the
+    sliding window. Constant time and three numbers of state per key.
+
+    State: (window_start, current_count, previous_count)
+    """
+
+    name = 'sliding_window'
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+
+    def consume(self, state, now):
+        """
+        Count one request against the state
+
+        Returns:
+            tuple: (new_state, ttl_seconds, RateLimitResult)
+        """
+        window_start = now - (now % self.window)
+        current = previous = 0.0
+        if state is not None:
+            last_start, current, previous = state
+            if window_start - last_start >= 2 * self.window:
+                current = previous = 0.0
+            elif window_start - last_start >= self.window:
+                current, previous = 0.0, current
+
+        weight = 1.0 - (now - window_start) / self.window
+        estimated = previous * weight + current
+        allowed = estimated + 1 <= self.limit
+        if allowed:
+            current += 1
+            estimated += 1
+
+        reset_after = window_start + self.window - now
+        retry_after = 0.0
+        if not allowed:
+            # Time until the decaying previous window leaves room for one more request
+            room = self.limit - 1 - current
+            if previous > 0 and room >= 0:
+                retry_after = max(0.0, window_start + self.window * (1 - room / previous) - now)
+            else:
+                retry_after = reset_after
+
+        result = RateLimitResult(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=max(0, int(self.limit - estimated)),
+            reset_after=reset_after,
+            retry_after=retry_after,
+        )
+        # Once two windows have passed the state is equivalent to a fresh one
+        return (window_start, current, previous), 2 * self.window, result
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to ``limit`` tokens, refilled at ``limit`` tokens
+    per ``window`` seconds. Allows short bursts up to the bucket size.
+
+    State: (tokens, last_refill, unused)
+    """
+
+    name = 'token_bucket'
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.rate = limit / window
+
+    def consume(self, state, now):
         """
-        Check if the request should be rate limited.
-        Returns True if the request should be blocked.
+        Take one token from the bucket if available
+
+        Returns:
+            tuple: (new_state, ttl_seconds, RateLimitResult)
         """
-        # Don't rate limit internal requests or API response detail views
-        path = request.path_info if hasattr(request, 'path_info') else ''
-        if 'api-response' in path:
-            return False
-            
-        # Get client IP (or a default value if not available)
-        client_ip = request.META.get('REMOTE_ADDR', '0.0.0.0')
-        current_time = time.time()
-        
-        # Add current timestamp to the request history
-        cls.request_history[client_ip].append(current_time)
-        
-        # Count requests within the time window
-        recent_requests = [
-            req_time for req_time in cls.request_history[client_ip]
-            if current_time - req_time < cls.TIME_WINDOW
-        ]
-        
-        # More forgiving implementation
-        return len(recent_requests) > cls.MAX_REQUESTS
-    
+        tokens = float(self.limit)
+        if state is not None:
+            tokens = min(self.limit, state[0] + max(0.0, now - state[1]) * self.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        reset_after = (self.limit - tokens) / self.rate
+        result = RateLimitResult(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=int(tokens),
+            reset_after=reset_after,
+            retry_after=0.0 if allowed else (1 - tokens) / self.rate,
+        )
+        # A bucket that has refilled completely is equivalent to a fresh one
+        return (tokens, now, 0.0), reset_after, result
+
+
+class LocalStore:
+    """
+    In-process state store: a bounded LRU dict with expiring entries.
+
+    Only suitable for a single process; every worker process keeps its own counts.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, state)
+
+    def update(self, key, consume, now):
+        """Apply ``consume`` to the state of a key atomically and return its result"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            state = entry[1] if entry and entry[0] > now else None
+            new_state, ttl, result = consume(state, now)
+            self._entries[key] = (now + ttl, new_state)
+
+            # Drop expired entries from the least recently used end, then enforce the cap
+            while self._entries:
+                oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+                if expires_at > now and len(self._entries) <= self.max_keys:
+                    break
+                del self._entries[oldest_key]
+            return result
+
+
+class CacheStore:
+    """
+    State store backed by a Django cache alias, for limits shared across hosts.
+
+    Updates are a read followed by a write, so concurrent requests for the
+    same key may occasionally both be allowed. Expiry is left to the cache.
+    """
+
+    KEY_PREFIX = 'ratelimit:'
+
+    def __init__(self, alias):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+
+    def update(self, key, consume, now):
+        """Apply ``consume`` to the state of a key and return its result"""
+        cache_key = self.KEY_PREFIX + hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        new_state, ttl, result = consume(self.cache.get(cache_key), now)
+        self.cache.set(cache_key, new_state, timeout=max(1, math.ceil(ttl)))
+        return result
+
+
+class SharedMemoryStore:
+    """
+    State store shared by every process on the host through a memory-mapped file.
+
+    The file holds a fixed-size open-addressing hash table, so memory is
+    bounded by MAX_KEYS. Each slot stores a 64-bit key hash, an expiry time and
+    the algorithm state. Expired slots are reused and, when all probed slots
+    are live, the one closest to expiry is evicted. Updates hold an exclusive
+    ``flock`` on the file so gunicorn workers see one consistent count.
+    """
+
+    SLOT = struct.Struct('<Qdddd')  # key hash, expires_at, three state values
+    PROBE_LIMIT = 16
+
+    def __init__(self, path, max_keys):
+        self.path = path
+        self.slots = max_keys
+        self.size = max_keys * self.SLOT.size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+
+    def _ensure_open(self):
+        """Map the table into this process (lock held); re-map after a fork"""
+        if self._pid == os.getpid():
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size != self.size:
+                # New file, or MAX_KEYS changed: start from an empty table
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self.size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.size)
+        self._pid = os.getpid()
+
     @staticmethod
-    def get_rate_limit_response():
+    def _hash(key):
+        """64-bit key hash; 0 marks an empty slot"""
+        value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+        return value or 1
+
+    def _find_slot(self, key_hash, now):
+        """Return (slot index, live state or None) for a key (file lock held)"""
+        start = key_hash % self.slots
+        free_slot = None
+        victim, victim_expiry = start, math.inf
+
+        for probe in range(self.PROBE_LIMIT):
+            index = (start + probe) % self.slots
+            slot_hash, expires_at, a, b, c = self.SLOT.unpack_from(self._map, index * self.SLOT.size)
+            if slot_hash == key_hash:
+                return index, ((a, b, c) if expires_at > now else None)
+            if slot_hash == 0 or expires_at <= now:
+                if free_slot is None:
+                    free_slot = index
+            elif expires_at < victim_expiry:
+                victim, victim_expiry = index, expires_at
+
+        return (free_slot if free_slot is not None else victim), None
+
+    def update(self, key, consume, now):
+        """Apply ``consume`` to the state of a key atomically across processes"""
+        key_hash = self._hash(key)
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                index, state = self._find_slot(key_hash, now)
+                new_state, ttl, result = consume(state, now)
+                self.SLOT.pack_into(self._map, index * self.SLOT.size, key_hash, now + ttl, *new_state)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return result
+
+
+class RateLimiter:
+    """
+    Rate limiter with pluggable algorithms and state stores.
+
+    Each check is constant time. By default state lives in a shared-memory
+    table so the limit holds across all worker processes on the host rather
+    than being multiplied by the number of workers.
+
+    Settings (``settings.RATE_LIMIT``, all optional):
+    - ENABLED: turn rate limiting on or off
+    - ALGORITHM: 'sliding_window' or 'token_bucket'
+    - MAX_REQUESTS: requests allowed per TIME_WINDOW
+    - TIME_WINDOW: window length in seconds
+    - STORE: 'shared_memory' (all processes on the host), 'cache' (Django cache
+      alias, for several hosts) or 'local' (per process)
+    - SHM_PATH: file backing the shared-memory store
+    - MAX_KEYS: max clients tracked at once (bounds memory)
+    - CACHE_ALIAS: cache alias used by the 'cache' store
+    - POLICIES: per-route limits applied by RateLimitMiddleware (see playground.middleware)
+    """
+
+    DEFAULTS = {
+        'ENABLED': True,
+        'ALGORITHM': 'sliding_window',
+        'MAX_REQUESTS': 50,
+        'TIME_WINDOW': 10,
+        'STORE': 'shared_memory',
+        'SHM_PATH': None,
+        'MAX_KEYS': 8192,
+        'CACHE_ALIAS': 'default',
+        'POLICIES': [],
+    }
+
+    ALGORITHMS = {
+        SlidingWindowCounter.name: SlidingWindowCounter,
+        TokenBucket.name: TokenBucket,
+    }
+
+    _store_lock = threading.Lock()
+    _store = None
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a rate limit setting, falling back to the class default"""
+        return getattr(settings, 'RATE_LIMIT', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def get_store(cls):
+        """Return the process-wide state store selected in settings"""
+        with cls._store_lock:
+            if cls._store is None:
+                cls._store = cls._build_store()
+            return cls._store
+
+    @classmethod
+    def _build_store(cls):
+        store = cls.get_setting('STORE')
+        max_keys = cls.get_setting('MAX_KEYS')
+        if store == 'cache':
+            return CacheStore(cls.get_setting('CACHE_ALIAS'))
+        if store == 'shared_memory':
+            if fcntl is None:
+                logger.warning("Shared-memory rate limit store needs fcntl; using a per-process store")
+                return LocalStore(max_keys)
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+            path = cls.get_setting('SHM_PATH') or os.path.join(shm_dir, 'fixit_ai_ratelimit')
+            return SharedMemoryStore(path, max_keys)
+        return LocalStore(max_keys)
+
+    def __init__(self, limit=None, window=None, algorithm=None, scope='default', store=None):
+        self.limit = limit or self.get_setting('MAX_REQUESTS')
+        self.window = window or self.get_setting('TIME_WINDOW')
+        self.scope = scope
+        self.algorithm = self.ALGORITHMS[algorithm or self.get_setting('ALGORITHM')](self.limit, self.window)
+        self._store = store
+
+    def check(self, key, now=None):
         """
-        Return a standardized response for rate-limited requests
+        Count a request for a client key
+
+        Args:
+            key (str): Client identifier, e.g. the IP address
+            now (float): Current time (defaults to time.time())
+
+        Returns:
+            RateLimitResult: Whether the request is allowed, plus header data
         """
-        return Response(
-            {"error": "Too many requests. Please try again later."},
-            status=status.HTTP_429_TOO_MANY_REQUESTS
-        )
\ No newline at end of file
+        store = self._store or self.get_store()
+        return store.update(f"{self.scope}:{key}", self.algorithm.consume, time.time() if now is None else now)
+
+    @staticmethod
+    def headers(result):
+        """Build the RateLimit-* (and Retry-After when blocked) headers for a result"""
+        headers = {
+            'RateLimit-Limit': str(result.limit),
+            'RateLimit-Remaining': str(result.remaining),
+            'RateLimit-Reset': str(math.ceil(result.reset_after)),
+        }
+        if not result.allowed:
+            headers['Retry-After'] = str(max(1, math.ceil(result.retry_after)))
+        return headers
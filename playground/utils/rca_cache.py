@@ -0,0 +1,204 @@
+import re
+import json
+import time
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RcaCache:
+    """
+    Cache of generated RCA data keyed by a normalized failure fingerprint.
+
+    Two failures share a fingerprint when they hit the same URL template with
+    the same method, status code and fault type, and return the same error
+    body once volatile values (ids, numbers, timestamps) are masked. A repeated
+    failure can then reuse the earlier analysis instead of calling Gemini.
+
+    Entries live in a per-process LRU with a TTL. When a Django cache alias is
+    configured as the backend, entries are also written there so they survive
+    restarts and are shared by all worker processes.
+
+    Settings (``settings.RCA_CACHE``, all optional):
+    - ENABLED: turn the cache on or off
+    - TTL: seconds an entry stays valid
+    - MAX_ENTRIES: max entries kept in the in-process LRU
+    - BACKEND: alias in ``settings.CACHES`` used as the persistent backend (None to disable)
+    """
+
+    DEFAULTS = {
+        'ENABLED': True,
+        'TTL': 3600,
+        'MAX_ENTRIES': 1000,
+        'BACKEND': None,
+    }
+
+    KEY_PREFIX = 'rca:'
+    MAX_BODY_CHARS = 2000
+
+    # Patterns masked out of URLs and error bodies before hashing
+    UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+    TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?')
+    HEX_RE = re.compile(r'\b[0-9a-f]{16,}\b', re.IGNORECASE)
+    NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+    WHITESPACE_RE = re.compile(r'\s+')
+
+    _lock = threading.Lock()
+    _entries = OrderedDict()  # fingerprint -> (expires_at, rca_data)
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a cache setting, falling back to the class default"""
+        return getattr(settings, 'RCA_CACHE', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def _backend(cls):
+        """Return the configured Django cache used as persistent backend, if any"""
+        alias = cls.get_setting('BACKEND')
+        if not alias:
+            return None
+        from django.core.cache import caches
+        return caches[alias]
+
+    @classmethod
+    def _mask(cls, text):
+        """Replace volatile values with placeholders"""
+        text = cls.UUID_RE.sub('{uuid}', text)
+        text = cls.TIMESTAMP_RE.sub('{ts}', text)
+        text = cls.HEX_RE.sub('{hex}', text)
+        text = cls.NUMBER_RE.sub('{n}', text)
+        return cls.WHITESPACE_RE.sub(' ', text).strip()
+
+    @classmethod
+    def url_template(cls, url):
+        """Reduce a URL to its template: host, masked path and sorted query param names"""
+        parts = urlsplit(url or '')
+        path = '/'.join(cls._mask(segment) for segment in parts.path.split('/'))
+        params = sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)})
+        return f"{parts.netloc.lower()}{path}?{'&'.join(params)}"
+
+    @classmethod
+    def fingerprint(cls, context):
+        """
+        Build the failure fingerprint for an RCA context
+
+        Args:
+            context: Context dict from RcaEngine._build_context_from_chaos_run
+                or RcaEngine._build_context_from_api_response
+
+        Returns:
+            str: Hex digest identifying this kind of failure
+        """
+        if context.get('source_type') == 'chaos_test':
+            request = context['modified_request']
+            response = context['failed_response']
+            fault_type = context['chaos_test']['fault_type']
+        else:
+            request = context['request']
+            response = context['response']
+            fault_type = ''
+
+        body = response.get('body')
+        if not isinstance(body, str):
+            body = json.dumps(body, sort_keys=True)
+
+        key = '\x1f'.join((
+            context.get('source_type', ''),
+            (request.get('method') or '').upper(),
+            cls.url_template(request.get('url')),
+            str(response.get('status_code')),
+            fault_type,
+            cls._mask(body[:cls.MAX_BODY_CHARS]),
+        ))
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def get(cls, fingerprint):
+        """
+        Look up cached RCA data
+
+        Returns:
+            dict: A copy of the cached RCA data, or None on a miss
+        """
+        if not cls.get_setting('ENABLED'):
+            return None
+
+        now = time.time()
+        with cls._lock:
+            entry = cls._entries.get(fingerprint)
+            if entry and entry[0] > now:
+                cls._entries.move_to_end(fingerprint)
+                cls.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry:
+                del cls._entries[fingerprint]
+
+        backend = cls._backend()
+        if backend is not None:
+            try:
+                rca_data = backend.get(cls.KEY_PREFIX + fingerprint)
+            except Exception as e:
+                logger.warning(f"RCA cache backend lookup failed: {str(e)}")
+                rca_data = None
+            if rca_data is not None:
+                cls._store_local(fingerprint, rca_data, now)
+                with cls._lock:
+                    cls.hits += 1
+                return copy.deepcopy(rca_data)
+
+        with cls._lock:
+            cls.misses += 1
+        return None
+
+    @classmethod
+    def set(cls, fingerprint, rca_data):
+        """Store RCA data under a fingerprint"""
+        if not cls.get_setting('ENABLED'):
+            return
+
+        rca_data = copy.deepcopy(rca_data)
+        cls._store_local(fingerprint, rca_data, time.time())
+
+        backend = cls._backend()
+        if backend is not None:
+            try:
+                backend.set(cls.KEY_PREFIX + fingerprint, rca_data, timeout=cls.get_setting('TTL'))
+            except Exception as e:
+                logger.warning(f"RCA cache backend write failed: {str(e)}")
+
+    @classmethod
+    def _store_local(cls, fingerprint, rca_data, now):
+        """Insert into the in-process LRU, evicting the oldest entries past MAX_ENTRIES"""
+        with cls._lock:
+            cls._entries[fingerprint] = (now + cls.get_setting('TTL'), rca_data)
+            cls._entries.move_to_end(fingerprint)
+            while len(cls._entries) > cls.get_setting('MAX_ENTRIES'):
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def stats(cls):
+        """Return hit/miss counters and the in-process entry count"""
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            return {
+                'hits': cls.hits,
+                'misses': cls.misses,
+                'hit_rate': round(cls.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(cls._entries),
+            }
+
+    @classmethod
+    def clear(cls):
+        """Drop every in-process entry and reset the counters"""
+        with cls._lock:
+            cls._entries.clear()
+            cls.hits = 0
+            cls.misses = 0
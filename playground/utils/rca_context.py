@@ -0,0 +1,300 @@
+import re
+import json
+import logging
+from http import HTTPStatus
+from html import unescape
+from django.conf import settings
+from .request_diff import RequestDiff
+
+logger = logging.getLogger(__name__)
+
+
+class ContextCompactor:
+    """
+    Shrink an RCA context so its prompt section fits a token budget.
+
+    Contexts keep the full request and response data; this only changes what
+    is written into the Gemini prompt. The parts that explain a failure come
+    first and are kept whole: the status line, error fields of the response
+    body (keys such as ``error``, ``message`` or ``detail``), the changes a
+    chaos test made to the request and a selection of headers. Bulky parts
+    are summarized: long arrays keep their first items, deep objects and long
+    strings are cut, and HTML pages are reduced to their title, headings and
+    the start of their text.
+
+    ``fit`` renders a context at increasingly compact LEVELS until the
+    estimated size is within budget, then cuts the text as a last resort.
+    Renderers put the least useful sections last, so those go first.
+    Credentials in headers are never sent; only their scheme and length are.
+
+    Settings (``settings.RCA_CONTEXT``, all optional):
+    - TOKEN_BUDGET: estimated tokens allowed for the details of one failure
+    - HEADERS: headers always kept (matched case-insensitively)
+    - HEADER_PREFIXES: header name prefixes always kept, e.g. rate limit headers
+    """
+
+    DEFAULTS = {
+        'TOKEN_BUDGET': 2000,
+        'HEADERS': (
+            'content-type', 'content-length', 'accept', 'authorization', 'www-authenticate',
+            'retry-after', 'location', 'allow', 'x-request-id',
+        ),
+        'HEADER_PREFIXES': ('x-ratelimit', 'ratelimit', 'x-error'),
+    }
+
+    CHARS_PER_TOKEN = 4  # rough estimate used for budgeting
+
+    # Compaction steps, tried in turn: list items, object keys, nesting depth,
+    # characters per string, characters of a text body
+    LEVELS = (
+        {'items': 10, 'keys': 40, 'depth': 8, 'chars': 2000, 'text': 8000},
+        {'items': 3, 'keys': 15, 'depth': 4, 'chars': 300, 'text': 2000},
+        {'items': 1, 'keys': 6, 'depth': 2, 'chars': 80, 'text': 600},
+    )
+
+    MAX_ERROR_FIELDS = 20
+    MAX_CHANGES = 30
+
+    ERROR_KEY_RE = re.compile(
+        r'error|message|detail|reason|code|status|title|description|hint|violation|exception|fault|cause|invalid',
+        re.IGNORECASE,
+    )
+
+    HTML_START_RE = re.compile(r'\s*(?:<!doctype\s+html|<html)', re.IGNORECASE)
+    HTML_HIDDEN_RE = re.compile(r'<(script|style|head|noscript)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+    HTML_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+    HTML_HEADING_RE = re.compile(r'<h[1-3][^>]*>(.*?)</h[1-3]\s*>', re.IGNORECASE | re.DOTALL)
+    HTML_TAG_RE = re.compile(r'<[^>]*>')
+    WHITESPACE_RE = re.compile(r'\s+')
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a context compaction setting, falling back to the class default"""
+        return getattr(settings, 'RCA_CONTEXT', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def estimate_tokens(cls, text):
+        """Roughly estimate the number of tokens in a piece of text"""
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    @classmethod
+    def fit(cls, context, render, token_budget=None):
+        """
+        Render the most complete compacted context that fits the budget
+
+        Args:
+            context: Context dict from RcaEngine._build_context_from_*
+            render: Callable formatting a compacted context into prompt text
+            token_budget: Estimated tokens allowed (default TOKEN_BUDGET)
+
+        Returns:
+            str: The prompt text
+        """
+        token_budget = token_budget or cls.get_setting('TOKEN_BUDGET')
+        for level in cls.LEVELS:
+            text = render(cls.compact(context, level))
+            if cls.estimate_tokens(text) <= token_budget:
+                return text
+
+        limit = token_budget * cls.CHARS_PER_TOKEN
+        logger.info(f"RCA context still {len(text)} chars at the most compact level; cutting it to {limit}")
+        return text[:limit] + "\n... [remaining details omitted to fit the prompt budget]\n"
+
+    @classmethod
+    def compact(cls, context, level=None):
+        """
+        Compacted copy of an RCA context
+
+        Requests and responses keep their keys, with compacted ``headers`` and
+        ``body``, plus ``other_headers`` (names of the headers left out).
+        Responses gain ``status_line`` and ``error_fields`` ({path: value});
+        chaos test contexts gain ``changes``, lines describing the request diff
+        (see RequestDiff).
+
+        Args:
+            context: Context dict from RcaEngine._build_context_from_*
+            level: One of LEVELS (default the most complete)
+        """
+        level = level or cls.LEVELS[0]
+        compacted = dict(context)
+        if context.get('source_type') == 'chaos_test':
+            original = context['original_request']
+            modified = context['modified_request']
+            diff = context.get('request_diff') or RequestDiff.compute(original, modified)
+            compacted['changes'] = RequestDiff.summarize(diff, limit=cls.MAX_CHANGES)
+            compacted['original_request'] = cls._compact_request(original, level)
+            compacted['modified_request'] = cls._compact_request(modified, level)
+            compacted['failed_response'] = cls._compact_response(context['failed_response'], level)
+        else:
+            compacted['request'] = cls._compact_request(context['request'], level)
+            compacted['response'] = cls._compact_response(context['response'], level)
+        return compacted
+
+    @classmethod
+    def _compact_request(cls, request, level):
+        headers, other_headers = cls._compact_headers(request.get('headers'), level)
+        return {
+            **request,
+            'headers': headers,
+            'other_headers': other_headers,
+            'body': cls._compact_body(request.get('body'), level),
+        }
+
+    @classmethod
+    def _compact_response(cls, response, level):
+        headers, other_headers = cls._compact_headers(response.get('headers'), level)
+        body = cls.parse_body(response.get('body'))
+        if isinstance(body, str) and cls._is_html(body, response.get('headers')):
+            compacted_body = cls._summarize_html(body, level)
+        else:
+            compacted_body = cls._compact_body(body, level)
+        return {
+            **response,
+            'status_line': cls.status_line(response.get('status_code')),
+            'error_fields': cls.error_fields(body, level),
+            'headers': headers,
+            'other_headers': other_headers,
+            'body': compacted_body,
+        }
+
+    @staticmethod
+    def status_line(status_code):
+        """'404 Not Found' for a status code"""
+        try:
+            return f"{status_code} {HTTPStatus(status_code).phrase}"
+        except (ValueError, TypeError):
+            return str(status_code)
+
+    @staticmethod
+    def parse_body(body):
+        """A body string holding JSON as the decoded value, anything else unchanged"""
+        if isinstance(body, str) and body.lstrip()[:1] in ('{', '['):
+            try:
+                return json.loads(body)
+            except ValueError:
+                pass
+        return body
+
+    @classmethod
+    def error_fields(cls, body, level=None):
+        """
+        Error-bearing values of a JSON body
+
+        Returns:
+            dict: {path: value} for keys that look like error details, e.g. {'errors[0].message': '...'}
+        """
+        level = level or cls.LEVELS[0]
+        fields = {}
+
+        def visit(value, path, depth):
+            if len(fields) >= cls.MAX_ERROR_FIELDS or depth > cls.LEVELS[0]['depth']:
+                return
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    item_path = f"{path}.{key}" if path else str(key)
+                    if cls.ERROR_KEY_RE.search(str(key)) and not isinstance(item, (dict, list)):
+                        if len(fields) < cls.MAX_ERROR_FIELDS:
+                            fields[item_path] = cls._compact_value(item, level)
+                    else:
+                        visit(item, item_path, depth + 1)
+            elif isinstance(value, list):
+                for index, item in enumerate(value[:cls.LEVELS[0]['items']]):
+                    visit(item, f"{path}[{index}]", depth + 1)
+
+        visit(body, '', 0)
+        return fields
+
+    @classmethod
+    def _compact_body(cls, body, level):
+        body = cls.parse_body(body)
+        if isinstance(body, str):
+            return cls._cut_text(body, level['text'])
+        return cls._compact_value(body, level)
+
+    @classmethod
+    def _compact_value(cls, value, level, depth=0):
+        """A JSON value with long arrays, wide or deep objects and long strings cut down"""
+        if isinstance(value, dict):
+            if depth >= level['depth']:
+                return f"{{... {len(value)} keys}}"
+            # Error details first, so they survive the cut
+            keys = sorted(value, key=lambda key: not cls.ERROR_KEY_RE.search(str(key)))
+            compacted = {key: cls._compact_value(value[key], level, depth + 1) for key in keys[:level['keys']]}
+            if len(keys) > level['keys']:
+                compacted['...'] = f"{len(keys) - level['keys']} more keys"
+            return compacted
+        if isinstance(value, list):
+            if depth >= level['depth']:
+                return f"[... {len(value)} items]"
+            compacted = [cls._compact_value(item, level, depth + 1) for item in value[:level['items']]]
+            if len(value) > level['items']:
+                compacted.append(f"... {len(value) - level['items']} more items")
+            return compacted
+        if isinstance(value, str) and len(value) > level['chars']:
+            return f"{value[:level['chars']]}... [{len(value) - level['chars']} more chars]"
+        return value
+
+    @staticmethod
+    def _cut_text(text, limit):
+        """Keep the start and the end of a long text, where errors and stack traces tend to be"""
+        if len(text) <= limit:
+            return text
+        head = limit * 3 // 4
+        tail = limit - head
+        return f"{text[:head]}\n... [{len(text) - limit} chars omitted] ...\n{text[-tail:]}"
+
+    @classmethod
+    def _is_html(cls, body, headers):
+        content_type = ''
+        if isinstance(headers, dict):
+            content_type = next((str(value) for name, value in headers.items() if name.lower() == 'content-type'), '')
+        return 'html' in content_type.lower() or bool(cls.HTML_START_RE.match(body))
+
+    @classmethod
+    def _summarize_html(cls, html, level):
+        """Title, headings and the start of the visible text of an HTML page"""
+        def text_of(fragment):
+            return cls.WHITESPACE_RE.sub(' ', unescape(cls.HTML_TAG_RE.sub(' ', fragment))).strip()
+
+        title_match = cls.HTML_TITLE_RE.search(html)
+        visible = cls.HTML_HIDDEN_RE.sub(' ', html)
+        headings = [text_of(heading) for heading in cls.HTML_HEADING_RE.findall(visible)[:level['items']]]
+        text = text_of(visible)
+
+        lines = [f"HTML page ({len(html)} chars)"]
+        if title_match:
+            lines.append(f"Title: {text_of(title_match.group(1))[:level['chars']]}")
+        if any(headings):
+            lines.append(f"Headings: {'; '.join(heading[:level['chars']] for heading in headings if heading)}")
+        if text:
+            lines.append(f"Text: {cls._cut_text(text, min(level['text'], level['chars'] * 2))}")
+        return '\n'.join(lines)
+
+    @classmethod
+    def _compact_headers(cls, headers, level):
+        """
+        Headers listed in HEADERS or starting with HEADER_PREFIXES, with credentials masked
+
+        Returns:
+            tuple: (kept headers, names of the others)
+        """
+        if not isinstance(headers, dict):
+            return cls._cut_text(str(headers or ''), level['chars']), []
+
+        keep = {name.lower() for name in cls.get_setting('HEADERS')}
+        prefixes = tuple(prefix.lower() for prefix in cls.get_setting('HEADER_PREFIXES'))
+        kept = {}
+        others = []
+        for name, value in headers.items():
+            lowered = name.lower()
+            if lowered in keep or lowered.startswith(prefixes):
+                kept[name] = cls._header_value(name, value, level)
+            else:
+                others.append(name)
+        return kept, others
+
+    @classmethod
+    def _header_value(cls, name, value, level):
+        if name.lower() in RequestDiff.SECRET_HEADERS:
+            return RequestDiff.mask(value)
+        return cls._compact_value(value, level)
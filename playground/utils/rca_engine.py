@@ -1,10 +1,18 @@
 import json
 import os
+import random
 import requests
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
 from django.conf import settings
 from ..models import RootCauseAnalysis
+from .rca_cache import RcaCache
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .rca_text import KeywordMatcher, ResponseText
+from .rca_context import ContextCompactor
+from .rca_rules import RcaRules
+from .request_diff import RequestDiff
 import time
-import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,10 +29,66 @@ class RcaEngine:
     
     The engine includes fallback mechanisms for error handling and supports
     different confidence levels based on the quality of available data.
+    Analyses are cached by failure fingerprint (see RcaCache), so repeated
+    identical failures do not trigger another Gemini call. generate_rca_batch
+    analyses many failures with a few batched prompts instead of one call each.
+    While the Gemini circuit breaker is open, analyses come straight from the
+    local fallback instead of waiting on a failing provider.
+    
+    Common failures (a plain 401, 404, 429 or 504, a chaos fault with the
+    status it should cause) are answered by the local rules in RcaRules and
+    never reach Gemini; the same rules provide the fallback analysis.
     """
     
     # Updated to use a more reliable model
     GEMINI_MODEL = "gemini-pro"
+
+    # Gemini calls go through a circuit breaker and back off between attempts
+    GEMINI_CIRCUIT = 'gemini'
+    GEMINI_TIMEOUT = 20  # seconds per attempt
+    GEMINI_MAX_ATTEMPTS = 2
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled on every attempt
+    RETRY_MAX_DELAY = 4  # longest wait between attempts, including Retry-After
+    
+    # Shape of a single analysis requested from Gemini
+    RCA_JSON_FORMAT = """{
+  "root_cause": "Brief summary of the primary cause",
+  "detailed_analysis": "Detailed explanation of why the failure occurred and the technical reasons behind it",
+  "potential_solutions": ["List", "of", "recommended", "solutions", "to", "prevent", "this", "failure"],
+  "confidence": "HIGH, MEDIUM, or LOW - your confidence in this analysis",
+  "impact_severity": "CRITICAL, HIGH, MEDIUM, or LOW - severity if this happened in production",
+  "failure_category": "Category of failure, e.g. 'Authentication', 'Validation', 'Database'",
+  "affected_components": ["list", "of", "affected", "components"],
+  "tags": ["relevant", "tags", "for", "this", "failure"]
+}"""
+
+    # Batch analysis packs several failures into one Gemini request
+    BATCH_TOKEN_BUDGET = 12000  # estimated prompt tokens per batched request
+    BATCH_MAX_ITEMS = 10
+    BATCH_OUTPUT_TOKENS_PER_ITEM = 800
+    MAX_OUTPUT_TOKENS = 8192
+
+    # Failure category of each chaos fault type
+    FAULT_TYPE_CATEGORIES = {
+        'MISSING_FIELD': 'Validation',
+        'AUTH_FAILURE': 'Authentication',
+        'CORRUPT_PAYLOAD': 'Data Format',
+        'TIMEOUT': 'Performance',
+        'MISSING_DB': 'Database',
+        'INVALID_PARAM': 'Validation',
+    }
+
+    # Keywords inferring the failure category of a free-text answer; the first category mentioned wins
+    CATEGORY_KEYWORDS = KeywordMatcher({
+        'Authentication': ['auth', 'authentication', 'credential', 'permission', 'access denied'],
+        'Authorization': ['authoriz', 'permission', 'access control', 'forbidden'],
+        'Validation': ['validation', 'invalid', 'missing field', 'required field', 'input error'],
+        'Data Format': ['format', 'malformed', 'corrupt', 'json', 'xml', 'payload'],
+        'Database': ['database', 'db', 'query', 'sql', 'data store', 'record'],
+        'Performance': ['timeout', 'slow', 'performance', 'latency', 'response time'],
+        'Network': ['network', 'connection', 'dns', 'routing', 'timeout'],
+        'Configuration': ['config', 'setting', 'environment', 'parameter']
+    })
     
     @classmethod
     def generate_rca(cls, chaos_test_run=None, api_response=None):
@@ -60,37 +124,37 @@ class RcaEngine:
             else:
                 context = cls._build_context_from_api_response(api_response)
             
-            # Generate RCA using Gemini
-            try:
-                # First try with the API
-                rca_data = cls._call_gemini_api(context)
-            except Exception as e:
-                logger.error(f"Error calling Gemini API: {str(e)}")
-                # Fall back to local analysis
-                rca_data = cls._generate_fallback_analysis(context)
+            # Common failures are answered by the local rules without calling Gemini
+            rule_match = RcaRules.classify(context)
+            fingerprint = RcaCache.fingerprint(context)
+            rca_data = None
+            
+            if RcaRules.is_confident(rule_match):
+                rca_data = rule_match.rca_data
+            else:
+                # Reuse the analysis of an identical earlier failure when possible
+                rca_data = RcaCache.get(fingerprint)
+                if rca_data is not None:
+                    rca_data['tags'] = list(rca_data.get('tags') or []) + ['cached']
+            
+            if rca_data is None:
+                # Generate RCA using Gemini
+                try:
+                    # First try with the API
+                    rca_data = cls._call_gemini_api(context)
+                    # Fallback analyses are not cached so the next failure retries Gemini
+                    if 'fallback' not in (rca_data.get('tags') or []):
+                        RcaCache.set(fingerprint, rca_data)
+                except Exception as e:
+                    logger.error(f"Error calling Gemini API: {str(e)}")
+                    # Fall back to local analysis
+                    rca_data = cls._generate_fallback_analysis(context)
             
             # Calculate time to detect
             time_to_detect = int((time.time() - start_time) * 1000)
             
             # Create the RCA record with enhanced data
-            rca_kwargs = {
-                'confidence': rca_data.get('confidence', 'MEDIUM'),
-                'root_cause': rca_data['root_cause'],
-                'detailed_analysis': rca_data['detailed_analysis'],
-                'potential_solutions': json.dumps(rca_data['potential_solutions']),  # Convert list to JSON string
-                'impact_severity': rca_data.get('impact_severity', 'MEDIUM'),
-                'failure_category': rca_data.get('failure_category', None),
-                'affected_components': rca_data.get('affected_components', []),
-                'time_to_detect_ms': time_to_detect,
-                'tags': rca_data.get('tags', []),
-            }
-            
-            # Set the appropriate relation
-            if chaos_test_run:
-                rca_kwargs['chaos_test_run'] = chaos_test_run
-            else:
-                rca_kwargs['api_response'] = api_response
-            
+            rca_kwargs = cls._build_rca_kwargs(rca_data, time_to_detect, chaos_test_run, api_response)
             rca = RootCauseAnalysis.objects.create(**rca_kwargs)
             
             return rca
@@ -185,6 +249,224 @@ class RcaEngine:
             
             return rca
     
+    @classmethod
+    def generate_rca_batch(cls, chaos_test_runs=(), api_responses=(), token_budget=None):
+        """
+        Generate Root Cause Analyses for several failures with as few Gemini calls as possible.
+        
+        Failures the local rules are confident about, or already in the RCA
+        cache, are answered without Gemini, and failures sharing a
+        fingerprint are analysed once. The rest are packed into prompts of up to ``token_budget`` estimated tokens, each asking for a
+        JSON array of analyses. Entries missing from or unparseable in a batch
+        answer are retried with the single-failure prompt.
+        
+        Args:
+            chaos_test_runs: Iterable of ChaosTestRun instances
+            api_responses: Iterable of ApiResponse instances
+            token_budget: Max estimated prompt tokens per request (default BATCH_TOKEN_BUDGET)
+            
+        Returns:
+            list: RootCauseAnalysis instances, chaos test runs first, in input order
+        """
+        start_time = time.time()
+        sources = [(run, None) for run in chaos_test_runs] + [(None, response) for response in api_responses]
+        token_budget = token_budget or cls.BATCH_TOKEN_BUDGET
+        
+        contexts = [None] * len(sources)
+        results = [None] * len(sources)
+        pending = {}  # fingerprint -> (context, [source positions])
+        
+        for position, (chaos_test_run, api_response) in enumerate(sources):
+            try:
+                if chaos_test_run:
+                    context = cls._build_context_from_chaos_run(chaos_test_run)
+                else:
+                    context = cls._build_context_from_api_response(api_response)
+            except Exception as e:
+                # generate_rca records a descriptive error analysis for these
+                logger.error(f"Error building RCA context for batch entry {position}: {str(e)}")
+                continue
+            
+            contexts[position] = context
+            rule_match = RcaRules.classify(context)
+            if RcaRules.is_confident(rule_match):
+                results[position] = rule_match.rca_data
+                continue
+            
+            fingerprint = RcaCache.fingerprint(context)
+            if fingerprint in pending:
+                pending[fingerprint][1].append(position)
+                continue
+            
+            rca_data = RcaCache.get(fingerprint)
+            if rca_data is not None:
+                rca_data['tags'] = list(rca_data.get('tags') or []) + ['cached']
+                results[position] = rca_data
+            else:
+                pending[fingerprint] = (context, [position])
+        
+        fingerprints = list(pending)
+        for group in cls._pack_batches([pending[fp][0] for fp in fingerprints], token_budget):
+            group_contexts = [pending[fingerprints[i]][0] for i in group]
+            analyses = [None] * len(group_contexts)
+            if len(group_contexts) > 1:
+                try:
+                    analyses = cls._call_gemini_batch(group_contexts)
+                except Exception as e:
+                    # The request itself failed; retrying each entry would fail the same way
+                    logger.error(f"Batched Gemini API call for {len(group_contexts)} failures failed: {str(e)}")
+                    analyses = [cls._generate_fallback_analysis(context) for context in group_contexts]
+            
+            for i, rca_data in zip(group, analyses):
+                fingerprint = fingerprints[i]
+                context, positions = pending[fingerprint]
+                if rca_data is None:
+                    # Not answered by the batch; analyse this failure on its own
+                    try:
+                        rca_data = cls._call_gemini_api(context)
+                    except Exception as e:
+                        logger.error(f"Error calling Gemini API: {str(e)}")
+                        rca_data = cls._generate_fallback_analysis(context)
+                if 'fallback' not in (rca_data.get('tags') or []):
+                    RcaCache.set(fingerprint, rca_data)
+                for position in positions:
+                    results[position] = rca_data
+        
+        time_to_detect = int((time.time() - start_time) * 1000)
+        rcas = []
+        for position, (chaos_test_run, api_response) in enumerate(sources):
+            if results[position] is None:
+                rcas.append(cls.generate_rca(chaos_test_run=chaos_test_run, api_response=api_response))
+                continue
+            rca_kwargs = cls._build_rca_kwargs(results[position], time_to_detect, chaos_test_run, api_response)
+            rcas.append(RootCauseAnalysis.objects.create(**rca_kwargs))
+        
+        return rcas
+    
+    @staticmethod
+    def _build_rca_kwargs(rca_data, time_to_detect, chaos_test_run=None, api_response=None):
+        """Build the RootCauseAnalysis field values for normalized RCA data"""
+        rca_kwargs = {
+            'confidence': rca_data.get('confidence', 'MEDIUM'),
+            'root_cause': rca_data['root_cause'],
+            'detailed_analysis': rca_data['detailed_analysis'],
+            'potential_solutions': json.dumps(rca_data['potential_solutions']),  # Convert list to JSON string
+            'impact_severity': rca_data.get('impact_severity', 'MEDIUM'),
+            'failure_category': rca_data.get('failure_category', None),
+            'affected_components': rca_data.get('affected_components', []),
+            'time_to_detect_ms': time_to_detect,
+            'tags': rca_data.get('tags', []),
+        }
+        
+        # Set the appropriate relation
+        if chaos_test_run:
+            rca_kwargs['chaos_test_run'] = chaos_test_run
+        else:
+            rca_kwargs['api_response'] = api_response
+        return rca_kwargs
+    
+    @classmethod
+    def estimate_tokens(cls, text):
+        """Roughly estimate the number of tokens in a piece of text"""
+        return ContextCompactor.estimate_tokens(text)
+    
+    @classmethod
+    def _pack_batches(cls, contexts, token_budget):
+        """
+        Split contexts into groups that fit one batched prompt
+        
+        Groups are filled in order until the next failure would push the
+        estimated prompt over ``token_budget`` or past BATCH_MAX_ITEMS. A
+        failure too large for the budget on its own gets a group to itself.
+        
+        Returns:
+            list: Lists of indexes into ``contexts``
+        """
+        overhead = cls.estimate_tokens(cls._format_gemini_batch_prompt([]))
+        groups = []
+        current = []
+        used = overhead
+        
+        for index, context in enumerate(contexts):
+            cost = cls.estimate_tokens(cls._format_failure_details(context))
+            if current and (used + cost > token_budget or len(current) >= cls.BATCH_MAX_ITEMS):
+                groups.append(current)
+                current = []
+                used = overhead
+            current.append(index)
+            used += cost
+        
+        if current:
+            groups.append(current)
+        return groups
+    
+    @classmethod
+    def _call_gemini_batch(cls, contexts):
+        """
+        Analyse several failures with one Gemini call
+        
+        Args:
+            contexts: List of context dictionaries
+            
+        Returns:
+            list: Structured RCA data per context, None where the batch answer
+                could not be used
+            
+        Raises:
+            Exception: If the Gemini request itself fails
+        """
+        prompt = cls._format_gemini_batch_prompt(contexts)
+        max_output_tokens = min(cls.MAX_OUTPUT_TOKENS, cls.BATCH_OUTPUT_TOKENS_PER_ITEM * len(contexts))
+        generated_text = cls._request_gemini(prompt, max_output_tokens=max_output_tokens)
+        return cls._parse_gemini_batch_response(generated_text, contexts)
+    
+    @classmethod
+    def _parse_gemini_batch_response(cls, response_text, contexts):
+        """
+        Parse a batched Gemini response and map each analysis to its context
+        
+        Items are matched by their "index" field; when no item carries one and
+        the array has the expected length, they are matched by position.
+        
+        Returns:
+            list: Structured RCA data per context, None for missing or invalid entries
+        """
+        results = [None] * len(contexts)
+        
+        json_start = response_text.find('[')
+        json_end = response_text.rfind(']') + 1
+        try:
+            if json_start < 0 or json_end <= json_start:
+                raise ValueError("No JSON array found")
+            items = json.loads(response_text[json_start:json_end])
+            if not isinstance(items, list):
+                raise ValueError("Batch response is not a JSON array")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Error parsing batched Gemini response: {str(e)}")
+            return results
+        
+        items = [item for item in items if isinstance(item, dict)]
+        by_position = len(items) == len(contexts) and not any('index' in item for item in items)
+        
+        for position, item in enumerate(items):
+            if by_position:
+                slot = position
+            else:
+                try:
+                    slot = int(item.pop('index')) - 1
+                except (KeyError, TypeError, ValueError):
+                    continue
+            if not 0 <= slot < len(contexts) or results[slot] is not None:
+                continue
+            if not item.get('root_cause'):
+                continue
+            results[slot] = cls._parse_gemini_response(json.dumps(item), contexts[slot])
+        
+        missing = results.count(None)
+        if missing:
+            logger.warning(f"Batched Gemini response left {missing} of {len(contexts)} failures unanswered")
+        return results
+    
     @classmethod
     def _build_context_from_chaos_run(cls, chaos_test_run):
         """
@@ -233,11 +515,9 @@ class RcaEngine:
         except (json.JSONDecodeError, AttributeError):
             response_headers = "Could not parse headers"
         
+        # Large bodies are compacted when the prompt is formatted (see ContextCompactor)
         try:
             response_body = failed_response.response_body if failed_response.response_body else ""
-            # If response body is very large, truncate it
-            if isinstance(response_body, str) and len(response_body) > 10000:
-                response_body = response_body[:10000] + "... [truncated]"
         except AttributeError:
             response_body = "No response body"
         
@@ -265,8 +545,16 @@ class RcaEngine:
                 "status_code": failed_response.status_code,
                 "headers": response_headers,
                 "body": response_body,
-                "response_time_ms": failed_response.response_time_ms
-            }
+                "response_time_ms": failed_response.response_time_ms,
+                "body_size_bytes": failed_response.body_size,
+                "body_truncated": failed_response.body_truncated
+            },
+            # Stored when the run was recorded; runs created elsewhere are diffed here
+            "request_diff": (
+                chaos_test_run.request_diff
+                if chaos_test_run.request_diff is not None
+                else RequestDiff.compute(original_request, modified_request)
+            )
         }
         
         return context
@@ -316,10 +604,6 @@ class RcaEngine:
                         response_body = api_response.response_body
                 else:
                     response_body = api_response.response_body
-                
-                # If response body is very large, truncate it
-                if isinstance(response_body, str) and len(response_body) > 10000:
-                    response_body = response_body[:10000] + "... [truncated]"
             else:
                 response_body = ""
         except json.JSONDecodeError:
@@ -338,7 +622,9 @@ class RcaEngine:
                 "status_code": api_response.status_code,
                 "headers": response_headers,
                 "body": response_body,
-                "response_time_ms": api_response.response_time_ms
+                "response_time_ms": api_response.response_time_ms,
+                "body_size_bytes": api_response.body_size,
+                "body_truncated": api_response.body_truncated
             }
         }
         
@@ -358,6 +644,43 @@ class RcaEngine:
         Returns:
             dict: Structured RCA data with all required fields
         """
+        # Format the prompt for Gemini based on context source
+        if context.get("source_type") == "chaos_test":
+            prompt = cls._format_gemini_prompt_for_chaos_test(context)
+        else:
+            prompt = cls._format_gemini_prompt_for_api_response(context)
+        
+        try:
+            generated_text = cls._request_gemini(prompt)
+        except ValueError:
+            raise
+        except CircuitOpenError as e:
+            logger.info(f"Skipping Gemini call: {str(e)}")
+            return cls._generate_fallback_analysis(context)
+        except Exception as e:
+            logger.error(f"All Gemini API retries failed: {str(e)}")
+            return cls._generate_fallback_analysis(context)
+        
+        # Parse the generated text into structured RCA data
+        return cls._parse_gemini_response(generated_text, context)
+    
+    @classmethod
+    def _request_gemini(cls, prompt, max_output_tokens=2048):
+        """
+        Send a prompt to the Gemini API and return the generated text.
+        
+        Args:
+            prompt: Prompt text
+            max_output_tokens: Upper bound on the length of the generated text
+            
+        Returns:
+            str: The text of the first candidate
+            
+        Raises:
+            ValueError: If no API key is configured
+            CircuitOpenError: If the Gemini circuit breaker is open
+            Exception: The last error once all retries have failed
+        """
         # Get API key from environment or settings
         api_key = os.environ.get('GEMINI_API_KEY') or getattr(settings, 'GEMINI_API_KEY', None)
         
@@ -365,12 +688,6 @@ class RcaEngine:
         if not api_key:
             raise ValueError("Gemini API key not configured in settings or environment")
         
-        # Format the prompt for Gemini based on context source
-        if context.get("source_type") == "chaos_test":
-            prompt = cls._format_gemini_prompt_for_chaos_test(context)
-        else:
-            prompt = cls._format_gemini_prompt_for_api_response(context)
-        
         # Prepare request payload
         payload = {
             "contents": [
@@ -384,243 +701,213 @@ class RcaEngine:
                 "temperature": 0.2,
                 "topP": 0.8,
                 "topK": 40,
-                "maxOutputTokens": 2048,
+                "maxOutputTokens": max_output_tokens,
             }
         }
         
+        # Skip the call entirely while Gemini is known to be failing
+        breaker = CircuitBreaker.get(cls.GEMINI_CIRCUIT)
+        breaker.before_call()
+        
         # Call Gemini API with error handling and retry
-        max_retries = 2
-        retry_count = 0
         last_error = None
+        retry_after = None
         
-        while retry_count < max_retries:
+        for attempt in range(1, cls.GEMINI_MAX_ATTEMPTS + 1):
+            retry_after = None
             try:
                 response = requests.post(
                     f"https://generativelanguage.googleapis.com/v1/models/{cls.GEMINI_MODEL}:generateContent?key={api_key}",
                     json=payload,
                     headers={"Content-Type": "application/json"},
-                    timeout=20  # Increased timeout to prevent hanging requests
+                    timeout=cls.GEMINI_TIMEOUT
                 )
-                
-                # Check for API errors
-                if response.status_code != 200:
-                    error_message = f"Gemini API error: {response.status_code}"
+            except Exception as e:
+                last_error = e
+            else:
+                if response.status_code == 200:
+                    # Gemini answered, whatever the content; the service is healthy
+                    breaker.record_success()
                     try:
-                        error_data = response.json()
-                        if 'error' in error_data:
-                            error_message += f" - {error_data['error'].get('message', '')}"
-                    except:
-                        error_message += f" - {response.text[:100]}"
-                    
-                    raise Exception(error_message)
+                        return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+                    except (ValueError, KeyError, IndexError):
+                        raise Exception("Unexpected response format from Gemini API")
                 
-                # Process the response
-                response_data = response.json()
-                
-                # Extract the text from the response
-                generated_text = ""
+                # Check for API errors
+                error_message = f"Gemini API error: {response.status_code}"
                 try:
-                    generated_text = response_data["candidates"][0]["content"]["parts"][0]["text"]
-                except (KeyError, IndexError):
-                    raise Exception("Unexpected response format from Gemini API")
+                    error_data = response.json()
+                    if 'error' in error_data:
+                        error_message += f" - {error_data['error'].get('message', '')}"
+                except:
+                    error_message += f" - {response.text[:100]}"
+                last_error = Exception(error_message)
+                retry_after = cls._parse_retry_after(response.headers.get('Retry-After'))
                 
-                # Parse the generated text into structured RCA data
-                rca_data = cls._parse_gemini_response(generated_text, context)
-                
-                return rca_data
-                
-            except Exception as e:
-                last_error = e
-                retry_count += 1
-                logger.warning(f"Gemini API call failed (attempt {retry_count}): {str(e)}")
-                time.sleep(1)  # Wait a second before retrying
+                if response.status_code in (401, 403):
+                    # A rejected key will not fix itself; let the breaker hold calls off
+                    break
+                if response.status_code < 500 and response.status_code not in (408, 429):
+                    # The request itself was rejected; the service is reachable
+                    breaker.record_success()
+                    raise last_error
+            
+            logger.warning(f"Gemini API call failed (attempt {attempt}): {str(last_error)}")
+            if attempt == cls.GEMINI_MAX_ATTEMPTS:
+                break
+            delay = cls._retry_delay(attempt, retry_after)
+            if delay is None:
+                break
+            time.sleep(delay)
         
-        # If we've exhausted retries, raise the last error or fall back
-        if last_error:
-            logger.error(f"All Gemini API retries failed: {str(last_error)}")
-            return cls._generate_fallback_analysis(context)
+        breaker.record_failure(last_error, retry_after=retry_after)
+        raise last_error
+    
+    @classmethod
+    def _retry_delay(cls, attempt, retry_after=None):
+        """
+        Seconds to wait before the next Gemini attempt
+        
+        Uses jittered exponential backoff, or the server's Retry-After when
+        given. Returns None when the server asks for a longer wait than is
+        worth blocking for; the circuit breaker then holds calls off instead.
+        """
+        if retry_after is not None:
+            return retry_after if retry_after <= cls.RETRY_MAX_DELAY else None
+        delay = min(cls.RETRY_MAX_DELAY, cls.RETRY_BASE_DELAY * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    @staticmethod
+    def _parse_retry_after(value):
+        """Parse a Retry-After header (seconds or HTTP date) into seconds, or None"""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=dt_timezone.utc)
+        return max(0.0, (retry_at - datetime.now(dt_timezone.utc)).total_seconds())
     
     @classmethod
     def _generate_fallback_analysis(cls, context):
-        """Generate a fallback analysis when the API call fails"""
-        if context.get("source_type") == "chaos_test":
-            fault_type = context["chaos_test"]["fault_type"]
-            
-            # Create analysis based on fault type
-            root_cause = f"API failure due to {fault_type.lower().replace('_', ' ')} issue"
-            
-            if fault_type == 'MISSING_FIELD':
-                detailed_analysis = "The API request is missing one or more required fields, causing validation to fail."
-                potential_solutions = ["Ensure all required fields are included in the request", 
-                                      "Verify the API documentation for required fields",
-                                      "Implement request validation before sending to the API"]
-                category = "Validation"
-                
-            elif fault_type == 'AUTH_FAILURE':
-                detailed_analysis = "The API request has invalid or missing authentication credentials."
-                potential_solutions = ["Verify authentication credentials are correct", 
-                                      "Check that the authentication token is not expired",
-                                      "Ensure authentication headers are properly formatted"]
-                category = "Authentication"
-                
-            elif fault_type == 'CORRUPT_PAYLOAD':
-                detailed_analysis = "The API request contains malformed or corrupt data that cannot be processed."
-                potential_solutions = ["Validate request payload format before sending", 
-                                      "Ensure JSON is properly formatted and valid",
-                                      "Check for encoding issues in the request body"]
-                category = "Data Format"
-                
-            elif fault_type == 'TIMEOUT':
-                detailed_analysis = "The API request timed out, indicating potential performance issues."
-                potential_solutions = ["Implement retry logic with exponential backoff", 
-                                      "Consider optimizing the API endpoint for better performance",
-                                      "Check for backend service availability"]
-                category = "Performance"
-                
-            elif fault_type == 'INVALID_PARAM':
-                detailed_analysis = "The API request contains invalid parameters that cannot be processed."
-                potential_solutions = ["Review API documentation for correct parameter formats", 
-                                      "Implement input validation before sending requests",
-                                      "Check for type conversion issues in parameters"]
-                category = "Validation"
-                
-            else:
-                detailed_analysis = f"The API failure was caused by a {fault_type} issue that requires investigation."
-                potential_solutions = ["Review API documentation", 
-                                      "Check request format and parameters",
-                                      "Implement better error handling"]
-                category = "Other"
-                
-            # Modified URL comparison for context
-            original_url = context["original_request"]["url"]
-            modified_url = context["modified_request"]["url"]
-            
-            if original_url != modified_url:
-                detailed_analysis += f"\n\nThe URL was modified from {original_url} to {modified_url}, which likely contributed to the failure."
-                
-            # Add response code context
-            status_code = context["failed_response"]["status_code"]
-            detailed_analysis += f"\n\nThe request resulted in a {status_code} status code."
-            
-        elif context.get("source_type") == "api_response":
-            status_code = context["response"]["status_code"]
-            
-            # Create analysis based on status code
-            if 400 <= status_code < 500:
-                root_cause = f"Client error ({status_code}) in API request"
-                detailed_analysis = cls._generate_analysis_from_status_code(status_code, context)
-                
-                if status_code == 400:
-                    potential_solutions = ["Validate request format against API documentation",
-                                          "Check for missing or invalid parameters",
-                                          "Verify correct data types are being sent"]
-                    category = "Validation"
-                    
-                elif status_code == 401:
-                    potential_solutions = ["Verify authentication credentials",
-                                          "Check if authentication token has expired",
-                                          "Ensure correct authentication method is being used"]
-                    category = "Authentication"
-                    
-                elif status_code == 403:
-                    potential_solutions = ["Verify user permissions for the requested resource",
-                                          "Check if the API key has correct scopes/permissions",
-                                          "Contact API provider to ensure account has proper access"]
-                    category = "Authorization"
-                    
-                elif status_code == 404:
-                    potential_solutions = ["Verify the resource URL is correct",
-                                          "Check if the resource exists or has been deleted",
-                                          "Ensure API version and endpoint paths are correct"]
-                    category = "Resource Not Found"
-                    
-                else:
-                    potential_solutions = ["Review API documentation for correct request format",
-                                          "Check for request validation errors",
-                                          "Implement better error handling in the client"]
-                    category = "Client Error"
-                    
-            elif 500 <= status_code < 600:
-                root_cause = f"Server error ({status_code}) in API response"
-                detailed_analysis = cls._generate_analysis_from_status_code(status_code, context)
-                
-                potential_solutions = ["Retry the request after a delay",
-                                      "Contact the API provider to report the server error",
-                                      "Implement circuit breaker pattern to handle repeated failures"]
-                category = "Server Error"
-                
-            else:
-                root_cause = f"Unexpected status code ({status_code}) in API response"
-                detailed_analysis = f"The API returned an unusual status code {status_code}, which is outside the standard HTTP status code ranges."
-                potential_solutions = ["Contact the API provider for clarification",
-                                      "Check documentation for custom status codes",
-                                      "Implement more robust error handling for unexpected responses"]
-                category = "Other"
-        else:
-            # Generic fallback
-            root_cause = "API failure with unknown cause"
-            detailed_analysis = "Insufficient context to determine the specific cause of the API failure."
-            potential_solutions = ["Implement better logging to capture request/response details",
-                                  "Review API documentation for common error cases",
-                                  "Add validation and error handling to all API calls"]
-            category = "Unknown"
-            
+        """Generate a fallback analysis when the API call fails, from the best matching local rule"""
+        rule_match = None
+        if context.get("source_type") in ("chaos_test", "api_response"):
+            rule_match = RcaRules.classify(context)
+        
+        if rule_match is not None:
+            rca_data = rule_match.rca_data
+            rca_data["tags"] = ["fallback", "auto-generated"] + rca_data["tags"]
+            return rca_data
+        
+        # Generic fallback
         return {
-            "root_cause": root_cause,
-            "detailed_analysis": detailed_analysis,
-            "potential_solutions": potential_solutions,
+            "root_cause": "API failure with unknown cause",
+            "detailed_analysis": "Insufficient context to determine the specific cause of the API failure.",
+            "potential_solutions": ["Implement better logging to capture request/response details",
+                                    "Review API documentation for common error cases",
+                                    "Add validation and error handling to all API calls"],
             "confidence": "MEDIUM",
             "impact_severity": "MEDIUM",
-            "failure_category": category,
+            "failure_category": "Unknown",
             "affected_components": ["API Client", "Request Handling"],
             "tags": ["fallback", "auto-generated"]
         }
 
     # Other methods remain the same
     @classmethod
-    def _format_gemini_prompt_for_chaos_test(cls, context):
-        """Format a structured prompt for the Gemini API for chaos test analysis."""
-        # Create a structured prompt from the chaos test context
-        return f"""
-You are an expert API Root Cause Analysis system. Analyze the following API failure from a chaos test and provide a detailed root cause analysis.
-
-## CHAOS TEST INFORMATION
+    def _format_failure_details_for_chaos_test(cls, context):
+        """Format the test, request change, response and original request sections of a compacted chaos test context."""
+        changes = '\n'.join(f"- {change}" for change in context['changes']) or "- No differences found"
+        return f"""## CHAOS TEST INFORMATION
 - Test Name: {context['chaos_test']['name']}
 - Fault Type: {context['chaos_test']['fault_type']}
 - Description: {context['chaos_test']['description']}
 
+## REQUEST CHANGES (Original -> Failed)
+{changes}
+
+## FAILED RESPONSE
+{cls._format_response(context['failed_response'])}
 ## ORIGINAL REQUEST (Working)
-- URL: {context['original_request']['url']}
-- Method: {context['original_request']['method']}
-- Headers: {json.dumps(context['original_request']['headers'], indent=2)}
-- Body: {json.dumps(context['original_request']['body'], indent=2)}
+{cls._format_request(context['original_request'])}"""
+
+    @classmethod
+    def _format_failure_details_for_api_response(cls, context):
+        """Format the response and request sections of a compacted API response context."""
+        return f"""## API RESPONSE (Failed)
+{cls._format_response(context['response'])}
+## API REQUEST
+{cls._format_request(context['request'])}"""
 
-## MODIFIED REQUEST (Failed)
-- URL: {context['modified_request']['url']}
-- Method: {context['modified_request']['method']}
-- Headers: {json.dumps(context['modified_request']['headers'], indent=2)}
-- Body: {json.dumps(context['modified_request']['body'], indent=2)}
+    @staticmethod
+    def _format_json(value):
+        """Compact one-line JSON, or the text itself"""
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
 
-## FAILED RESPONSE
-- Status Code: {context['failed_response']['status_code']}
-- Headers: {json.dumps(context['failed_response']['headers'], indent=2)}
-- Body: {context['failed_response']['body']}
-- Response Time: {context['failed_response']['response_time_ms']} ms
+    @classmethod
+    def _format_request(cls, request):
+        """Lines describing a compacted request"""
+        lines = [
+            f"- URL: {request['url']}",
+            f"- Method: {request['method']}",
+            f"- Headers: {cls._format_json(request['headers'])}",
+        ]
+        if request['other_headers']:
+            lines.append(f"- Other Headers: {', '.join(request['other_headers'])}")
+        lines.append(f"- Body: {cls._format_json(request['body'])}")
+        return '\n'.join(lines) + '\n'
 
+    @classmethod
+    def _format_response(cls, response):
+        """Lines describing a compacted response, error details first"""
+        lines = [f"- Status: {response['status_line']}"]
+        if response['error_fields']:
+            lines.append(f"- Error Fields: {cls._format_json(response['error_fields'])}")
+        lines.append(f"- Headers: {cls._format_json(response['headers'])}")
+        if response['other_headers']:
+            lines.append(f"- Other Headers: {', '.join(response['other_headers'])}")
+        lines.append(f"- Body: {cls._format_json(response['body'])}")
+        return '\n'.join(lines) + f"\n{cls._format_body_size(response)}- Response Time: {response['response_time_ms']} ms\n"
+
+    @staticmethod
+    def _format_body_size(response):
+        """Body size line for a response section (empty when the size is unknown)"""
+        if response.get('body_size_bytes') is None:
+            return ""
+        note = " (only the start and end were captured)" if response.get('body_truncated') else ""
+        return f"- Body Size: {response['body_size_bytes']} bytes{note}\n"
+
+    @classmethod
+    def _format_failure_details(cls, context):
+        """
+        Format the failure sections for either context source
+
+        The context is compacted to fit the RCA_CONTEXT token budget.
+        """
+        if context.get("source_type") == "chaos_test":
+            return ContextCompactor.fit(context, cls._format_failure_details_for_chaos_test)
+        return ContextCompactor.fit(context, cls._format_failure_details_for_api_response)
+
+    @classmethod
+    def _format_gemini_prompt_for_chaos_test(cls, context):
+        """Format a structured prompt for the Gemini API for chaos test analysis."""
+        # Create a structured prompt from the chaos test context
+        return f"""
+You are an expert API Root Cause Analysis system. Analyze the following API failure from a chaos test and provide a detailed root cause analysis.
+
+{cls._format_failure_details(context)}
 ## INSTRUCTIONS
 Perform a detailed root cause analysis of this API failure. Return your response in the following JSON format:
 
 ```json
-{{
-  "root_cause": "Brief summary of the primary cause",
-  "detailed_analysis": "Detailed explanation of why the failure occurred and the technical reasons behind it",
-  "potential_solutions": ["List", "of", "recommended", "solutions", "to", "prevent", "this", "failure"],
-  "confidence": "HIGH, MEDIUM, or LOW - your confidence in this analysis",
-  "impact_severity": "CRITICAL, HIGH, MEDIUM, or LOW - severity if this happened in production",
-  "failure_category": "Category of failure, e.g. 'Authentication', 'Validation', 'Database'",
-  "affected_components": ["list", "of", "affected", "components"],
-  "tags": ["relevant", "tags", "for", "this", "failure"]
-}}
+{cls.RCA_JSON_FORMAT}
 ```
 
 Your analysis should be detailed, technically accurate, and provide actionable insights.
@@ -633,39 +920,49 @@ Your analysis should be detailed, technically accurate, and provide actionable i
         return f"""
 You are an expert API Root Cause Analysis system. Analyze the following failed API request and response to provide a detailed root cause analysis.
 
-## API REQUEST
-- URL: {context['request']['url']}
-- Method: {context['request']['method']}
-- Headers: {json.dumps(context['request']['headers'], indent=2)}
-- Body: {json.dumps(context['request']['body'], indent=2)}
-
-## API RESPONSE (Failed)
-- Status Code: {context['response']['status_code']}
-- Headers: {json.dumps(context['response']['headers'], indent=2)}
-- Body: {context['response']['body']}
-- Response Time: {context['response']['response_time_ms']} ms
-
+{cls._format_failure_details(context)}
 ## INSTRUCTIONS
 Perform a detailed root cause analysis of this API failure. Be practical and realistic about what might have gone wrong, considering common API failure patterns based on the status code and response content.
 
 Return your response in the following JSON format:
 
 ```json
-{{
-  "root_cause": "Brief summary of the primary cause",
-  "detailed_analysis": "Detailed explanation of why the failure occurred and the technical reasons behind it",
-  "potential_solutions": ["List", "of", "recommended", "solutions", "to", "prevent", "this", "failure"],
-  "confidence": "HIGH, MEDIUM, or LOW - your confidence in this analysis",
-  "impact_severity": "CRITICAL, HIGH, MEDIUM, or LOW - severity if this happened in production",
-  "failure_category": "Category of failure, e.g. 'Authentication', 'Validation', 'Database'",
-  "affected_components": ["list", "of", "affected", "components"],
-  "tags": ["relevant", "tags", "for", "this", "failure"]
-}}
+{cls.RCA_JSON_FORMAT}
 ```
 
 Your analysis should be detailed, technically accurate, and provide actionable insights for the API consumer. Be specific about what the error means and how to fix it, basing your analysis on the specific status code, error messages, and any patterns in the request/response.
 """
-    
+
+    @classmethod
+    def _format_gemini_batch_prompt(cls, contexts):
+        """
+        Format one prompt asking Gemini to analyse several failures at once.
+
+        Each failure is numbered from 1 and the model is asked to echo that
+        number in the "index" field so results can be mapped back.
+        """
+        sections = []
+        for index, context in enumerate(contexts, start=1):
+            sections.append(f"# FAILURE {index}\n\n{cls._format_failure_details(context)}")
+        failures = "\n".join(sections)
+        item_format = cls.RCA_JSON_FORMAT.replace('{\n', '{\n  "index": "Number of the failure being analysed",\n', 1)
+
+        return f"""
+You are an expert API Root Cause Analysis system. Analyze each of the following {len(contexts)} API failures independently and provide a detailed root cause analysis for every one of them.
+
+{failures}
+# INSTRUCTIONS
+Perform a detailed root cause analysis of each failure above. Return a JSON array with exactly {len(contexts)} objects, one per failure, where each object has the following format:
+
+```json
+[
+{item_format}
+]
+```
+
+Analyze every failure on its own merits, based on its status code, error messages and request/response data. Your analysis should be detailed, technically accurate, and provide actionable insights.
+"""
+
     @classmethod
     def _parse_gemini_response(cls, response_text, context):
         """
@@ -757,15 +1054,7 @@ Your analysis should be detailed, technically accurate, and provide actionable i
             # Infer category from context
             if context.get('source_type') == 'chaos_test':
                 fault_type = context['chaos_test']['fault_type']
-                category_map = {
-                    'MISSING_FIELD': 'Validation',
-                    'AUTH_FAILURE': 'Authentication',
-                    'CORRUPT_PAYLOAD': 'Data Format',
-                    'TIMEOUT': 'Performance',
-                    'MISSING_DB': 'Database',
-                    'INVALID_PARAM': 'Validation',
-                }
-                rca_data['failure_category'] = category_map.get(fault_type, 'Other')
+                rca_data['failure_category'] = cls.FAULT_TYPE_CATEGORIES.get(fault_type, 'Other')
             else:
                 # Infer from status code for API responses
                 status_code = context['response']['status_code']
@@ -783,8 +1072,9 @@ Your analysis should be detailed, technically accurate, and provide actionable i
     @classmethod
     def _extract_structured_data_from_text(cls, text, context):
         """Extract structured RCA data from unstructured text when JSON parsing fails."""
-        # Clean up the text first to remove unwanted sections
+        # Clean up the text first to remove unwanted sections, then find its sections in one pass
         cleaned_text = cls._clean_response_text(text)
+        sections = ResponseText.sections(cleaned_text)
         
         # Initialize our structured data with defaults
         rca_data = {
@@ -798,18 +1088,11 @@ Your analysis should be detailed, technically accurate, and provide actionable i
             'tags': []
         }
         
-        # Extract root cause - look for sections or paragraphs that mention root cause
-        root_cause_patterns = [
-            r'(?:Root Cause|ROOT CAUSE)[:]\s*(.*?)(?:\n\n|\n#)',
-            r'The root cause (?:is|appears to be|was)\s*(.*?)(?:\.|$)',
-            r'(?:cause|reason)(?:s)? (?:of|for) the failure\s*(?:is|are|was|were)[:]*\s*(.*?)(?:\.|$)'
-        ]
-        
-        for pattern in root_cause_patterns:
-            matches = re.search(pattern, cleaned_text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                rca_data['root_cause'] = matches.group(1).strip()
-                break
+        # Extract root cause - look for sections or sentences that mention root cause
+        if 'root_cause' in sections:
+            rca_data['root_cause'] = sections['root_cause'][0]
+        else:
+            rca_data['root_cause'] = ResponseText.root_cause_sentence(cleaned_text)
         
         # If no specific section found, use the first paragraph as a fallback for root cause
         if not rca_data['root_cause'] and '\n\n' in cleaned_text:
@@ -834,41 +1117,14 @@ Your analysis should be detailed, technically accurate, and provide actionable i
                 rca_data['root_cause'] = "API failure with undetermined cause"
         
         # Extract detailed analysis - use the entire cleaned text if no specific section
-        analysis_patterns = [
-            r'(?:Detailed Analysis|DETAILED ANALYSIS)[:]\s*(.*?)(?:\n#|\n\n\n)',
-            r'(?:Analysis|ANALYSIS)[:]\s*(.*?)(?:\n#|\n\n\n)'
-        ]
+        analysis = sections.get('detailed_analysis') or sections.get('analysis')
+        rca_data['detailed_analysis'] = analysis[0] if analysis else cleaned_text
         
-        for pattern in analysis_patterns:
-            matches = re.search(pattern, cleaned_text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                rca_data['detailed_analysis'] = matches.group(1).strip()
-                break
-        
-        # If no specific analysis section found, use the cleaned text as the detailed analysis
-        if not rca_data['detailed_analysis']:
-            rca_data['detailed_analysis'] = cleaned_text
-        
-        # Extract potential solutions
-        solution_patterns = [
-            r'(?:Potential Solutions|POTENTIAL SOLUTIONS|Recommendations|RECOMMENDATIONS)[:]\s*(.*?)(?:\n#|\n\n\n|$)',
-            r'(?:Solution|SOLUTION)[:]\s*(.*?)(?:\n#|\n\n\n|$)',
-            r'(?:To fix|To resolve) this issue[,]?\s*(.*?)(?:\n#|\n\n\n|$)'
-        ]
-        
-        for pattern in solution_patterns:
-            matches = re.search(pattern, cleaned_text, re.IGNORECASE | re.DOTALL)
-            if matches:
-                solutions_text = matches.group(1).strip()
-                # Split into list items if they're formatted with numbers or bullets
-                solutions = re.findall(r'(?:^|\n)(?:\d+\.|\*|\-)\s*(.*?)(?=\n\d+\.|\n\*|\n\-|$)', solutions_text, re.DOTALL)
-                if solutions:
-                    rca_data['potential_solutions'] = [s.strip() for s in solutions]
-                else:
-                    # If no list format, split by periods or newlines
-                    sentences = re.split(r'(?<=[.!?])\s+', solutions_text)
-                    rca_data['potential_solutions'] = [s.strip() for s in sentences if len(s.strip()) > 10]
-                break
+        # Extract potential solutions, split into list items or sentences
+        solutions = sections.get('potential_solutions') or sections.get('solutions')
+        solutions_text = solutions[0] if solutions else ResponseText.fix_sentence(cleaned_text)
+        if solutions_text:
+            rca_data['potential_solutions'] = ResponseText.list_items(solutions_text)
         
         # If no solutions found, add generic solutions based on context
         if not rca_data['potential_solutions']:
@@ -903,60 +1159,23 @@ Your analysis should be detailed, technically accurate, and provide actionable i
                                                      "Add logging to capture detailed request/response information"]
         
         # Infer failure category from the text or context
-        category_keywords = {
-            'Authentication': ['auth', 'authentication', 'credential', 'permission', 'access denied'],
-            'Authorization': ['authoriz', 'permission', 'access control', 'forbidden'],
-            'Validation': ['validation', 'invalid', 'missing field', 'required field', 'input error'],
-            'Data Format': ['format', 'malformed', 'corrupt', 'json', 'xml', 'payload'],
-            'Database': ['database', 'db', 'query', 'sql', 'data store', 'record'],
-            'Performance': ['timeout', 'slow', 'performance', 'latency', 'response time'],
-            'Network': ['network', 'connection', 'dns', 'routing', 'timeout'],
-            'Configuration': ['config', 'setting', 'environment', 'parameter']
-        }
-        
-        # Try to infer category from the text
-        text_lower = cleaned_text.lower()
-        for category, keywords in category_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                rca_data['failure_category'] = category
-                break
+        rca_data['failure_category'] = cls.CATEGORY_KEYWORDS.first(cleaned_text) or ''
         
         # If still no category, infer from context
         if not rca_data['failure_category']:
             if context.get('source_type') == 'chaos_test' and 'chaos_test' in context:
                 fault_type = context['chaos_test'].get('fault_type', '')
-                category_map = {
-                    'MISSING_FIELD': 'Validation',
-                    'AUTH_FAILURE': 'Authentication',
-                    'CORRUPT_PAYLOAD': 'Data Format',
-                    'TIMEOUT': 'Performance',
-                    'MISSING_DB': 'Database',
-                    'INVALID_PARAM': 'Validation',
-                }
-                rca_data['failure_category'] = category_map.get(fault_type, 'Other')
+                rca_data['failure_category'] = cls.FAULT_TYPE_CATEGORIES.get(fault_type, 'Other')
             elif context.get('source_type') == 'api_response' and 'response' in context:
                 status_code = context['response'].get('status_code', 0)
                 rca_data['failure_category'] = cls._infer_category_from_status_code(status_code)
         
-        # Extract affected components (if any are mentioned)
-        component_patterns = [
-            r'(?:Affected Components|Components)[:]\s*(.*?)(?:\n#|\n\n|$)',
-            r'(?:affected|impacted)(?:\s+the)?\s+(\w+\s+\w+(?:\s+\w+)?)'
+        # Extract affected components (if any are mentioned), split by commas or "and"
+        mentions = sections.get('components') or ResponseText.affected_phrases(cleaned_text)
+        rca_data['affected_components'] = [
+            component for mention in mentions for component in ResponseText.split_list(mention)
         ]
         
-        for pattern in component_patterns:
-            matches = re.findall(pattern, cleaned_text, re.IGNORECASE)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    matches = [m[0] for m in matches]
-                components = []
-                for match in matches:
-                    # Split by commas or "and" if present
-                    parts = re.split(r',|\sand\s', match)
-                    components.extend([p.strip() for p in parts if p.strip()])
-                rca_data['affected_components'] = components
-                break
-        
         # Set fallback components if none found
         if not rca_data['affected_components']:
             rca_data['affected_components'] = ["API Client", "Request Processing"]
@@ -990,125 +1209,17 @@ Your analysis should be detailed, technically accurate, and provide actionable i
     @classmethod
     def _clean_response_text(cls, text):
         """Clean up response text by removing markdown formatting and unwanted sections."""
-        # Remove code blocks
-        text = re.sub(r'```json\s*.*?\s*```', '', text, flags=re.DOTALL)
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-        
-        # Remove unwanted sections
-        unwanted_sections = [
-            "Table of Contents", "Executive Summary", 
-            "JSON FORMAT", "INSTRUCTIONS", "RESPONSE FORMAT"
-        ]
-        
-        for section in unwanted_sections:
-            # Pattern to match a section header and its content until the next section
-            pattern = re.compile(rf'##\s*{section}.*?(?=##\s*\w+:|$)', re.DOTALL | re.IGNORECASE)
-            text = re.sub(pattern, '', text)
-            
-            # Also try without the ## format
-            pattern = re.compile(rf'{section}:.*?(?=\w+:|$)', re.DOTALL | re.IGNORECASE)
-            text = re.sub(pattern, '', text)
-        
-        # Clean up remaining markdown and extra whitespace
-        text = re.sub(r'##\s+', '', text)
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text.strip()
+        return ResponseText.clean(text)
         
     @classmethod
     def _infer_category_from_status_code(cls, status_code):
         """Infer the failure category based on the HTTP status code."""
-        if 400 <= status_code < 500:
-            if status_code == 400:
-                return "Validation"
-            elif status_code == 401:
-                return "Authentication"
-            elif status_code == 403:
-                return "Authorization"
-            elif status_code == 404:
-                return "Resource Not Found"
-            elif status_code == 405:
-                return "Method Not Allowed"
-            elif status_code == 413:
-                return "Request Size Limit"
-            elif status_code == 429:
-                return "Rate Limiting"
-            else:
-                return "Client Error"
-        elif 500 <= status_code < 600:
-            if status_code == 500:
-                return "Server Error"
-            elif status_code == 502:
-                return "Gateway Error"
-            elif status_code == 503:
-                return "Service Unavailability"
-            elif status_code == 504:
-                return "Timeout"
-            else:
-                return "Server Error"
-        else:
-            return "Other"
+        return RcaRules.status_category(status_code)
             
     @classmethod
     def _generate_analysis_from_status_code(cls, status_code, context):
         """Generate a basic analysis based on the HTTP status code when other methods fail."""
-        url = context['request']['url'] if 'request' in context else "unknown URL"
-        method = context['request']['method'] if 'request' in context else "unknown method"
-        
-        analysis = f"Analysis of the {method} request to {url} that resulted in a {status_code} status code:\n\n"
-        
-        if 400 <= status_code < 500:
-            if status_code == 400:
-                analysis += "The API returned a 400 Bad Request error, indicating that the server could not understand the request due to invalid syntax. "
-                analysis += "This typically happens when the request body or parameters don't match what the API expects. "
-                analysis += "Common causes include missing required fields, invalid data formats, or incompatible data types."
-            elif status_code == 401:
-                analysis += "The API returned a 401 Unauthorized error, indicating that authentication is required but was either missing or invalid. "
-                analysis += "This typically happens when no authentication credentials are provided, or when the provided credentials (like API keys or tokens) are expired or incorrect."
-            elif status_code == 403:
-                analysis += "The API returned a 403 Forbidden error, indicating that the server understood the request but refuses to authorize it. "
-                analysis += "This typically happens when the authenticated user doesn't have sufficient permissions to access the requested resource or perform the requested action."
-            elif status_code == 404:
-                analysis += "The API returned a 404 Not Found error, indicating that the requested resource could not be found on the server. "
-                analysis += "This typically happens when the URL path is incorrect, when trying to access a resource that doesn't exist, or when a resource has been deleted."
-            elif status_code == 405:
-                analysis += "The API returned a 405 Method Not Allowed error, indicating that the HTTP method used is not supported for the requested resource. "
-                analysis += f"This typically happens when trying to use {method} on an endpoint that doesn't support this method."
-            elif status_code == 429:
-                analysis += "The API returned a 429 Too Many Requests error, indicating that you've exceeded the rate limits for this API. "
-                analysis += "This typically happens when sending too many requests in a short period of time."
-            else:
-                analysis += f"The API returned a {status_code} client error, indicating an issue with the request rather than the server. "
-                analysis += "Client errors in the 4xx range typically indicate that there's something wrong with the request format, parameters, or permissions."
-        elif 500 <= status_code < 600:
-            if status_code == 500:
-                analysis += "The API returned a 500 Internal Server Error, indicating that the server encountered an unexpected condition that prevented it from fulfilling the request. "
-                analysis += "This typically happens when there's an unhandled exception or runtime error on the server side."
-            elif status_code == 502:
-                analysis += "The API returned a 502 Bad Gateway error, indicating that the server, while acting as a gateway or proxy, received an invalid response from an upstream server. "
-                analysis += "This typically happens when there are network issues between servers or when an upstream service is malfunctioning."
-            elif status_code == 503:
-                analysis += "The API returned a 503 Service Unavailable error, indicating that the server is temporarily unable to handle the request due to maintenance or overloading. "
-                analysis += "This typically happens during scheduled maintenance periods or when the server is experiencing high load."
-            elif status_code == 504:
-                analysis += "The API returned a 504 Gateway Timeout error, indicating that the server, while acting as a gateway or proxy, did not receive a timely response from an upstream server. "
-                analysis += "This typically happens when an upstream service is taking too long to respond or is unreachable."
-            else:
-                analysis += f"The API returned a {status_code} server error, indicating an issue with the server rather than your request. "
-                analysis += "Server errors in the 5xx range typically indicate that there's a problem with the API's infrastructure or code."
-        else:
-            analysis += f"The API returned an unusual status code {status_code}, which is outside the standard HTTP status code ranges. "
-            analysis += "This might indicate a custom status code used by the API or a misconfiguration in the API server."
-            
-        # Add response body analysis if available
-        if 'response' in context and 'body' in context['response'] and context['response']['body']:
-            response_body = context['response']['body']
-            if isinstance(response_body, dict) and 'error' in response_body:
-                error_msg = response_body['error']
-                analysis += f"\n\nThe API returned an error message: '{error_msg}'. "
-                analysis += "This error message provides more specific information about what went wrong."
-            elif isinstance(response_body, str) and len(response_body) > 0 and len(response_body) < 1000:
-                analysis += f"\n\nThe API returned a response body: '{response_body}'. "
-                analysis += "This response might contain more specific information about what went wrong."
-        
-        return analysis
\ No newline at end of file
+        rule_match = RcaRules.classify(context)
+        if rule_match is None:
+            return f"The API request failed with a {status_code} status code."
+        return rule_match.rca_data['detailed_analysis']
@@ -0,0 +1,323 @@
+import os
+import time
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import RcaJob, RootCauseAnalysis
+from .job_claim import JobClaim
+from .rca_engine import RcaEngine
+
+logger = logging.getLogger(__name__)
+
+
+class RcaQueue:
+    """
+    Database-backed work queue for Root Cause Analysis generation.
+
+    Views enqueue a job and return immediately; worker processes started with
+    ``manage.py rca_worker`` claim jobs by priority and run RcaEngine. Claims
+    use a conditional UPDATE so several workers can share the table without
+    an external broker or row locks.
+
+    Settings (``settings.RCA_QUEUE``, all optional):
+    - EAGER: process jobs inline when enqueued (for development without workers)
+    - MAX_ATTEMPTS: attempts before a job is marked FAILED
+    - POLL_INTERVAL: seconds an idle worker waits before polling again
+    - STALE_AFTER: seconds without a heartbeat after which a RUNNING job is considered abandoned and requeued;
+      workers refresh the heartbeat of the jobs they run every STALE_AFTER / HEARTBEATS_PER_STALE seconds,
+      so a batch slowed down by breaker backoff or Retry-After waits is never requeued while it runs
+    - BATCH_SIZE: max jobs a worker claims at once and analyses with one batched Gemini call
+    """
+
+    DEFAULTS = {
+        'EAGER': False,
+        'MAX_ATTEMPTS': 3,
+        'POLL_INTERVAL': 1.0,
+        'STALE_AFTER': 300,
+        'BATCH_SIZE': 8,
+    }
+
+    HEARTBEATS_PER_STALE = 5
+
+    # Interactive requests are analysed before background ones
+    PRIORITY_INTERACTIVE = 10
+    PRIORITY_DEFAULT = 0
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a queue setting, falling back to the class default"""
+        return getattr(settings, 'RCA_QUEUE', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def dedupe_key(chaos_test_run=None, api_response=None):
+        """Build the key identifying the failure a job analyses"""
+        if chaos_test_run:
+            return f"chaos_test_run:{chaos_test_run.pk}"
+        return f"api_response:{api_response.pk}"
+
+    @classmethod
+    def enqueue(cls, chaos_test_run=None, api_response=None, priority=PRIORITY_DEFAULT):
+        """
+        Queue RCA generation for a failure
+
+        If an active job already exists for the same failure it is returned
+        instead (and its priority raised if needed).
+
+        Args:
+            chaos_test_run: ChaosTestRun model instance (optional)
+            api_response: ApiResponse model instance (optional)
+            priority (int): Higher values are claimed first
+
+        Returns:
+            RcaJob: The queued (or existing active) job
+        """
+        if not chaos_test_run and not api_response:
+            raise ValueError("Either chaos_test_run or api_response must be provided")
+
+        key = cls.dedupe_key(chaos_test_run, api_response)
+        existing = RcaJob.objects.filter(dedupe_key=key, status__in=RcaJob.ACTIVE_STATUSES).first()
+        if existing:
+            if priority > existing.priority:
+                RcaJob.objects.filter(pk=existing.pk).update(priority=priority)
+                existing.priority = priority
+            return existing
+
+        try:
+            with transaction.atomic():
+                job = RcaJob.objects.create(
+                    chaos_test_run=chaos_test_run,
+                    api_response=api_response if not chaos_test_run else None,
+                    priority=priority,
+                    dedupe_key=key,
+                )
+        except IntegrityError:
+            # Another request queued the same failure concurrently
+            return RcaJob.objects.filter(dedupe_key=key, status__in=RcaJob.ACTIVE_STATUSES).first()
+
+        if cls.get_setting('EAGER'):
+            cls.process(job)
+        return job
+
+    @classmethod
+    def active_job_for(cls, chaos_test_run=None, api_response=None):
+        """Return the queued or running job for a failure, if any"""
+        key = cls.dedupe_key(chaos_test_run, api_response)
+        return RcaJob.objects.filter(dedupe_key=key, status__in=RcaJob.ACTIVE_STATUSES).first()
+
+    @classmethod
+    def claim(cls, worker_id):
+        """
+        Claim the next queued job for a worker
+
+        Returns:
+            RcaJob: The claimed job, or None when the queue is empty
+        """
+        return JobClaim.claim(
+            RcaJob.objects.select_related('chaos_test_run', 'api_response'),
+            worker_id, 'QUEUED', ('-priority', 'created_at')
+        )
+
+    @classmethod
+    def claim_batch(cls, worker_id, limit):
+        """
+        Claim up to ``limit`` queued jobs for a worker
+
+        Returns:
+            list: The claimed jobs, highest priority first (empty when the queue is empty)
+        """
+        if limit <= 1:
+            job = cls.claim(worker_id)
+            return [job] if job else []
+
+        candidates = list(
+            RcaJob.objects.filter(status='QUEUED').order_by('-priority', 'created_at').values_list('pk', flat=True)[:limit]
+        )
+        if not candidates:
+            return []
+
+        # Rows another worker flipped first keep that worker's id and are skipped
+        started_at = timezone.now()
+        RcaJob.objects.filter(pk__in=candidates, status='QUEUED').update(
+            status='RUNNING', worker_id=worker_id, started_at=started_at, heartbeat_at=started_at
+        )
+        return list(
+            RcaJob.objects.select_related('chaos_test_run', 'api_response')
+            .filter(pk__in=candidates, status='RUNNING', worker_id=worker_id, started_at=started_at)
+            .order_by('-priority', 'created_at')
+        )
+
+    @classmethod
+    def process_batch(cls, jobs):
+        """
+        Generate the RCAs for several jobs with batched Gemini calls
+
+        If the batch as a whole fails, each job is processed on its own so
+        failures are recorded per job.
+
+        Returns:
+            list: The generated RCA (or None) per job
+        """
+        if len(jobs) <= 1:
+            return [cls.process(job) for job in jobs]
+
+        # An RCA may already exist if the failure was analysed through another path
+        existing = {}
+        for rca in RootCauseAnalysis.objects.filter(
+            chaos_test_run_id__in=[job.chaos_test_run_id for job in jobs if job.chaos_test_run_id]
+        ):
+            existing[('chaos_test_run', rca.chaos_test_run_id)] = rca
+        for rca in RootCauseAnalysis.objects.filter(
+            api_response_id__in=[job.api_response_id for job in jobs if not job.chaos_test_run_id]
+        ):
+            existing[('api_response', rca.api_response_id)] = rca
+
+        def existing_rca(job):
+            if job.chaos_test_run_id:
+                return existing.get(('chaos_test_run', job.chaos_test_run_id))
+            return existing.get(('api_response', job.api_response_id))
+
+        chaos_jobs = [job for job in jobs if job.chaos_test_run_id and not existing_rca(job)]
+        response_jobs = [job for job in jobs if not job.chaos_test_run_id and not existing_rca(job)]
+        try:
+            rcas = RcaEngine.generate_rca_batch(
+                chaos_test_runs=[job.chaos_test_run for job in chaos_jobs],
+                api_responses=[job.api_response for job in response_jobs],
+            )
+        except Exception as e:
+            logger.error(f"Batched RCA generation for {len(jobs)} jobs failed: {str(e)}")
+            return [cls.process(job) for job in jobs]
+
+        finished_at = timezone.now()
+        rca_by_job = {job.pk: existing_rca(job) for job in jobs}
+        rca_by_job.update((job.pk, rca) for job, rca in zip(chaos_jobs + response_jobs, rcas))
+        for job in jobs:
+            rca = rca_by_job[job.pk]
+            job.attempts += 1
+            job.rca = rca
+            job.status = 'DONE'
+            job.error = None
+            job.finished_at = finished_at
+        RcaJob.objects.bulk_update(jobs, ['rca', 'status', 'error', 'attempts', 'finished_at'])
+        return [rca_by_job[job.pk] for job in jobs]
+
+    @classmethod
+    def process(cls, job):
+        """
+        Generate the RCA for a job and record the outcome
+
+        Returns:
+            RootCauseAnalysis: The generated RCA, or None if the attempt failed
+        """
+        job.attempts += 1
+        try:
+            # An RCA may already exist if the failure was analysed through another path
+            if job.chaos_test_run_id:
+                rca = RootCauseAnalysis.objects.filter(chaos_test_run_id=job.chaos_test_run_id).first()
+            else:
+                rca = RootCauseAnalysis.objects.filter(api_response_id=job.api_response_id).first()
+            if rca is None:
+                rca = RcaEngine.generate_rca(chaos_test_run=job.chaos_test_run, api_response=job.api_response)
+
+            job.rca = rca
+            job.status = 'DONE'
+            job.error = None
+            job.finished_at = timezone.now()
+            job.save(update_fields=['rca', 'status', 'error', 'attempts', 'finished_at'])
+            return rca
+
+        except Exception as e:
+            logger.error(f"RCA job {job.id} failed (attempt {job.attempts}): {str(e)}")
+            job.error = str(e)
+            if job.attempts >= cls.get_setting('MAX_ATTEMPTS'):
+                job.status = 'FAILED'
+                job.finished_at = timezone.now()
+            else:
+                job.status = 'QUEUED'
+            job.save(update_fields=['status', 'error', 'attempts', 'finished_at'])
+            return None
+
+    @classmethod
+    @contextmanager
+    def heartbeat(cls, jobs, worker_id):
+        """Keep refreshing the heartbeat of claimed jobs on a background thread while the block runs"""
+        interval = cls.get_setting('STALE_AFTER') / cls.HEARTBEATS_PER_STALE
+        stop = threading.Event()
+
+        def beat():
+            try:
+                while not stop.wait(interval):
+                    RcaJob.objects.filter(
+                        pk__in=[job.pk for job in jobs], status='RUNNING', worker_id=worker_id
+                    ).update(heartbeat_at=timezone.now())
+            finally:
+                # The thread owns its own DB connection; release it when done
+                connection.close()
+
+        thread = threading.Thread(target=beat, name=f"rca-heartbeat-{worker_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    @classmethod
+    def requeue_stale(cls):
+        """Return abandoned RUNNING jobs (e.g. from a killed worker) to the queue"""
+        cutoff = timezone.now() - timedelta(seconds=cls.get_setting('STALE_AFTER'))
+        count = RcaJob.objects.filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+            status='RUNNING',
+        ).update(status='QUEUED', worker_id=None)
+        if count:
+            logger.warning(f"Requeued {count} stale RCA job(s)")
+        return count
+
+    @classmethod
+    def run_worker(cls, worker_id=None, max_jobs=None, stop_event=None, exit_when_empty=False):
+        """
+        Process jobs until stopped
+
+        Args:
+            worker_id (str): Name recorded on claimed jobs (default host:pid)
+            max_jobs (int): Stop after processing this many jobs
+            stop_event: Optional threading/multiprocessing Event that stops the loop
+            exit_when_empty (bool): Stop as soon as the queue is empty
+
+        Returns:
+            int: Number of jobs processed
+        """
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        poll_interval = cls.get_setting('POLL_INTERVAL')
+        batch_size = max(1, cls.get_setting('BATCH_SIZE'))
+        processed = 0
+        last_stale_check = 0.0
+
+        logger.info(f"RCA worker {worker_id} started")
+        while not (stop_event and stop_event.is_set()):
+            if time.monotonic() - last_stale_check > 60:
+                cls.requeue_stale()
+                last_stale_check = time.monotonic()
+
+            limit = batch_size if not max_jobs else min(batch_size, max_jobs - processed)
+            jobs = cls.claim_batch(worker_id, limit)
+            if not jobs:
+                if exit_when_empty:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            with cls.heartbeat(jobs, worker_id):
+                cls.process_batch(jobs)
+            processed += len(jobs)
+            if max_jobs and processed >= max_jobs:
+                break
+
+        logger.info(f"RCA worker {worker_id} stopped after {processed} job(s)")
+        return processed
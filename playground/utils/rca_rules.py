@@ -0,0 +1,620 @@
+import re
+import json
+import heapq
+import logging
+import threading
+from collections import namedtuple
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from .rca_context import ContextCompactor
+from .request_diff import RequestDiff
+
+logger = logging.getLogger(__name__)
+
+CompiledRule = namedtuple('CompiledRule', ['order', 'name', 'confidence', 'body', 'headers', 'output'])
+RuleMatch = namedtuple('RuleMatch', ['rule', 'confidence', 'rca_data'])
+
+
+class _TemplateValues(dict):
+    """Values of rule text templates; unknown placeholders are left as written"""
+
+    def __missing__(self, key):
+        return f"{{{key}}}"
+
+
+def _fault_rules(fault_type, expected_status, **output):
+    """
+    Rules for a chaos fault type: confident when the API answered with one of
+    the statuses that fault should cause, tentative otherwise
+    """
+    name = fault_type.lower().replace('_', '-')
+    return (
+        {'name': f"{name}-expected-status", 'fault_types': (fault_type,), 'status': expected_status,
+         'confidence': 0.9, **output},
+        {'name': name, 'fault_types': (fault_type,), 'confidence': 0.6, **output},
+    )
+
+
+class RcaRules:
+    """
+    Rule-based RCA classifier, run before Gemini.
+
+    Rules are declared as data. Each one lists the conditions it needs, a
+    confidence score between 0 and 1 and the analysis it produces:
+
+    - status: status codes (404) or classes ('5xx')
+    - fault_types: chaos test fault types, or '*' for any chaos test
+    - body: regular expression searched in the response body (case-insensitive)
+    - headers: {response header name: regular expression, or None for "present"}
+    - root_cause, analysis: text templates; ``{status_code}``, ``{status_line}``,
+      ``{method}``, ``{url}``, ``{fault}``, ``{error}`` and ``{retry_after}`` are
+      filled in from the failure
+    - category, severity, solutions, components: the RCA fields
+
+    Rules are compiled into a dispatch table keyed by (status, fault type),
+    so a failure is checked against the handful of rules filed under its
+    status code, its status class and "any", never the whole list. The most
+    confident matching rule wins. RcaEngine skips Gemini when it reaches
+    MIN_CONFIDENCE, and uses the best match as its fallback analysis when
+    Gemini is not available. A rule without conditions catches everything.
+
+    Settings (``settings.RCA_RULES``, all optional):
+    - ENABLED: answer confident matches locally instead of calling Gemini
+    - MIN_CONFIDENCE: confidence a rule needs to skip the Gemini call
+    - RULES: extra rules in the same format, preferred to built-in ones of equal confidence
+    """
+
+    DEFAULTS = {
+        'ENABLED': True,
+        'MIN_CONFIDENCE': 0.8,
+        'RULES': (),
+    }
+
+    CONDITION_KEYS = ('status', 'fault_types', 'body', 'headers')
+    OUTPUT_KEYS = ('root_cause', 'analysis', 'category', 'severity', 'solutions', 'components')
+    STATUS_CLASS_RE = re.compile(r'^[1-5]xx$')
+    MAX_BODY_CHARS = 20000  # of the response body searched by body patterns
+
+    RULES = (
+        # Specific errors recognised from the response body or headers
+        {
+            'name': 'expired-credentials',
+            'status': (401,),
+            'body': r'expired|invalid[ _]token',
+            'confidence': 0.95,
+            'category': 'Authentication',
+            'severity': 'HIGH',
+            'root_cause': "Expired or invalid access token ({status_line})",
+            'analysis': "The API rejected the credentials sent with the request because the token has expired or is no longer valid. The request was otherwise accepted for processing, so only the credentials need to be renewed.",
+            'solutions': ["Refresh the access token before it expires",
+                          "Retry once with a new token after a 401 response",
+                          "Check the clock skew between the client and the authorization server"],
+        },
+        {
+            'name': 'invalid-token-header',
+            'status': (401,),
+            'headers': {'www-authenticate': r'invalid_token'},
+            'confidence': 0.95,
+            'category': 'Authentication',
+            'severity': 'HIGH',
+            'root_cause': "Expired or invalid access token ({status_line})",
+            'analysis': "The WWW-Authenticate header of the response reports an invalid token: the credentials were well formed but are expired, revoked or issued for another audience.",
+            'solutions': ["Refresh the access token before it expires",
+                          "Verify the token is issued for this API",
+                          "Retry once with a new token after a 401 response"],
+        },
+        {
+            'name': 'rate-limited-retry-after',
+            'status': (429,),
+            'headers': {'retry-after': None},
+            'confidence': 0.95,
+            'category': 'Rate Limiting',
+            'severity': 'MEDIUM',
+            'root_cause': "Rate limit exceeded; the API asked to retry after {retry_after}",
+            'analysis': "The API returned a 429 Too Many Requests error with a Retry-After header, indicating that the client exceeded its rate limit and must wait before sending more requests.",
+            'solutions': ["Honour the Retry-After header before retrying",
+                          "Throttle requests on the client to stay below the rate limit",
+                          "Ask the API provider for a higher quota if the traffic is expected"],
+        },
+        {
+            'name': 'missing-required-field',
+            'status': (400, 422),
+            'body': r'\brequired\b|missing (?:required )?(?:field|parameter|property|value)',
+            'confidence': 0.9,
+            'category': 'Validation',
+            'severity': 'MEDIUM',
+            'root_cause': "Required field missing from the request ({status_line})",
+            'analysis': "The API rejected the request during validation because a required field or parameter was not provided.",
+            'solutions': ["Ensure all required fields are included in the request",
+                          "Verify the API documentation for required fields",
+                          "Implement request validation before sending to the API"],
+        },
+        {
+            'name': 'malformed-payload',
+            'status': (400, 415, 422),
+            'body': r'(?:invalid|malformed|bad) json|json (?:parse|decode|syntax)|unexpected token|parse error|could not parse|malformed|unsupported media type',
+            'confidence': 0.85,
+            'category': 'Data Format',
+            'severity': 'MEDIUM',
+            'root_cause': "Malformed request payload ({status_line})",
+            'analysis': "The API could not parse the request body: the payload is malformed or not in the format announced by its Content-Type header.",
+            'solutions': ["Validate request payload format before sending",
+                          "Serialize request bodies with a JSON library instead of building strings",
+                          "Check the Content-Type header matches the payload"],
+        },
+        {
+            'name': 'database-error',
+            'status': ('5xx',),
+            'body': r'database|\bsql|deadlock|connection pool|too many connections|relation .{1,80} does not exist',
+            'confidence': 0.85,
+            'category': 'Database',
+            'severity': 'HIGH',
+            'root_cause': "Database error behind the API ({status_line})",
+            'analysis': "The error body of the response points to the database: the API failed while querying or connecting to its data store.",
+            'solutions': ["Check the database is reachable and healthy",
+                          "Review connection pool limits and slow queries",
+                          "Retry idempotent requests after a short delay"],
+        },
+        {
+            'name': 'upstream-timeout',
+            'status': ('5xx',),
+            'body': r'timed? ?out|deadline exceeded',
+            'confidence': 0.85,
+            'category': 'Timeout',
+            'severity': 'HIGH',
+            'root_cause': "Upstream service timed out ({status_line})",
+            'analysis': "The error body reports a timeout: a service behind the API did not answer in time.",
+            'solutions': ["Implement retry logic with exponential backoff",
+                          "Optimize the slow upstream call or raise its timeout",
+                          "Check for backend service availability"],
+        },
+
+        # Chaos test fault types
+        *_fault_rules(
+            'MISSING_FIELD', (400, 422),
+            category='Validation', severity='MEDIUM',
+            root_cause="API failure due to missing field issue",
+            analysis="The API request is missing one or more required fields, causing validation to fail.",
+            solutions=["Ensure all required fields are included in the request",
+                       "Verify the API documentation for required fields",
+                       "Implement request validation before sending to the API"],
+        ),
+        *_fault_rules(
+            'AUTH_FAILURE', (401, 403),
+            category='Authentication', severity='HIGH',
+            root_cause="API failure due to auth failure issue",
+            analysis="The API request has invalid or missing authentication credentials.",
+            solutions=["Verify authentication credentials are correct",
+                       "Check that the authentication token is not expired",
+                       "Ensure authentication headers are properly formatted"],
+        ),
+        *_fault_rules(
+            'CORRUPT_PAYLOAD', (400, 415, 422),
+            category='Data Format', severity='MEDIUM',
+            root_cause="API failure due to corrupt payload issue",
+            analysis="The API request contains malformed or corrupt data that cannot be processed.",
+            solutions=["Validate request payload format before sending",
+                       "Ensure JSON is properly formatted and valid",
+                       "Check for encoding issues in the request body"],
+        ),
+        *_fault_rules(
+            'TIMEOUT', (408, 504),
+            category='Performance', severity='HIGH',
+            root_cause="API failure due to timeout issue",
+            analysis="The API request timed out, indicating potential performance issues.",
+            solutions=["Implement retry logic with exponential backoff",
+                       "Consider optimizing the API endpoint for better performance",
+                       "Check for backend service availability"],
+        ),
+        *_fault_rules(
+            'MISSING_DB', (500, 503),
+            category='Database', severity='CRITICAL',
+            root_cause="API failure due to missing db issue",
+            analysis="The API failure appears to be related to database connectivity or availability issues.",
+            solutions=["Check the database is reachable and healthy",
+                       "Return a clear error when the data store is unavailable",
+                       "Add health checks for database dependencies"],
+        ),
+        *_fault_rules(
+            'INVALID_PARAM', (400, 404, 422),
+            category='Validation', severity='MEDIUM',
+            root_cause="API failure due to invalid param issue",
+            analysis="The API request contains invalid parameters that cannot be processed.",
+            solutions=["Review API documentation for correct parameter formats",
+                       "Implement input validation before sending requests",
+                       "Check for type conversion issues in parameters"],
+        ),
+        {
+            'name': 'chaos-fault',
+            'fault_types': '*',
+            'confidence': 0.3,
+            'category': 'Other',
+            'root_cause': "API failure due to {fault} issue",
+            'analysis': "The API failure was caused by a {fault} issue that requires investigation.",
+            'solutions': ["Review API documentation",
+                          "Check request format and parameters",
+                          "Implement better error handling"],
+        },
+
+        # Status codes
+        {
+            'name': 'bad-request',
+            'status': (400,),
+            'confidence': 0.6,
+            'category': 'Validation',
+            'root_cause': "Client error ({status_code}) in API request",
+            'analysis': "The API returned a 400 Bad Request error, indicating that the server could not understand the request due to invalid syntax. This typically happens when the request body or parameters don't match what the API expects. Common causes include missing required fields, invalid data formats, or incompatible data types.",
+            'solutions': ["Validate request format against API documentation",
+                          "Check for missing or invalid parameters",
+                          "Verify correct data types are being sent"],
+        },
+        {
+            'name': 'unauthorized',
+            'status': (401,),
+            'confidence': 0.85,
+            'category': 'Authentication',
+            'severity': 'HIGH',
+            'root_cause': "Client error ({status_code}) in API request: authentication missing or invalid",
+            'analysis': "The API returned a 401 Unauthorized error, indicating that authentication is required but was either missing or invalid. This typically happens when no authentication credentials are provided, or when the provided credentials (like API keys or tokens) are expired or incorrect.",
+            'solutions': ["Verify authentication credentials",
+                          "Check if authentication token has expired",
+                          "Ensure correct authentication method is being used"],
+        },
+        {
+            'name': 'forbidden',
+            'status': (403,),
+            'confidence': 0.8,
+            'category': 'Authorization',
+            'severity': 'HIGH',
+            'root_cause': "Client error ({status_code}) in API request: access to the resource is forbidden",
+            'analysis': "The API returned a 403 Forbidden error, indicating that the server understood the request but refuses to authorize it. This typically happens when the authenticated user doesn't have sufficient permissions to access the requested resource or perform the requested action.",
+            'solutions': ["Verify user permissions for the requested resource",
+                          "Check if the API key has correct scopes/permissions",
+                          "Contact API provider to ensure account has proper access"],
+        },
+        {
+            'name': 'not-found',
+            'status': (404,),
+            'confidence': 0.85,
+            'category': 'Resource Not Found',
+            'root_cause': "Client error ({status_code}) in API request: resource not found",
+            'analysis': "The API returned a 404 Not Found error, indicating that the requested resource could not be found on the server. This typically happens when the URL path is incorrect, when trying to access a resource that doesn't exist, or when a resource has been deleted.",
+            'solutions': ["Verify the resource URL is correct",
+                          "Check if the resource exists or has been deleted",
+                          "Ensure API version and endpoint paths are correct"],
+        },
+        {
+            'name': 'method-not-allowed',
+            'status': (405,),
+            'confidence': 0.85,
+            'category': 'Method Not Allowed',
+            'severity': 'LOW',
+            'root_cause': "Client error ({status_code}) in API request: {method} is not allowed",
+            'analysis': "The API returned a 405 Method Not Allowed error, indicating that the HTTP method used is not supported for the requested resource. This typically happens when trying to use {method} on an endpoint that doesn't support this method.",
+            'solutions': ["Check the Allow header of the response for the supported methods",
+                          "Verify the endpoint and method against the API documentation"],
+        },
+        {
+            'name': 'payload-too-large',
+            'status': (413,),
+            'confidence': 0.85,
+            'category': 'Request Size Limit',
+            'severity': 'LOW',
+            'root_cause': "Client error ({status_code}) in API request: payload too large",
+            'analysis': "The API returned a 413 Payload Too Large error, indicating that the request body exceeds the size the server accepts.",
+            'solutions': ["Reduce the size of the request body",
+                          "Split large uploads into several requests",
+                          "Check the server's request size limit"],
+        },
+        {
+            'name': 'rate-limited',
+            'status': (429,),
+            'confidence': 0.85,
+            'category': 'Rate Limiting',
+            'root_cause': "Client error ({status_code}) in API request: rate limit exceeded",
+            'analysis': "The API returned a 429 Too Many Requests error, indicating that you've exceeded the rate limits for this API. This typically happens when sending too many requests in a short period of time.",
+            'solutions': ["Retry with exponential backoff",
+                          "Throttle requests on the client to stay below the rate limit",
+                          "Ask the API provider for a higher quota if the traffic is expected"],
+        },
+        {
+            'name': 'internal-server-error',
+            'status': (500,),
+            'confidence': 0.5,
+            'category': 'Server Error',
+            'severity': 'HIGH',
+            'root_cause': "Server error ({status_code}) in API response",
+            'analysis': "The API returned a 500 Internal Server Error, indicating that the server encountered an unexpected condition that prevented it from fulfilling the request. This typically happens when there's an unhandled exception or runtime error on the server side.",
+            'solutions': ["Retry the request after a delay",
+                          "Contact the API provider to report the server error",
+                          "Implement circuit breaker pattern to handle repeated failures"],
+        },
+        {
+            'name': 'bad-gateway',
+            'status': (502,),
+            'confidence': 0.7,
+            'category': 'Gateway Error',
+            'severity': 'HIGH',
+            'root_cause': "Server error ({status_code}) in API response: invalid response from an upstream server",
+            'analysis': "The API returned a 502 Bad Gateway error, indicating that the server, while acting as a gateway or proxy, received an invalid response from an upstream server. This typically happens when there are network issues between servers or when an upstream service is malfunctioning.",
+            'solutions': ["Retry the request after a delay",
+                          "Check the health of the upstream service",
+                          "Implement circuit breaker pattern to handle repeated failures"],
+        },
+        {
+            'name': 'service-unavailable',
+            'status': (503,),
+            'confidence': 0.75,
+            'category': 'Service Unavailability',
+            'severity': 'HIGH',
+            'root_cause': "Server error ({status_code}) in API response: service temporarily unavailable",
+            'analysis': "The API returned a 503 Service Unavailable error, indicating that the server is temporarily unable to handle the request due to maintenance or overloading. This typically happens during scheduled maintenance periods or when the server is experiencing high load.",
+            'solutions': ["Retry the request after a delay, honouring Retry-After",
+                          "Check the API provider's status page for maintenance",
+                          "Implement circuit breaker pattern to handle repeated failures"],
+        },
+        {
+            'name': 'gateway-timeout',
+            'status': (504,),
+            'confidence': 0.85,
+            'category': 'Timeout',
+            'severity': 'HIGH',
+            'root_cause': "Server error ({status_code}) in API response: upstream server did not answer in time",
+            'analysis': "The API returned a 504 Gateway Timeout error, indicating that the server, while acting as a gateway or proxy, did not receive a timely response from an upstream server. This typically happens when an upstream service is taking too long to respond or is unreachable.",
+            'solutions': ["Implement retry logic with exponential backoff",
+                          "Optimize the slow upstream call or raise its timeout",
+                          "Check for backend service availability"],
+        },
+        {
+            'name': 'client-error',
+            'status': ('4xx',),
+            'confidence': 0.4,
+            'category': 'Client Error',
+            'root_cause': "Client error ({status_code}) in API request",
+            'analysis': "The API returned a {status_code} client error, indicating an issue with the request rather than the server. Client errors in the 4xx range typically indicate that there's something wrong with the request format, parameters, or permissions.",
+            'solutions': ["Review API documentation for correct request format",
+                          "Check for request validation errors",
+                          "Implement better error handling in the client"],
+        },
+        {
+            'name': 'server-error',
+            'status': ('5xx',),
+            'confidence': 0.4,
+            'category': 'Server Error',
+            'severity': 'HIGH',
+            'root_cause': "Server error ({status_code}) in API response",
+            'analysis': "The API returned a {status_code} server error, indicating an issue with the server rather than your request. Server errors in the 5xx range typically indicate that there's a problem with the API's infrastructure or code.",
+            'solutions': ["Retry the request after a delay",
+                          "Contact the API provider to report the server error",
+                          "Implement circuit breaker pattern to handle repeated failures"],
+        },
+        {
+            'name': 'unexpected-status',
+            'confidence': 0.2,
+            'category': 'Other',
+            'root_cause': "Unexpected status code ({status_code}) in API response",
+            'analysis': "The API returned an unusual status code {status_code}, which is outside the standard HTTP status code ranges. This might indicate a custom status code used by the API or a misconfiguration in the API server.",
+            'solutions': ["Contact the API provider for clarification",
+                          "Check documentation for custom status codes",
+                          "Implement more robust error handling for unexpected responses"],
+        },
+    )
+
+    _lock = threading.Lock()
+    _compiled = None  # (extra rules it was built from, dispatch table)
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a rule engine setting, falling back to the class default"""
+        return getattr(settings, 'RCA_RULES', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def classify(cls, context):
+        """
+        Find the most confident rule matching a failure
+
+        Args:
+            context: Context dict from RcaEngine._build_context_from_*
+
+        Returns:
+            RuleMatch: (rule name, confidence, RCA data), or None when no rule matches
+        """
+        response = cls._response(context)
+        status_code = response.get('status_code')
+        fault_type = (context.get('chaos_test') or {}).get('fault_type')
+
+        table = cls._table()
+        candidates = []
+        for status_key in (status_code, cls._status_class(status_code), None):
+            for fault_key in ((fault_type, '*', None) if fault_type else (None,)):
+                rules = table.get((status_key, fault_key))
+                if rules:
+                    candidates.append(rules)
+
+        body_text = None
+        headers = cls._headers(response.get('headers'))
+        # Each list is sorted by confidence, so the first match is the best one
+        for rule in heapq.merge(*candidates, key=lambda rule: (-rule.confidence, rule.order)):
+            if rule.body is not None:
+                if body_text is None:
+                    body_text = cls._body_text(response.get('body'))
+                if not rule.body.search(body_text):
+                    continue
+            if rule.headers and not all(
+                name in headers and (pattern is None or pattern.search(headers[name]))
+                for name, pattern in rule.headers
+            ):
+                continue
+            return RuleMatch(rule.name, rule.confidence, cls._analysis(rule, context))
+        return None
+
+    @classmethod
+    def is_confident(cls, match):
+        """Whether a match is good enough to skip the Gemini call"""
+        return (
+            match is not None
+            and cls.get_setting('ENABLED')
+            and match.confidence >= cls.get_setting('MIN_CONFIDENCE')
+        )
+
+    @classmethod
+    def status_category(cls, status_code):
+        """Failure category the status code rules give a status code, e.g. 'Rate Limiting' for 429"""
+        match = cls.classify({'source_type': 'api_response', 'response': {'status_code': status_code}})
+        return match.rca_data['failure_category'] if match else 'Other'
+
+    @classmethod
+    def _table(cls):
+        """The dispatch table for the current RULES setting, compiled on first use"""
+        extra = cls.get_setting('RULES')
+        compiled = cls._compiled
+        if compiled is None or compiled[0] is not extra:
+            with cls._lock:
+                compiled = cls._compiled = (extra, cls.compile(tuple(extra) + cls.RULES))
+        return compiled[1]
+
+    @classmethod
+    def compile(cls, rules):
+        """
+        Build the dispatch table of a list of rules
+
+        Returns:
+            dict: {(status code, class or None, fault type, '*' or None): [CompiledRule, ...]},
+                each list most confident first
+
+        Raises:
+            ImproperlyConfigured: If a rule is malformed
+        """
+        table = {}
+        for order, rule in enumerate(rules):
+            name = rule.get('name') or f"rule-{order}"
+            unknown = set(rule) - {'name', 'confidence', *cls.CONDITION_KEYS, *cls.OUTPUT_KEYS}
+            if unknown:
+                raise ImproperlyConfigured(f"RCA rule '{name}' has unknown keys: {', '.join(sorted(unknown))}")
+            confidence = rule.get('confidence')
+            if not isinstance(confidence, (int, float)) or not 0 <= confidence <= 1:
+                raise ImproperlyConfigured(f"RCA rule '{name}' needs a confidence between 0 and 1")
+
+            try:
+                body = re.compile(rule['body'], re.IGNORECASE) if rule.get('body') else None
+                headers = tuple(
+                    (header.lower(), re.compile(pattern, re.IGNORECASE) if pattern else None)
+                    for header, pattern in (rule.get('headers') or {}).items()
+                )
+            except re.error as e:
+                raise ImproperlyConfigured(f"RCA rule '{name}' has an invalid pattern: {e}")
+
+            statuses = rule.get('status') or (None,)
+            for status in statuses:
+                if not (status is None or isinstance(status, int) or cls.STATUS_CLASS_RE.match(str(status))):
+                    raise ImproperlyConfigured(f"RCA rule '{name}' has an invalid status {status!r}")
+
+            fault_types = rule.get('fault_types') or (None,)
+            if isinstance(fault_types, str):
+                fault_types = (fault_types,)
+
+            compiled = CompiledRule(
+                order, name, confidence, body, headers,
+                {key: rule[key] for key in cls.OUTPUT_KEYS if key in rule},
+            )
+            for status in statuses:
+                for fault_type in fault_types:
+                    table.setdefault((status, fault_type), []).append(compiled)
+
+        for entries in table.values():
+            entries.sort(key=lambda rule: (-rule.confidence, rule.order))
+        logger.debug(f"Compiled {len(rules)} RCA rules into {len(table)} dispatch entries")
+        return table
+
+    @staticmethod
+    def _status_class(status_code):
+        if isinstance(status_code, int) and 100 <= status_code < 600:
+            return f"{status_code // 100}xx"
+        return None
+
+    @staticmethod
+    def _response(context):
+        return context.get('failed_response') or context.get('response') or {}
+
+    @staticmethod
+    def _request(context):
+        return context.get('modified_request') or context.get('request') or {}
+
+    @staticmethod
+    def _headers(headers):
+        if isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except ValueError:
+                return {}
+        if not isinstance(headers, dict):
+            return {}
+        return {str(name).lower(): str(value) for name, value in headers.items()}
+
+    @classmethod
+    def _body_text(cls, body):
+        if body is None:
+            return ''
+        if not isinstance(body, str):
+            body = json.dumps(body, ensure_ascii=False)
+        return body[:cls.MAX_BODY_CHARS]
+
+    @staticmethod
+    def _confidence_level(confidence):
+        if confidence >= 0.8:
+            return 'HIGH'
+        if confidence >= 0.5:
+            return 'MEDIUM'
+        return 'LOW'
+
+    @classmethod
+    def _analysis(cls, rule, context):
+        """RCA data of a matched rule, filled in with the details of the failure"""
+        response = cls._response(context)
+        request = cls._request(context)
+        status_code = response.get('status_code')
+        error_fields = ContextCompactor.error_fields(ContextCompactor.parse_body(response.get('body')))
+        fault_type = (context.get('chaos_test') or {}).get('fault_type') or ''
+        values = _TemplateValues({
+            'status_code': status_code,
+            'status_line': ContextCompactor.status_line(status_code),
+            'method': request.get('method') or 'unknown method',
+            'url': request.get('url') or 'unknown URL',
+            'fault': fault_type.lower().replace('_', ' ') or 'unknown',
+            'error': next(iter(error_fields.values()), ''),
+            'retry_after': cls._headers(response.get('headers')).get('retry-after', 'a delay'),
+        })
+        output = rule.output
+        root_cause = output.get('root_cause', "API failure ({status_line})").format_map(values)
+
+        detailed_analysis = (
+            f"Analysis of the {values['method']} request to {values['url']} "
+            f"that resulted in a {status_code} status code:\n\n"
+            + output.get('analysis', '').format_map(values)
+        )
+        if error_fields:
+            path, message = next(iter(error_fields.items()))
+            detailed_analysis += f"\n\nThe API returned an error message in {path}: '{message}'"
+        elif isinstance(response.get('body'), str) and 0 < len(response['body']) < 1000:
+            detailed_analysis += f"\n\nThe API returned a response body: '{response['body']}'"
+
+        if context.get('source_type') == 'chaos_test':
+            # What the chaos test changed in the request
+            request_diff = context.get('request_diff') or RequestDiff.compute(
+                context['original_request'], context['modified_request']
+            )
+            if request_diff['changes']:
+                root_cause += f": {RequestDiff.describe(request_diff['changes'][0])}"
+                changes = '\n'.join(f"- {line}" for line in RequestDiff.summarize(request_diff, limit=10))
+                detailed_analysis += f"\n\nThe request was changed as follows, which likely caused the failure:\n{changes}"
+
+        return {
+            'root_cause': root_cause,
+            'detailed_analysis': detailed_analysis,
+            'potential_solutions': list(output.get('solutions') or ["Review the request and response data"]),
+            'confidence': cls._confidence_level(rule.confidence),
+            'impact_severity': output.get('severity', 'MEDIUM'),
+            'failure_category': output.get('category', 'Other'),
+            'affected_components': list(output.get('components') or ["API Client", "Request Handling"]),
+            'tags': ['rule-based', rule.name],
+        }
@@ -0,0 +1,213 @@
+import re
+
+
+class KeywordMatcher:
+    """
+    Find which groups of keywords occur in a text in a single pass.
+
+    The keywords are compiled into one regular expression shaped like their
+    prefix trie, so the text is scanned once however many keywords there
+    are (Aho–Corasick style). Matching is case-insensitive and on
+    substrings, like ``keyword in text.lower()``: 'auth' also occurs in
+    'authorization'.
+    """
+
+    def __init__(self, groups):
+        """
+        Args:
+            groups (dict): Ordered {label: [keywords]}; earlier labels win in ``first``
+        """
+        self.labels = list(groups)
+        owners = {}
+        for index, keywords in enumerate(groups.values()):
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), set()).add(index)
+
+        # A match is the longest keyword starting at its position, so it also
+        # stands for every keyword it contains (its Aho–Corasick output set):
+        # rank it as the best group among those
+        self._groups = {
+            keyword: min(index for other, indexes in owners.items() if other in keyword for index in indexes)
+            for keyword in owners
+        }
+        # _patterns[n] only looks for the keywords of the groups ranked before n,
+        # so the scan narrows down as better groups are found
+        self._patterns = [None] + [
+            re.compile(self._trie_pattern([keyword for keyword, indexes in owners.items() if min(indexes) < rank]))
+            for rank in range(1, len(self.labels) + 1)
+        ]
+
+    @staticmethod
+    def _trie_pattern(keywords):
+        """Regex alternation of the keywords with common prefixes factored out, longest match first"""
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}  # a keyword ends here
+
+        def build(node):
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            return f"(?:{body})?" if '' in node else body
+
+        return build(trie)
+
+    def first(self, text):
+        """
+        Label of the earliest group with a keyword in the text
+
+        Returns:
+            str: The label, or None when no keyword occurs
+        """
+        text = text.lower()
+        best = len(self.labels)
+        position = 0
+        while best:
+            match = self._patterns[best].search(text, position)
+            if match is None:
+                break
+            best = min(best, self._groups[match.group()])
+            # Keywords may overlap, so resume right after the match start
+            position = match.start() + 1
+        return self.labels[best] if best < len(self.labels) else None
+
+
+class ResponseText:
+    """
+    Precompiled parsing of free-text Gemini answers.
+
+    RcaEngine falls back to these when a response holds no usable JSON.
+    ``sections`` finds every known header (``Root Cause:``, ``Detailed
+    Analysis:``, ``Recommendations:``, ...) in one scan and cuts the text
+    between them, so each section ends at the next header at the latest and
+    the cost grows linearly with the length of the response.
+
+    Case-insensitive patterns are written in lower case and matched against
+    the lower-cased text, which is several times faster than
+    ``re.IGNORECASE``; offsets still point into the original text.
+    """
+
+    SECTION_HEADERS = {
+        'root cause': 'root_cause',
+        'detailed analysis': 'detailed_analysis',
+        'analysis': 'analysis',
+        'potential solutions': 'potential_solutions',
+        'recommendations': 'potential_solutions',
+        'solutions': 'solutions',
+        'solution': 'solutions',
+        'affected components': 'components',
+        'components': 'components',
+    }
+    # Sections that end at a blank line as well as at a markdown heading
+    PARAGRAPH_SECTIONS = ('root_cause', 'components')
+
+    # Longest header first so 'Detailed Analysis:' is not read as 'Analysis:'
+    HEADER = re.compile(rf"({'|'.join(sorted(map(re.escape, SECTION_HEADERS), key=len, reverse=True))}):\s*")
+    PARAGRAPH_END = re.compile(r'\n\n|\n#')
+    SECTION_END = re.compile(r'\n#|\n\n\n')
+
+    CODE_BLOCK = re.compile(r'```.*?```', re.DOTALL)
+    UNWANTED_SECTIONS = ('table of contents', 'executive summary', 'json format', 'instructions', 'response format')
+    UNWANTED_SECTION = re.compile(
+        rf"##\s*(?:{'|'.join(UNWANTED_SECTIONS)}).*?(?=##\s*\w+:|$)|(?:{'|'.join(UNWANTED_SECTIONS)}):.*?(?=\w+:|$)",
+        re.DOTALL,
+    )
+    HEADING_MARK = re.compile(r'##\s+')
+    BLANK_LINES = re.compile(r'\n{3,}')
+
+    # Phrases used when the answer has no section headers
+    ROOT_CAUSE_SENTENCES = (
+        re.compile(r'the root cause (?:is|appears to be|was)\s*(.*?)(?:\.|$)', re.DOTALL),
+        re.compile(r'(?:cause|reason)(?:s)? (?:of|for) the failure\s*(?:is|are|was|were)[:]*\s*(.*?)(?:\.|$)', re.DOTALL),
+    )
+    FIX_SENTENCE = re.compile(r'(?:to fix|to resolve) this issue[,]?\s*(.*?)(?:\n#|\n\n\n|$)', re.DOTALL)
+    AFFECTED_PHRASE = re.compile(r'(?:affected|impacted)(?:\s+the)?\s+(\w+\s+\w+(?:\s+\w+)?)')
+
+    LIST_ITEM = re.compile(r'(?:^|\n)(?:\d+\.|\*|\-)\s*(.*?)(?=\n\d+\.|\n\*|\n\-|$)', re.DOTALL)
+    SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+    LIST_SEPARATOR = re.compile(r',|\sand\s')
+
+    @staticmethod
+    def _finditer(pattern, text):
+        """Case-insensitive matches of a lower-case pattern, with offsets into text"""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lower-case to several; offsets would shift
+            return re.compile(pattern.pattern, pattern.flags | re.IGNORECASE).finditer(text)
+        return pattern.finditer(lowered)
+
+    @classmethod
+    def _first_group(cls, pattern, text):
+        match = next(cls._finditer(pattern, text), None)
+        return text[match.start(1):match.end(1)].strip() if match else ''
+
+    @classmethod
+    def clean(cls, text):
+        """Remove code blocks, prompt-echo sections and markdown heading marks"""
+        text = cls.CODE_BLOCK.sub('', text)
+        kept = []
+        position = 0
+        for match in cls._finditer(cls.UNWANTED_SECTION, text):
+            kept.append(text[position:match.start()])
+            position = match.end()
+        kept.append(text[position:])
+        text = cls.HEADING_MARK.sub('', ''.join(kept))
+        text = cls.BLANK_LINES.sub('\n\n', text)
+        return text.strip()
+
+    @classmethod
+    def sections(cls, text):
+        """
+        Split a cleaned answer into its sections
+
+        Returns:
+            dict: {section: [content, ...]} in the order the sections appear, empty ones left out
+        """
+        headers = list(cls._finditer(cls.HEADER, text))
+        sections = {}
+        for index, header in enumerate(headers):
+            section = cls.SECTION_HEADERS[header.group(1).lower()]
+            start = header.end()
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(text)
+            terminator = cls.PARAGRAPH_END if section in cls.PARAGRAPH_SECTIONS else cls.SECTION_END
+            stop = terminator.search(text, start, end)
+            content = text[start:stop.start() if stop else end].strip()
+            if content:
+                sections.setdefault(section, []).append(content)
+        return sections
+
+    @classmethod
+    def root_cause_sentence(cls, text):
+        """What follows 'The root cause is ...' or 'The cause of the failure was ...', or ''"""
+        for pattern in cls.ROOT_CAUSE_SENTENCES:
+            root_cause = cls._first_group(pattern, text)
+            if root_cause:
+                return root_cause
+        return ''
+
+    @classmethod
+    def fix_sentence(cls, text):
+        """What follows 'To fix this issue' or 'To resolve this issue', or ''"""
+        return cls._first_group(cls.FIX_SENTENCE, text)
+
+    @classmethod
+    def affected_phrases(cls, text):
+        """The words after every 'affected' or 'impacted'"""
+        return [text[match.start(1):match.end(1)] for match in cls._finditer(cls.AFFECTED_PHRASE, text)]
+
+    @classmethod
+    def list_items(cls, text):
+        """Items of a numbered or bulleted list, or else its sentences longer than 10 characters"""
+        items = cls.LIST_ITEM.findall(text)
+        if items:
+            return [item.strip() for item in items]
+        return [sentence.strip() for sentence in cls.SENTENCE_BREAK.split(text) if len(sentence.strip()) > 10]
+
+    @classmethod
+    def split_list(cls, text):
+        """Split 'A, B and C' into ['A', 'B', 'C']"""
+        return [part.strip() for part in cls.LIST_SEPARATOR.split(text) if part.strip()]
@@ -0,0 +1,215 @@
+import json
+from urllib.parse import urlsplit, parse_qsl
+
+
+class RequestDiff:
+    """
+    Structural difference between two API requests.
+
+    Compares the method, the URL parts, the query parameters, the headers
+    (names case-insensitively) and the body. JSON bodies are compared path
+    by path, so a removed field shows up as ``customer.id: removed`` instead
+    of two full payloads. Lists are compared position by position, which is
+    linear in their length.
+
+    ``compute`` returns a JSON-serializable dict stored on
+    ``ChaosTestRun.request_diff`` when the run is recorded::
+
+        {'changes': [{'section': 'body', 'op': 'removed', 'path': 'customer.id',
+                      'before': 42, 'after': None}, ...],
+         'omitted': 0}
+
+    ``section`` is one of SECTIONS and ``op`` is 'added', 'removed' or
+    'changed'. Values of credential headers are masked. Long values are cut,
+    and changes past MAX_CHANGES are only counted in ``omitted``.
+    """
+
+    SECTIONS = ('method', 'url', 'query', 'header', 'body')
+    MAX_CHANGES = 100
+    MAX_VALUE_CHARS = 200
+    SECRET_HEADERS = ('authorization', 'proxy-authorization', 'cookie', 'set-cookie', 'x-api-key', 'api-key', 'x-auth-token')
+
+    @classmethod
+    def compute(cls, original, modified):
+        """
+        Diff two requests
+
+        Args:
+            original: ApiRequest, or a context request dict with url, method, headers and body
+            modified: The same for the changed request
+
+        Returns:
+            dict: {'changes': [...], 'omitted': int}
+        """
+        before = cls._parts(original)
+        after = cls._parts(modified)
+        changes = []
+
+        if before['method'] != after['method']:
+            changes.append(cls._change('method', 'changed', '', before['method'], after['method']))
+
+        for part in ('scheme', 'host', 'path', 'fragment'):
+            if before['url'][part] != after['url'][part]:
+                changes.append(cls._change('url', 'changed', part, before['url'][part], after['url'][part]))
+
+        cls._diff_mapping(changes, 'query', before['query'], after['query'])
+        cls._diff_mapping(changes, 'header', before['headers'], after['headers'])
+
+        if isinstance(before['body'], (dict, list)) and isinstance(after['body'], (dict, list)):
+            cls._diff_value(changes, before['body'], after['body'], '')
+        elif before['body'] != after['body']:
+            op = 'added' if before['body'] is None else 'removed' if after['body'] is None else 'changed'
+            changes.append(cls._change('body', op, '', before['body'], after['body']))
+
+        omitted = max(0, len(changes) - cls.MAX_CHANGES)
+        return {'changes': changes[:cls.MAX_CHANGES], 'omitted': omitted}
+
+    @classmethod
+    def _parts(cls, request):
+        if isinstance(request, dict):
+            fields = request
+        else:
+            fields = {'url': request.url, 'method': request.method, 'headers': request.headers, 'body': request.body}
+
+        url = urlsplit(fields.get('url') or '')
+        query = {}
+        for name, value in parse_qsl(url.query, keep_blank_values=True):
+            query.setdefault(name, []).append(value)
+
+        headers = cls._parse(fields.get('headers'))
+        if isinstance(headers, dict):
+            # Compared case-insensitively, reported with the name as sent
+            headers = {str(name).lower(): (name, value) for name, value in headers.items()}
+        else:
+            headers = {}
+
+        return {
+            'method': (fields.get('method') or 'GET').upper(),
+            'url': {'scheme': url.scheme, 'host': url.netloc.lower(), 'path': url.path, 'fragment': url.fragment},
+            'query': {name: (name, values[0] if len(values) == 1 else values) for name, values in query.items()},
+            'headers': headers,
+            'body': cls._parse(fields.get('body')),
+        }
+
+    @staticmethod
+    def _parse(value):
+        """JSON text as the decoded object; other text unchanged, empty values as None"""
+        if isinstance(value, str):
+            if not value.strip():
+                return None
+            if value.lstrip()[:1] in ('{', '['):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    pass
+        elif value in ({}, []):
+            return None
+        return value
+
+    @classmethod
+    def _diff_mapping(cls, changes, section, before, after):
+        """Diff {key: (display name, value)} mappings such as headers or query parameters"""
+        for key, (name, value) in before.items():
+            if key not in after:
+                changes.append(cls._change(section, 'removed', name, value, None))
+            elif after[key][1] != value:
+                changes.append(cls._change(section, 'changed', after[key][0], value, after[key][1]))
+        for key, (name, value) in after.items():
+            if key not in before:
+                changes.append(cls._change(section, 'added', name, None, value))
+
+    @classmethod
+    def _diff_value(cls, changes, before, after, path):
+        """Add the differences between two JSON values at ``path``"""
+        if isinstance(before, dict) and isinstance(after, dict):
+            for key, value in before.items():
+                key_path = f"{path}.{key}" if path else str(key)
+                if key not in after:
+                    changes.append(cls._change('body', 'removed', key_path, value, None))
+                elif after[key] != value:
+                    cls._diff_value(changes, value, after[key], key_path)
+            for key, value in after.items():
+                if key not in before:
+                    changes.append(cls._change('body', 'added', f"{path}.{key}" if path else str(key), None, value))
+        elif isinstance(before, list) and isinstance(after, list):
+            for index in range(max(len(before), len(after))):
+                item_path = f"{path}[{index}]"
+                if index >= len(after):
+                    changes.append(cls._change('body', 'removed', item_path, before[index], None))
+                elif index >= len(before):
+                    changes.append(cls._change('body', 'added', item_path, None, after[index]))
+                elif before[index] != after[index]:
+                    cls._diff_value(changes, before[index], after[index], item_path)
+        else:
+            changes.append(cls._change('body', 'changed', path, before, after))
+
+    @classmethod
+    def _change(cls, section, op, path, before, after):
+        if section == 'header' and path.lower() in cls.SECRET_HEADERS:
+            before, after = cls.mask(before), cls.mask(after)
+        return {'section': section, 'op': op, 'path': path, 'before': cls._cut(before), 'after': cls._cut(after)}
+
+    @staticmethod
+    def mask(value):
+        """'Bearer <redacted, 32 chars>' for a credential"""
+        if value is None:
+            return None
+        value = str(value)
+        scheme, _, secret = value.partition(' ')
+        if secret and scheme.isalpha():
+            return f"{scheme} <redacted, {len(secret)} chars>"
+        return f"<redacted, {len(value)} chars>"
+
+    @classmethod
+    def _cut(cls, value):
+        """Values longer than MAX_VALUE_CHARS as the start of their JSON text"""
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+        if len(text) <= cls.MAX_VALUE_CHARS:
+            return value
+        return f"{text[:cls.MAX_VALUE_CHARS]}... [{len(text) - cls.MAX_VALUE_CHARS} more chars]"
+
+    @staticmethod
+    def label(change):
+        """Where a change is, e.g. 'body.customer.id', 'header Authorization' or 'url path'"""
+        if change['section'] == 'body':
+            return f"body.{change['path']}" if change['path'] else 'body'
+        if change['section'] == 'method':
+            return 'method'
+        return f"{change['section']} {change['path']}"
+
+    @classmethod
+    def describe(cls, change):
+        """One line describing a change, e.g. "body.customer_id: removed (was 42)" """
+        def show(value):
+            return repr(value) if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+        if change['op'] == 'removed':
+            return f"{cls.label(change)}: removed (was {show(change['before'])})"
+        if change['op'] == 'added':
+            return f"{cls.label(change)}: added {show(change['after'])}"
+        if change['before'] == change['after']:
+            # Masked or cut down to the same text
+            return f"{cls.label(change)}: changed (values not shown)"
+        return f"{cls.label(change)}: {show(change['before'])} -> {show(change['after'])}"
+
+    @classmethod
+    def summarize(cls, diff, limit=None):
+        """
+        Lines describing a stored diff
+
+        Args:
+            diff: Result of ``compute``
+            limit: Max lines describing changes (default all)
+
+        Returns:
+            list: One line per change, plus a count of the ones not listed
+        """
+        changes = diff.get('changes') or []
+        shown = changes if limit is None else changes[:limit]
+        lines = [cls.describe(change) for change in shown]
+        hidden = len(changes) - len(shown) + (diff.get('omitted') or 0)
+        if hidden:
+            lines.append(f"... and {hidden} more change(s)")
+        return lines
@@ -0,0 +1,256 @@
+import math
+import socket
+import logging
+import threading
+import time
+from datetime import timedelta
+from collections import defaultdict
+from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseTimer:
+    """
+    Collects the phase timings of one outgoing request on the current thread.
+
+    Used as a context manager around ``session.request``: while it is active,
+    the timed urllib3 connections below report DNS lookup, TCP connect, TLS
+    handshake and time to first byte into it. All durations come from the
+    monotonic ``time.perf_counter`` clock and are summed across redirects.
+    The caller adds the phases it measures itself (body download, persist).
+    """
+
+    NETWORK_PHASES = ('dns', 'connect', 'tls')
+    PHASES = NETWORK_PHASES + ('ttfb', 'download', 'persist')
+
+    _local = threading.local()
+
+    def __init__(self):
+        self.phases = {}
+        self._request_started = None
+        self._connected_at = None
+
+    @classmethod
+    def current(cls):
+        """The timer active on this thread, or None"""
+        return getattr(cls._local, 'timer', None)
+
+    def __enter__(self):
+        self._previous = self.current()
+        self._local.timer = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self._local.timer = self._previous
+        return False
+
+    def add(self, phase, seconds):
+        """Add a duration (in seconds) to a phase"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_ms(self):
+        """
+        Phase durations in milliseconds, keyed ``<phase>_ms``
+
+        Connection phases that did not happen because a kept-alive connection
+        was reused are reported as 0 once the server has answered; phases
+        that were never reached are None.
+        """
+        answered = 'ttfb' in self.phases
+        timings = {}
+        for phase in self.PHASES:
+            if phase in self.phases:
+                timings[f'{phase}_ms'] = round(self.phases[phase] * 1000, 3)
+            elif answered and phase in self.NETWORK_PHASES:
+                timings[f'{phase}_ms'] = 0.0
+            else:
+                timings[f'{phase}_ms'] = None
+        return timings
+
+    # Hooks called by the timed connections
+
+    def request_started(self):
+        self._request_started = time.perf_counter()
+
+    def connected(self):
+        self._connected_at = time.perf_counter()
+
+    def response_started(self):
+        """Headers received: time to first byte counts from sending the request"""
+        if self._request_started is None:
+            return
+        # Plain HTTP connects lazily inside request(); don't count it twice
+        start = max(self._request_started, self._connected_at or self._request_started)
+        self.add('ttfb', time.perf_counter() - start)
+        self._request_started = None
+
+
+class TimedConnectionMixin:
+    """Reports DNS, connect and first-byte timings to the active PhaseTimer"""
+
+    def _new_conn(self):
+        timer = PhaseTimer.current()
+        if timer is None:
+            return super()._new_conn()
+
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Let urllib3 resolve again and raise its own NameResolutionError
+            return super()._new_conn()
+        timer.add('dns', time.perf_counter() - started)
+
+        # Connect to the resolved addresses so the lookup is not repeated;
+        # the original host stays in place for SNI and certificate checks
+        host = self._dns_host
+        error = None
+        started = time.perf_counter()
+        try:
+            for address in dict.fromkeys(info[4][0] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+            timer.add('connect', time.perf_counter() - started)
+        timer.connected()
+        return sock
+
+    def request(self, *args, **kwargs):
+        timer = PhaseTimer.current()
+        if timer is not None:
+            timer.request_started()
+        return super().request(*args, **kwargs)
+
+    def getresponse(self):
+        response = super().getresponse()
+        timer = PhaseTimer.current()
+        if timer is not None:
+            timer.response_started()
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timer = PhaseTimer.current()
+        if timer is None:
+            return super().connect()
+        before = dict(timer.phases)
+        started = time.perf_counter()
+        super().connect()
+        # Everything connect() spent beyond resolving and connecting is the handshake
+        socket_time = sum(timer.phases.get(phase, 0.0) - before.get(phase, 0.0) for phase in ('dns', 'connect'))
+        timer.add('tls', max(0.0, time.perf_counter() - started - socket_time))
+        timer.connected()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report phase timings (requests through a proxy are not timed)"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+class TimingStats:
+    """
+    Percentiles of the recorded phase timings per target host.
+
+    Reads the timing columns of the most recent responses in a time window
+    (newest first, capped at MAX_SAMPLES per call) and computes nearest-rank
+    percentiles in Python, one query per call. Comparing the network phases
+    with ``ttfb`` tells whether slowness comes from the target API or from
+    our client and network.
+
+    Settings (``settings.RESPONSE_TIMING``, all optional):
+    - WINDOW_HOURS: default time window of the aggregates
+    - MAX_SAMPLES: max responses read per call
+    - PERCENTILES: percentiles reported for each phase
+    """
+
+    DEFAULTS = {
+        'WINDOW_HOURS': 24,
+        'MAX_SAMPLES': 10000,
+        'PERCENTILES': (50, 90, 99),
+    }
+
+    FIELDS = ('response_time_ms',) + tuple(f'{phase}_ms' for phase in PhaseTimer.PHASES)
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a timing setting, falling back to the class default"""
+        return getattr(settings, 'RESPONSE_TIMING', {}).get(name, cls.DEFAULTS[name])
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        """Nearest-rank percentile of an already sorted list"""
+        if not sorted_values:
+            return None
+        rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+        return sorted_values[rank - 1]
+
+    @classmethod
+    def per_host(cls, host=None, hours=None):
+        """
+        Phase percentiles per host
+
+        Args:
+            host (str): Only this host key (``scheme://host:port``); all hosts by default
+            hours (float): Size of the window in hours (default WINDOW_HOURS)
+
+        Returns:
+            dict: host -> {'samples': n, '<phase>_ms': {'p50': ..., 'max': ...}}
+        """
+        from ..models import ApiResponse
+
+        since = timezone.now() - timedelta(hours=hours or cls.get_setting('WINDOW_HOURS'))
+        responses = ApiResponse.objects.filter(created_at__gte=since).exclude(host='')
+        if host is not None:
+            responses = responses.filter(host=host)
+        rows = responses.order_by('-created_at').values_list('host', *cls.FIELDS)[:cls.get_setting('MAX_SAMPLES')]
+
+        samples = defaultdict(lambda: defaultdict(list))
+        counts = defaultdict(int)
+        for row in rows:
+            counts[row[0]] += 1
+            for field, value in zip(cls.FIELDS, row[1:]):
+                if value is not None:
+                    samples[row[0]][field].append(value)
+
+        percentiles = cls.get_setting('PERCENTILES')
+        stats = {}
+        for host_key, fields in samples.items():
+            stats[host_key] = {'samples': counts[host_key]}
+            for field in cls.FIELDS:
+                values = sorted(fields.get(field, ()))
+                summary = {f'p{p}': cls.percentile(values, p) for p in percentiles}
+                summary['max'] = values[-1] if values else None
+                stats[host_key][field] = summary
+        return stats
@@ -0,0 +1,202 @@
+import os
+import codecs
+import hashlib
+import logging
+import tempfile
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CapturedBody:
+    """Result of streaming a response body through ResponseCapture"""
+
+    def __init__(self, text, size, sha256, truncated, complete, spool_path=None):
+        self.text = text                # stored body: the whole text, or head + marker + tail
+        self.size = size                # bytes received
+        self.sha256 = sha256            # hex digest of the bytes received (not the full body if incomplete)
+        self.truncated = truncated      # text holds only the head and tail
+        self.complete = complete        # False if reading stopped at MAX_READ_BYTES
+        self.spool_path = spool_path    # full body on disk, if spooled
+
+
+class ResponseCapture:
+    """
+    Reads an HTTP response body in chunks with bounded memory.
+
+    Only the first HEAD_BYTES and the last TAIL_BYTES are kept; the total size
+    and a SHA-256 of every byte read are computed on the fly. When reading
+    stops at MAX_READ_BYTES both describe only the bytes read, and
+    ``complete`` is False. Bodies that fit in
+    head + tail are stored whole. Larger ones are stored as head, a marker
+    with the number of bytes left out, and tail, and can additionally be
+    written to SPOOL_DIR chunk by chunk. Memory per request is about
+    HEAD_BYTES + TAIL_BYTES + CHUNK_SIZE whatever the payload size.
+
+    Settings (``settings.RESPONSE_CAPTURE``, all optional):
+    - HEAD_BYTES: bytes kept from the start of the body
+    - TAIL_BYTES: bytes kept from the end of the body
+    - CHUNK_SIZE: bytes read from the socket at a time
+    - MAX_READ_BYTES: stop reading (and close the connection) after this many bytes
+    - SPOOL_DIR: directory that receives full copies of truncated bodies,
+      named by their SHA-256 (None disables spooling)
+
+    Spool files live as long as a stored response refers to them: identical
+    bodies share one file, which is deleted once the last ApiResponse
+    pointing at it is deleted. Callers that do not store the response (load
+    test hits) pass ``spool=False``.
+    """
+
+    DEFAULTS = {
+        'HEAD_BYTES': 64 * 1024,
+        'TAIL_BYTES': 16 * 1024,
+        'CHUNK_SIZE': 64 * 1024,
+        'MAX_READ_BYTES': 512 * 1024 * 1024,
+        'SPOOL_DIR': None,
+    }
+
+    TRUNCATION_MARKER = "\n... [{omitted} bytes omitted of {size}] ...\n"
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a capture setting, falling back to the class default"""
+        return getattr(settings, 'RESPONSE_CAPTURE', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def spool_path(cls, sha256):
+        """Path of the spooled copy of a body, or None when spooling is disabled"""
+        spool_dir = cls.get_setting('SPOOL_DIR')
+        return os.path.join(spool_dir, sha256) if spool_dir else None
+
+    @classmethod
+    def capture(cls, response, spool=True):
+        """
+        Stream the body of a ``requests`` response opened with ``stream=True``
+
+        Args:
+            response: The response; it is fully consumed (or closed at MAX_READ_BYTES)
+            spool (bool): Write truncated bodies to SPOOL_DIR (when it is set)
+
+        Returns:
+            CapturedBody: The stored text plus size, hash and truncation flags
+        """
+        head_limit = cls.get_setting('HEAD_BYTES')
+        tail_limit = cls.get_setting('TAIL_BYTES')
+        max_read = cls.get_setting('MAX_READ_BYTES')
+        spool_dir = cls.get_setting('SPOOL_DIR') if spool else None
+
+        head = bytearray()
+        tail = bytearray()
+        size = 0
+        digest = hashlib.sha256()
+        complete = True
+        spool_file = None
+
+        try:
+            for chunk in response.iter_content(chunk_size=cls.get_setting('CHUNK_SIZE')):
+                if not chunk:
+                    continue
+                if max_read and size + len(chunk) > max_read:
+                    chunk = chunk[:max_read - size]
+                    complete = False
+
+                size += len(chunk)
+                digest.update(chunk)
+
+                room = head_limit - len(head)
+                if room > 0:
+                    head += chunk[:room]
+                    chunk = chunk[room:]
+                if chunk:
+                    if spool_file is None and spool_dir:
+                        spool_file = cls._open_spool(spool_dir, head)
+                        if spool_file is None:
+                            spool_dir = None  # don't retry on every chunk
+                    if spool_file is not None:
+                        spool_file.write(chunk)
+                    tail += chunk
+                    if len(tail) > tail_limit:
+                        del tail[:len(tail) - tail_limit]
+
+                if not complete:
+                    logger.warning(f"Stopped reading response body at {size} bytes (MAX_READ_BYTES)")
+                    break
+        except Exception:
+            if spool_file is not None:
+                cls._discard_spool(spool_file)
+            raise
+        finally:
+            response.close()
+
+        sha256 = digest.hexdigest()
+        encoding = response.encoding or 'utf-8'
+        truncated = size > len(head) + len(tail)
+        spool_path = None
+        if spool_file is not None:
+            # Bodies stored whole need no copy on disk
+            spool_path = cls._finish_spool(spool_file, sha256) if truncated else cls._discard_spool(spool_file)
+
+        if not truncated:
+            text = cls._decode(bytes(head + tail), encoding)
+        else:
+            marker = cls.TRUNCATION_MARKER.format(omitted=size - len(head) - len(tail), size=size)
+            # The cut points may split a multi-byte character
+            text = (
+                cls._decode(bytes(head), encoding).rstrip('\ufffd')
+                + marker
+                + cls._decode(bytes(tail), encoding).lstrip('\ufffd')
+            )
+        return CapturedBody(text, size, sha256, truncated, complete, spool_path)
+
+    @staticmethod
+    def _decode(data, encoding):
+        """Decode bytes, replacing invalid sequences (unknown encodings fall back to UTF-8)"""
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = 'utf-8'
+        return data.decode(encoding, errors='replace')
+
+    @staticmethod
+    def _open_spool(spool_dir, head):
+        """Start a spool file holding everything read so far (the head)"""
+        try:
+            os.makedirs(spool_dir, exist_ok=True)
+            spool = tempfile.NamedTemporaryFile(dir=spool_dir, prefix='.partial-', delete=False)
+            spool.write(head)
+            return spool
+        except OSError as e:
+            logger.error(f"Could not spool response body to {spool_dir}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _discard_spool(spool):
+        """Close and delete a spool file"""
+        spool.close()
+        try:
+            os.unlink(spool.name)
+        except OSError:
+            pass
+
+    @classmethod
+    def _finish_spool(cls, spool, sha256):
+        """Close a spool file and move it to its content-addressed name"""
+        spool.close()
+        path = cls.spool_path(sha256)
+        try:
+            os.replace(spool.name, path)
+            return path
+        except OSError as e:
+            logger.error(f"Could not store spooled response body {sha256}: {str(e)}")
+            os.unlink(spool.name)
+            return None
+
+    @staticmethod
+    def delete_spooled(path):
+        """Delete a spooled body file (a file that is already gone is ignored)"""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Could not delete spooled response body {path}: {str(e)}")
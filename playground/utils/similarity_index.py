@@ -0,0 +1,546 @@
+import os
+import re
+import json
+import math
+import zlib
+import logging
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from .rca_cache import RcaCache
+
+try:
+    import numpy as np
+except ImportError:  # optional; related RCAs fall back to the failure category
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SimilarityIndex:
+    """
+    Similar-failure index over root cause analyses.
+
+    Each RCA becomes a sparse TF-IDF vector of hashed features: the words
+    and word pairs of its root cause and analysis, plus fingerprint features
+    of the failure (method, URL template, status code, fault type, category
+    and tags), which weigh more than words. Vectors are L2-normalized when
+    they are added, with the document frequencies of that moment, and keep
+    their MAX_FEATURES heaviest features. ``similar`` is then a cosine top-k
+    computed with NumPy from the posting lists of the query's features, so a
+    lookup only reads the RCAs sharing a feature with it and never touches
+    the database. RCAs added since the last snapshot are scanned directly
+    until the next one.
+
+    The index lives in memory and is shared between processes through two
+    files in PATH: a snapshot (``index.npz``) and a log of the RCAs added
+    and deleted since (``updates.jsonl``). Each process appends its changes
+    to the log and replays the others' before a lookup. Once the log holds
+    COMPACT_AFTER entries it is folded into a new snapshot. Appends,
+    compaction and rebuilds hold an exclusive ``flock`` on ``index.lock``
+    and readers a shared one, so no entry is lost between two processes.
+    ``manage.py rebuild_similarity_index`` rebuilds both from the database
+    and re-weights every vector with the current document frequencies.
+
+    NumPy is optional; without it the index is disabled and related RCAs are
+    found by failure category.
+
+    Settings (``settings.SIMILARITY_INDEX``, all optional):
+    - ENABLED: turn the index on or off
+    - PATH: directory of the snapshot and the log (None keeps the index in memory)
+    - DIMENSIONS: size of the hashed feature space
+    - MAX_FEATURES: features kept per RCA
+    - COMPACT_AFTER: log entries that trigger a new snapshot
+    - FINGERPRINT_WEIGHT: term weight of a fingerprint feature, relative to a word
+    """
+
+    DEFAULTS = {
+        'ENABLED': True,
+        'PATH': None,
+        'DIMENSIONS': 2 ** 18,
+        'MAX_FEATURES': 64,
+        'COMPACT_AFTER': 1000,
+        'FINGERPRINT_WEIGHT': 3.0,
+    }
+
+    SNAPSHOT_FILE = 'index.npz'
+    LOG_FILE = 'updates.jsonl'
+    LOCK_FILE = 'index.lock'
+    MAX_TEXT_CHARS = 4000  # of the detailed analysis
+    WORD_RE = re.compile(r'[a-z][a-z0-9_]+')
+    STOP_WORDS = frozenset(
+        'a an and are as at be been but by for from has have in indicating into is it its of on or that the '
+        'this to was were which with'.split()
+    )
+    # Tags describing how an analysis was made rather than the failure
+    IGNORED_TAGS = frozenset(('cached', 'fallback', 'auto-generated', 'rule-based', 'text-extracted'))
+
+    _lock = threading.RLock()
+    _loaded = False
+    _ids = []  # row -> RCA id
+    _rows = {}  # RCA id -> row, live rows only
+    _dead = []  # rows deleted since the snapshot
+    _df = None  # feature -> number of live RCAs having it
+    # Rows of the snapshot: CSR vectors, and posting lists (feature -> rows) for lookups
+    _base_indptr = None
+    _base_indices = None
+    _base_data = None
+    _postings_ptr = None
+    _postings_rows = None
+    _postings_data = None
+    # Rows added since the snapshot: (indices, data) each, scored by a plain scan
+    _tail = []
+    _tail_arrays = None  # the tail as (row of each feature, indices, data)
+    _snapshot_stamp = None
+    _log_inode = None
+    _log_offset = 0
+    _log_entries = 0
+    _file_lock_held = False
+
+    @classmethod
+    def get_setting(cls, name):
+        """Return a similarity index setting, falling back to the class default"""
+        return getattr(settings, 'SIMILARITY_INDEX', {}).get(name, cls.DEFAULTS[name])
+
+    @classmethod
+    def available(cls):
+        """Whether the index is enabled and NumPy is installed"""
+        return np is not None and cls.get_setting('ENABLED')
+
+    @classmethod
+    def add(cls, rca):
+        """Add a RootCauseAnalysis to the index"""
+        if not cls.available():
+            return
+        with cls._lock:
+            cls._sync()
+            rca_id = str(rca.id)
+            if rca_id in cls._rows:
+                return
+            indices, data = cls._weigh(*cls._vector(cls.features(rca)))
+            if not len(indices):
+                return
+            cls._record({'id': rca_id, 'i': indices.tolist(), 'v': [round(float(value), 5) for value in data]})
+
+    @classmethod
+    def remove(cls, rca_id):
+        """Drop a deleted RootCauseAnalysis from the index"""
+        if not cls.available():
+            return
+        with cls._lock:
+            cls._sync()
+            if str(rca_id) in cls._rows:
+                cls._record({'id': str(rca_id), 'deleted': True})
+
+    @classmethod
+    def similar(cls, rca, k=5):
+        """
+        Find the RCAs most similar to one
+
+        Args:
+            rca: RootCauseAnalysis instance, indexed or not
+            k: Max number of results
+
+        Returns:
+            list: (RCA id, cosine similarity) tuples, most similar first; empty
+                when the index is unavailable
+        """
+        if not cls.available():
+            return []
+        with cls._lock:
+            cls._sync()
+            if not cls._rows:
+                return []
+            row = cls._rows.get(str(rca.id))
+            if row is not None:
+                query_indices, query_data = cls._row_vector(row)
+            else:
+                query_indices, query_data = cls._weigh(*cls._vector(cls.features(rca)))
+            if not len(query_indices):
+                return []
+
+            scores = cls._scores(query_indices, query_data)
+            scores[cls._dead] = 0
+            if row is not None:
+                scores[row] = 0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(cls._ids[index], float(scores[index])) for index in top if scores[index] > 0]
+
+    @classmethod
+    def rebuild(cls, rcas):
+        """
+        Replace the index with the given RCAs, weighted with their final document frequencies
+
+        Args:
+            rcas: Iterable of RootCauseAnalysis instances, with their failure relations joined
+
+        Returns:
+            int: Number of RCAs indexed
+        """
+        if not cls.available():
+            return 0
+        with cls._lock:
+            vectors = []
+            for rca in rcas:
+                indices, weights = cls._vector(cls.features(rca))
+                if len(indices):
+                    vectors.append((str(rca.id), indices, weights))
+
+            cls._reset()
+            for _, indices, _ in vectors:
+                cls._df[indices] += 1
+            weighted = [cls._weigh(indices, weights, documents=len(vectors)) for _, indices, weights in vectors]
+            cls._set_base(*cls._csr([rca_id for rca_id, _, _ in vectors], weighted))
+
+            if cls._directory():
+                with cls._file_lock(exclusive=True):
+                    cls._write_snapshot()
+                    cls._remove_log()
+            cls._loaded = True
+            return len(vectors)
+
+    @classmethod
+    def stats(cls):
+        """Size of the index for monitoring"""
+        if not cls.available():
+            return {'enabled': False}
+        with cls._lock:
+            cls._sync()
+            return {
+                'enabled': True,
+                'rcas': len(cls._rows),
+                'features': int(len(cls._base_indices)) + sum(len(indices) for indices, _ in cls._tail),
+                'since_snapshot': len(cls._tail),
+                'log_entries': cls._log_entries,
+            }
+
+    @classmethod
+    def features(cls, rca):
+        """
+        Terms describing an RCA
+
+        Returns:
+            dict: {term: weight}; fingerprint terms start with '#'
+        """
+        terms = {}
+        text = ' '.join((rca.root_cause or '', rca.failure_category or '', (rca.detailed_analysis or '')[:cls.MAX_TEXT_CHARS]))
+        words = [word for word in cls.WORD_RE.findall(text.lower()) if word not in cls.STOP_WORDS]
+        for word in words:
+            terms[word] = terms.get(word, 0) + 1
+        for pair in zip(words, words[1:]):
+            term = ' '.join(pair)
+            terms[term] = terms.get(term, 0) + 1
+        terms = {term: 1 + math.log(count) for term, count in terms.items()}
+
+        weight = cls.get_setting('FINGERPRINT_WEIGHT')
+        for term in cls._fingerprint_terms(rca):
+            terms[term] = weight
+        return terms
+
+    @classmethod
+    def _fingerprint_terms(cls, rca):
+        request = response = None
+        fault_type = None
+        if rca.chaos_test_run_id:
+            run = rca.chaos_test_run
+            request, response = run.modified_request, run.failed_response
+            fault_type = run.chaos_test.fault_type
+        elif rca.api_response_id:
+            response = rca.api_response
+            request = response.request
+
+        terms = []
+        if request is not None:
+            template = RcaCache.url_template(request.url)
+            terms += [f"#method:{(request.method or '').lower()}", f"#url:{template}"]
+            terms += [f"#path:{segment}" for segment in template.split('?')[0].split('/')[1:] if segment]
+        if response is not None and response.status_code is not None:
+            terms += [f"#status:{response.status_code}", f"#class:{response.status_code // 100}xx"]
+        if fault_type:
+            terms.append(f"#fault:{fault_type.lower()}")
+        if rca.failure_category:
+            terms.append(f"#category:{rca.failure_category.lower()}")
+        terms += [f"#tag:{str(tag).lower()}" for tag in (rca.tags or []) if str(tag).lower() not in cls.IGNORED_TAGS]
+        return terms
+
+    @classmethod
+    def _vector(cls, terms):
+        """Hash terms into (sorted feature indexes, term weights)"""
+        dimensions = cls.get_setting('DIMENSIONS')
+        weights = {}
+        for term, weight in terms.items():
+            # crc32 rather than hash(): feature numbers must agree between processes
+            feature = zlib.crc32(term.encode('utf-8')) % dimensions
+            weights[feature] = weights.get(feature, 0) + weight
+        indices = np.array(sorted(weights), dtype=np.int32)
+        return indices, np.array([weights[index] for index in indices.tolist()], dtype=np.float32)
+
+    @classmethod
+    def _weigh(cls, indices, weights, documents=None):
+        """TF-IDF weights of a hashed vector, L2-normalized and cut to MAX_FEATURES"""
+        if cls._df is None:
+            cls._reset()
+        if documents is None:
+            documents = len(cls._rows)
+        data = weights * (np.log((1 + documents) / (1 + cls._df[indices])) + 1).astype(np.float32)
+
+        limit = cls.get_setting('MAX_FEATURES')
+        if len(data) > limit:
+            keep = np.sort(np.argpartition(-data, limit - 1)[:limit])
+            indices, data = indices[keep], data[keep]
+        norm = float(np.sqrt(np.dot(data, data)))
+        if norm:
+            data = data / norm
+        return indices, data.astype(np.float32)
+
+    @classmethod
+    def _reset(cls):
+        empty = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        cls._set_base([], np.zeros(1, dtype=np.int64), *empty)
+
+    @classmethod
+    def _set_base(cls, ids, indptr, indices, data):
+        """Make these rows the snapshot part of the index and build their posting lists"""
+        dimensions = cls.get_setting('DIMENSIONS')
+        cls._ids = list(ids)
+        cls._rows = {rca_id: row for row, rca_id in enumerate(cls._ids)}
+        cls._dead = []
+        cls._tail = []
+        cls._tail_arrays = None
+        cls._base_indptr, cls._base_indices, cls._base_data = indptr, indices, data
+
+        order = np.argsort(indices, kind='stable')
+        counts = np.bincount(indices, minlength=dimensions)
+        cls._postings_ptr = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        cls._postings_rows = np.repeat(np.arange(len(cls._ids), dtype=np.int32), np.diff(indptr))[order]
+        cls._postings_data = data[order]
+        cls._df = counts.astype(np.int32)
+
+    @classmethod
+    def _row_vector(cls, row):
+        base_size = len(cls._base_indptr) - 1
+        if row >= base_size:
+            return cls._tail[row - base_size]
+        start, end = cls._base_indptr[row], cls._base_indptr[row + 1]
+        return cls._base_indices[start:end], cls._base_data[start:end]
+
+    @classmethod
+    def _scores(cls, query_indices, query_data):
+        """Dot products of a normalized query vector with every row"""
+        base_size = len(cls._base_indptr) - 1
+
+        # Snapshot rows: walk the posting lists of the query's features only
+        starts = cls._postings_ptr[query_indices]
+        lengths = cls._postings_ptr[query_indices + 1] - starts
+        total = int(lengths.sum())
+        if total:
+            ends = np.cumsum(lengths)
+            positions = np.arange(total) + np.repeat(starts - (ends - lengths), lengths)
+            weights = cls._postings_data[positions] * np.repeat(query_data, lengths)
+            scores = np.bincount(cls._postings_rows[positions], weights=weights, minlength=base_size)
+        else:
+            scores = np.zeros(base_size)
+
+        if cls._tail:
+            if cls._tail_arrays is None:
+                cls._tail_arrays = (
+                    np.repeat(np.arange(len(cls._tail)), [len(indices) for indices, _ in cls._tail]),
+                    np.concatenate([indices for indices, _ in cls._tail]),
+                    np.concatenate([data for _, data in cls._tail]),
+                )
+            rows, indices, data = cls._tail_arrays
+            # Both index arrays are sorted per row, so matching features are found by a search
+            positions = np.searchsorted(query_indices, indices).clip(max=len(query_indices) - 1)
+            matches = query_indices[positions] == indices
+            weights = data[matches] * query_data[positions[matches]]
+            scores = np.concatenate((scores, np.bincount(rows[matches], weights=weights, minlength=len(cls._tail))))
+        return scores
+
+    @classmethod
+    def _apply(cls, entry):
+        """Apply one log entry to the in-memory index"""
+        rca_id = entry['id']
+        if entry.get('deleted'):
+            row = cls._rows.pop(rca_id, None)
+            if row is None:
+                return
+            cls._dead.append(row)
+            cls._df[cls._row_vector(row)[0]] -= 1
+        elif rca_id not in cls._rows and entry.get('i'):
+            indices = np.array(entry['i'], dtype=np.int32)
+            cls._df[indices] += 1
+            cls._rows[rca_id] = len(cls._ids)
+            cls._ids.append(rca_id)
+            cls._tail.append((indices, np.array(entry['v'], dtype=np.float32)))
+            cls._tail_arrays = None
+
+    @classmethod
+    def _record(cls, entry):
+        """Apply a change, through the shared log when the index is persisted"""
+        directory = cls._directory()
+        if not directory:
+            cls._apply(entry)
+            if len(cls._tail) + len(cls._dead) >= cls.get_setting('COMPACT_AFTER'):
+                cls._set_base(*cls._live_rows())
+            return
+        with cls._file_lock(exclusive=True):
+            with open(cls._path(cls.LOG_FILE), 'a', encoding='utf-8') as log:
+                log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            cls._sync()
+            if cls._log_entries >= cls.get_setting('COMPACT_AFTER'):
+                cls._compact()
+
+    @classmethod
+    def _directory(cls):
+        path = cls.get_setting('PATH')
+        return str(path) if path else None
+
+    @classmethod
+    def _path(cls, name):
+        return os.path.join(cls._directory(), name)
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    @classmethod
+    def _sync(cls):
+        """Load the snapshot on first use or when another process replaced it, then replay new log entries"""
+        if not cls._directory():
+            if not cls._loaded:
+                cls._reset()
+                cls._loaded = True
+            return
+
+        with cls._file_lock(exclusive=False):
+            if not cls._loaded or cls._stamp(cls._path(cls.SNAPSHOT_FILE)) != cls._snapshot_stamp:
+                cls._load_snapshot()
+            cls._replay(cls._path(cls.LOG_FILE))
+
+    @classmethod
+    @contextmanager
+    def _file_lock(cls, exclusive):
+        """Hold a flock on LOCK_FILE, shared or exclusive; re-entrant within the process"""
+        if fcntl is None or cls._file_lock_held:
+            # Callers already hold cls._lock, so only the outermost call locks the file
+            yield
+            return
+        directory = cls._directory()
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(os.path.join(directory, cls.LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            cls._file_lock_held = True
+            try:
+                yield
+            finally:
+                cls._file_lock_held = False
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def _replay(cls, path):
+        try:
+            with open(path, 'rb') as log:
+                stat = os.fstat(log.fileno())
+                if stat.st_size < cls._log_offset or cls._log_inode not in (None, stat.st_ino):
+                    # Another process folded the log into a snapshot; start over from it
+                    cls._load_snapshot()
+                cls._log_inode = stat.st_ino
+                log.seek(cls._log_offset)
+                chunk = log.read()
+        except FileNotFoundError:
+            cls._log_inode = None
+            cls._log_offset = 0
+            return
+
+        # A line still being written by another process is read next time
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        for line in complete.splitlines():
+            try:
+                cls._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable similarity index log entry: {e}")
+            cls._log_entries += 1
+        cls._log_offset += len(complete)
+
+    @classmethod
+    def _load_snapshot(cls):
+        cls._reset()
+        cls._loaded = True
+        cls._log_inode = None
+        cls._log_offset = cls._log_entries = 0
+        path = cls._path(cls.SNAPSHOT_FILE)
+        cls._snapshot_stamp = cls._stamp(path)
+        if cls._snapshot_stamp is None:
+            return
+        try:
+            with np.load(path, allow_pickle=False) as snapshot:
+                if int(snapshot['dimensions']) != cls.get_setting('DIMENSIONS'):
+                    logger.warning("Similarity index snapshot was built for other DIMENSIONS; run rebuild_similarity_index")
+                    return
+                cls._set_base(snapshot['ids'].tolist(), snapshot['indptr'], snapshot['indices'], snapshot['data'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load the similarity index snapshot {path}: {e}")
+            cls._reset()
+
+    @classmethod
+    def _compact(cls):
+        """Fold the log into a new snapshot; the caller holds the exclusive file lock"""
+        cls._replay(cls._path(cls.LOG_FILE))
+        cls._write_snapshot()
+        cls._remove_log()
+
+    @classmethod
+    def _remove_log(cls):
+        try:
+            os.remove(cls._path(cls.LOG_FILE))
+        except FileNotFoundError:
+            pass
+        cls._log_inode = None
+        cls._log_offset = cls._log_entries = 0
+
+    @classmethod
+    def _live_rows(cls):
+        """The live rows as (ids, indptr, indices, data)"""
+        live = sorted(cls._rows.values())
+        return cls._csr([cls._ids[row] for row in live], [cls._row_vector(row) for row in live])
+
+    @staticmethod
+    def _csr(ids, vectors):
+        """(ids, indptr, indices, data) of a list of (indices, data) vectors"""
+        lengths = [len(indices) for indices, _ in vectors]
+        return (
+            ids,
+            np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))),
+            np.concatenate([indices for indices, _ in vectors] or [np.zeros(0, dtype=np.int32)]),
+            np.concatenate([data for _, data in vectors] or [np.zeros(0, dtype=np.float32)]),
+        )
+
+    @classmethod
+    def _write_snapshot(cls):
+        """Write the live rows to the snapshot file, replacing it atomically, and make them the base"""
+        ids, indptr, indices, data = cls._live_rows()
+        os.makedirs(cls._directory(), exist_ok=True)
+        path = cls._path(cls.SNAPSHOT_FILE)
+        with open(path + '.tmp', 'wb') as snapshot:
+            np.savez(
+                snapshot, ids=np.array(ids, dtype='U36'), indptr=indptr, indices=indices, data=data,
+                dimensions=np.array(cls.get_setting('DIMENSIONS')),
+            )
+        os.replace(path + '.tmp', path)
+        cls._set_base(ids, indptr, indices, data)
+        cls._snapshot_stamp = cls._stamp(path)
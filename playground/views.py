@@ -1,19 +1,29 @@
 import os
 import json
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.http import HttpResponse, JsonResponse
 from django.contrib import messages
 from django.core.paginator import Paginator
 from django.utils import timezone  # Add timezone import
+from django.utils.dateparse import parse_datetime
+from django.db.models import Count, Prefetch
 from .models import (
-    ApiRequest, ApiResponse, ChaosTest, ChaosTestRun, 
-    RootCauseAnalysis, TodoItem, Product
+    ApiRequest, ApiResponse, ChaosTest, ChaosTestRun, ChaosMatrixJob,
+    LoadTestRun, RootCauseAnalysis, RcaJob, TodoItem, Product
 )
-from .forms import ApiRequestForm, ChaosTestForm, RcaGenerateForm
+from .forms import ApiRequestForm, ChaosTestForm, LoadTestForm, RcaGenerateForm
+from .pagination import KeysetPaginator
 from .utils.api_client import ApiClient
 from .utils.chaos_injector import ChaosInjector
-from .utils.rca_engine import RcaEngine
-from .utils.rate_limiter import WeakRateLimiter  # Import the rate limiter
+from .utils.rca_queue import RcaQueue
+from .utils.rca_cache import RcaCache
+from .utils.circuit_breaker import CircuitBreaker
+from .utils.dashboard_stats import DashboardStats
+from .utils.endpoint_latency import EndpointLatency
+from .utils.request_timing import PhaseTimer, TimingStats
+from .utils.request_diff import RequestDiff
+from .utils.similarity_index import SimilarityIndex
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -22,36 +32,91 @@ from .serializers import TodoItemSerializer, ProductSerializer
 
 # The GEMINI_API_KEY should be loaded from environment variables
 
+# Latest response status shown next to each request in history lists;
+# ``request.responses.first`` in the templates reads this prefetched set
+RESPONSE_STATUS_PREFETCH = Prefetch(
+    'responses', queryset=ApiResponse.objects.only('id', 'request_id', 'status_code', 'created_at')
+)
+
+
+def _request_history():
+    """ApiRequest rows with only the columns history lists render"""
+    return ApiRequest.objects.only('id', 'method', 'url', 'created_at').prefetch_related(RESPONSE_STATUS_PREFETCH)
+
+
+def _recent_rcas():
+    """RootCauseAnalysis rows for lists, with their chaos test joined in"""
+    return RootCauseAnalysis.objects.select_related('chaos_test_run__chaos_test').only(
+        'id', 'root_cause', 'failure_category', 'created_at',
+        'chaos_test_run__id', 'chaos_test_run__chaos_test__name', 'chaos_test_run__chaos_test__fault_type',
+    )
+
+
+RELATED_RCAS = 3  # shown on RCA detail pages
+MAX_SIMILAR_RCAS = 50
+
+
+def _related_rcas(rca):
+    """
+    RCAs shown as related to ``rca``
+    
+    The nearest neighbours in the similarity index, with their cosine
+    similarity as ``similarity``. Without the index, the newest RCAs of the
+    same failure category or, lacking one, the same chaos fault type.
+    """
+    scores = dict(SimilarityIndex.similar(rca, k=RELATED_RCAS * 2))
+    if scores:
+        # Index entries can outlive rows deleted without signals; ask for a few spare
+        related = sorted(_recent_rcas().filter(id__in=scores), key=lambda other: -scores[str(other.id)])
+        for other in related:
+            other.similarity = scores[str(other.id)]
+        if related:
+            return related[:RELATED_RCAS]
+    
+    if rca.failure_category:
+        related = _recent_rcas().filter(failure_category=rca.failure_category)
+    elif rca.chaos_test_run:
+        # Fallback to chaos test type if no failure category
+        related = _recent_rcas().filter(chaos_test_run__chaos_test__fault_type=rca.chaos_test_run.chaos_test.fault_type)
+    else:
+        # No good way to relate, just get recent ones
+        related = _recent_rcas()
+    return related.exclude(id=rca.id).order_by('-created_at')[:RELATED_RCAS]
+
+
+def _stored_text_paths(model, prefix=None):
+    """select_related paths joining the body/header blobs of ``model`` rows (at ``prefix``)"""
+    return [f'{prefix}__{field}' if prefix else field for field in model.STORED_TEXT_FIELDS]
+
+
 # Dashboard View
 def index(request):
     """Main dashboard view showing overall statistics and recent activity"""
     # Get recent activity
-    recent_requests = ApiRequest.objects.all().order_by('-created_at')[:10]
-    recent_chaos_runs = ChaosTestRun.objects.all().order_by('-created_at')[:5]
-    recent_rcas = RootCauseAnalysis.objects.all().order_by('-created_at')[:5]
+    recent_requests = _request_history().order_by('-created_at')[:10]
+    recent_chaos_runs = ChaosTestRun.objects.select_related('chaos_test').order_by('-created_at')[:5]
+    recent_rcas = _recent_rcas().order_by('-created_at')[:5]
     
-    # Paginate all requests
-    all_requests = ApiRequest.objects.all().order_by('-created_at')
-    request_paginator = Paginator(all_requests, 10)
-    request_page = request.GET.get('page', 1)
-    paginated_requests = request_paginator.get_page(request_page)
+    # Stat card figures, aggregated in one query per table and briefly cached
+    stats = DashboardStats.get()
+    
+    # Paginate all requests by cursor so deep pages cost the same as the first
+    request_paginator = KeysetPaginator(_request_history(), 10)
+    paginated_requests = request_paginator.get_page(request.GET.get('page'))
     
     # Paginate chaos tests
-    all_chaos_tests = ChaosTest.objects.all()
+    all_chaos_tests = ChaosTest.objects.annotate(run_count=Count('test_runs')).order_by('name')
     chaos_paginator = Paginator(all_chaos_tests, 10)
     chaos_page = request.GET.get('chaos_page', 1)
     available_chaos_tests = chaos_paginator.get_page(chaos_page)
     
     # Paginate RCAs
-    all_rcas_list = RootCauseAnalysis.objects.all().order_by('-created_at')
-    rca_paginator = Paginator(all_rcas_list, 10)
-    rca_page = request.GET.get('rca_page', 1)
-    all_rcas = rca_paginator.get_page(rca_page)
+    rca_paginator = KeysetPaginator(RootCauseAnalysis.objects.only('id', 'failure_category', 'created_at'), 10)
+    all_rcas = rca_paginator.get_page(request.GET.get('rca_page'))
     
-    # Calculate statistics
-    api_requests_count = ApiRequest.objects.count()
-    chaos_runs_count = ChaosTestRun.objects.count()
-    rca_count = RootCauseAnalysis.objects.count()
+    api_requests_count = stats['api_requests_count']
+    chaos_runs_count = stats['chaos_runs_count']
+    rca_count = stats['rca_count']
     
     # Calculate percentages for progress bars
     # These are placeholder calculations, you might want to adjust based on your business logic
@@ -59,17 +124,6 @@ def index(request):
     chaos_runs_percentage = min(100, chaos_runs_count)
     rca_percentage = min(100, rca_count)
     
-    # Calculate success rate
-    successful_responses = ApiResponse.objects.filter(status_code__gte=200, status_code__lt=400).count()
-    total_responses = ApiResponse.objects.count()
-    api_success_rate = int((successful_responses / total_responses) * 100) if total_responses > 0 else 0
-    
-    # Calculate recent chaos tests
-    recent_chaos_tests = ChaosTestRun.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(hours=24)).count()
-    
-    # Count fixed issues - since there's no 'status' field, we'll count those with 'HIGH' confidence as fixed
-    fixed_issues_count = RootCauseAnalysis.objects.filter(confidence='HIGH').count()
-    
     context = {
         'recent_requests': recent_requests,
         'recent_chaos_runs': recent_chaos_runs,
@@ -81,13 +135,13 @@ def index(request):
         # Stats for cards
         'api_requests_count': api_requests_count,
         'api_requests_count_percentage': api_requests_count_percentage,
-        'api_success_rate': api_success_rate,
+        'api_success_rate': stats['api_success_rate'],
         'chaos_runs_count': chaos_runs_count,
         'chaos_runs_percentage': chaos_runs_percentage,
-        'recent_chaos_tests': recent_chaos_tests,
+        'recent_chaos_tests': stats['recent_chaos_tests'],
         'rca_count': rca_count,
         'rca_percentage': rca_percentage,
-        'fixed_issues_count': fixed_issues_count,
+        'fixed_issues_count': stats['fixed_issues_count'],
     }
     
     return render(request, 'playground/index.html', context)
@@ -111,12 +165,12 @@ def api_tester(request):
             
             # Check if the response status code indicates a failure
             if api_response.status_code < 200 or api_response.status_code >= 300:
-                # Automatically generate RCA for non-successful responses
+                # Queue RCA generation for non-successful responses; a worker picks it up
                 try:
-                    rca = RcaEngine.generate_rca(api_response=api_response)
-                    messages.info(request, f'API request returned status code {api_response.status_code}. Root Cause Analysis was automatically generated.')
+                    RcaQueue.enqueue(api_response=api_response, priority=RcaQueue.PRIORITY_INTERACTIVE)
+                    messages.info(request, f'API request returned status code {api_response.status_code}. Root Cause Analysis has been queued.')
                 except Exception as e:
-                    messages.warning(request, f'API request returned status code {api_response.status_code}. Failed to auto-generate RCA: {str(e)}')
+                    messages.warning(request, f'API request returned status code {api_response.status_code}. Failed to queue RCA: {str(e)}')
             else:
                 messages.success(request, f'API request sent successfully! Status code: {api_response.status_code}')
             
@@ -126,7 +180,9 @@ def api_tester(request):
         form = ApiRequestForm()
     
     # Get recent responses for history panel
-    recent_responses = ApiResponse.objects.all().order_by('-created_at')[:10]
+    recent_responses = ApiResponse.objects.select_related('request').only(
+        'id', 'status_code', 'created_at', 'request__method', 'request__url'
+    ).order_by('-created_at')[:10]
     
     context = {
         'form': form,
@@ -138,7 +194,12 @@ def api_tester(request):
 def api_response_detail(request, response_id):
     """View for displaying API response details"""
     try:
-        api_response = get_object_or_404(ApiResponse, id=response_id)
+        api_response = get_object_or_404(
+            ApiResponse.objects.select_related(
+                *_stored_text_paths(ApiResponse), *_stored_text_paths(ApiRequest, 'request')
+            ),
+            id=response_id,
+        )
         api_request = api_response.request
         
         # Format response body if it's JSON
@@ -175,6 +236,17 @@ def api_response_detail(request, response_id):
         except Exception as e:
             formatted_request_body = f"Error parsing request body: {str(e)}"
         
+        # Phase timings of this response next to the host's recent percentiles
+        host_stats = {}
+        if api_response.host:
+            host_stats = TimingStats.per_host(host=api_response.host).get(api_response.host, {})
+        timing_rows = []
+        for phase, label in zip(PhaseTimer.PHASES, ('DNS', 'Connect', 'TLS', 'First byte', 'Download', 'Persist')):
+            ms = getattr(api_response, f'{phase}_ms')
+            if ms is not None:
+                summary = host_stats.get(f'{phase}_ms', {})
+                timing_rows.append((label, ms, summary.get('p50'), summary.get('p99')))
+        
         # Check if this response already has an RCA
         has_rca = RootCauseAnalysis.objects.filter(api_response=api_response).exists()
         
@@ -184,6 +256,14 @@ def api_response_detail(request, response_id):
             'formatted_response': formatted_response,
             'formatted_request_body': formatted_request_body,
             'has_rca': has_rca,
+            'rca_job': None if has_rca else RcaQueue.active_job_for(api_response=api_response),
+            'timing_rows': timing_rows,
+            'load_test_form': LoadTestForm(),
+            'recent_load_tests': LoadTestRun.objects.filter(api_request=api_request).only(
+                'id', 'mode', 'target_rps', 'concurrency', 'duration_seconds', 'status', 'p99_ms', 'created_at'
+            )[:5],
+            'timing_samples': host_stats.get('samples', 0),
+            'timing_window_hours': TimingStats.get_setting('WINDOW_HOURS'),
         }
         
         # If it has an RCA, include it in the context
@@ -209,6 +289,51 @@ def api_response_detail(request, response_id):
         messages.error(request, f"An error occurred while loading the API response: {str(e)}")
         return redirect('api_tester')
 
+def load_test(request, request_id):
+    """View for starting a load test that replays a saved API request"""
+    if request.method != 'POST':
+        return redirect('api_tester')
+
+    api_request = get_object_or_404(ApiRequest, id=request_id)
+    response_id = request.POST.get('response_id')
+    form = LoadTestForm(request.POST)
+    if not form.is_valid():
+        errors = '; '.join(error for field_errors in form.errors.values() for error in field_errors)
+        messages.error(request, f'Invalid load test settings: {errors}')
+        return redirect('api_response_detail', response_id=response_id) if response_id else redirect('api_tester')
+    
+    run = LoadTestRun.objects.create(
+        api_request=api_request,
+        mode=form.cleaned_data['mode'],
+        target_rps=form.cleaned_data['target_rps'] if form.cleaned_data['mode'] == 'RPS' else None,
+        concurrency=form.cleaned_data['concurrency'] if form.cleaned_data['mode'] == 'CONCURRENCY' else None,
+        duration_seconds=form.cleaned_data['duration_seconds'],
+    )
+    # A job worker picks the pending run up; the detail page polls until it finishes
+    messages.success(request, f'Load test of {run.duration_seconds} seconds queued.')
+    return redirect('load_test_detail', load_test_id=run.id)
+
+def load_test_detail(request, load_test_id):
+    """View for displaying the progress and aggregated results of a load test"""
+    run = get_object_or_404(LoadTestRun.objects.select_related('api_request'), id=load_test_id)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'status': run.status,
+            'progress': run.get_progress_percentage(),
+            'total_requests': run.total_requests,
+            'error_requests': run.error_requests,
+            'error': run.error,
+        })
+    
+    context = {
+        'run': run,
+        'api_request': run.api_request,
+        'is_running': run.status in ('PENDING', 'RUNNING'),
+        'first_throttled_second': run.get_first_throttled_second(),
+    }
+    return render(request, 'playground/load_test_detail.html', context)
+
 def generate_api_rca(request):
     """View for generating RCA for a failed API response"""
     if request.method == 'POST':
@@ -224,15 +349,14 @@ def generate_api_rca(request):
             
             # Check if RCA already exists
             if RootCauseAnalysis.objects.filter(api_response=api_response).exists():
-                rca = RootCauseAnalysis.objects.get(api_response=api_response)
                 messages.info(request, 'An RCA already exists for this API response.')
             else:
-                # Generate RCA using the enhanced RcaEngine
+                # Queue RCA generation; the detail page polls for the result
                 try:
-                    rca = RcaEngine.generate_rca(api_response=api_response)
-                    messages.success(request, 'Root Cause Analysis for API failure generated successfully!')
+                    RcaQueue.enqueue(api_response=api_response, priority=RcaQueue.PRIORITY_INTERACTIVE)
+                    messages.success(request, 'Root Cause Analysis for API failure has been queued.')
                 except Exception as e:
-                    messages.error(request, f'Error generating RCA: {str(e)}')
+                    messages.error(request, f'Error queueing RCA: {str(e)}')
                     return redirect('api_response_detail', response_id=response_id)
             
             # Redirect to the API response detail with the RCA included
@@ -250,13 +374,17 @@ def generate_api_rca(request):
 
 def view_api_rca(request, response_id):
     """View for displaying RCA for an API response"""
-    api_response = get_object_or_404(ApiResponse, id=response_id)
+    api_response = get_object_or_404(
+        ApiResponse.objects.select_related(
+            'request', *_stored_text_paths(ApiResponse), *_stored_text_paths(ApiRequest, 'request')
+        ),
+        id=response_id,
+    )
     rca = get_object_or_404(RootCauseAnalysis, api_response=api_response)
+    rca.api_response = api_response  # already loaded with its request
     
-    # Get related RCAs with similar failure type
-    related_rcas = RootCauseAnalysis.objects.filter(
-        failure_category=rca.failure_category
-    ).exclude(id=rca.id).order_by('-created_at')[:3]
+    # Get related RCAs describing similar failures
+    related_rcas = _related_rcas(rca)
     
     # Get failure categories for analytics
     categories = RootCauseAnalysis.objects.exclude(failure_category__isnull=True).values_list('failure_category', flat=True).distinct()
@@ -274,7 +402,7 @@ def view_api_rca(request, response_id):
 def break_app(request):
     """View for showing chaos test dashboard"""
     # Get or create chaos tests
-    if ChaosTest.objects.count() == 0:
+    if not ChaosTest.objects.exists():
         # Create some default chaos tests if none exist
         default_tests = [
             {
@@ -318,13 +446,13 @@ def break_app(request):
         form = ChaosTestForm()
     
     # Get API requests for selection
-    api_requests = ApiRequest.objects.all().order_by('-created_at')[:20]
+    api_requests = _request_history().order_by('-created_at')[:20]
     
-    # Get chaos tests
-    chaos_tests = ChaosTest.objects.all()
+    # Get chaos tests, with their run counts in the same query
+    chaos_tests = ChaosTest.objects.annotate(run_count=Count('test_runs')).order_by('name')
     
     # Get recent chaos test runs
-    recent_runs = ChaosTestRun.objects.all().order_by('-created_at')[:10]
+    recent_runs = ChaosTestRun.objects.select_related('chaos_test').order_by('-created_at')[:10]
     
     context = {
         'form': form,
@@ -354,6 +482,12 @@ def apply_chaos(request):
             
             # Apply chaos injection
             test_run = ChaosInjector.inject_chaos(original_request, chaos_test)
+            if test_run is None:
+                error = f'Chaos test "{chaos_test.name}" does not apply to this request (nothing to change).'
+                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return JsonResponse({'error': error}, status=400)
+                messages.warning(request, error)
+                return redirect('break_app')
             failed_response = test_run.failed_response
             
             # Return JSON response for AJAX requests
@@ -382,14 +516,69 @@ def apply_chaos(request):
     # If not POST, redirect to the break_app view
     return redirect('break_app')
 
+def chaos_matrix(request):
+    """View for starting a chaos matrix job (every selected request x every selected test)"""
+    if request.method == 'POST':
+        request_ids = request.POST.getlist('request_ids')
+        test_ids = request.POST.getlist('test_ids')
+        
+        if not request_ids or not test_ids:
+            messages.error(request, 'Please select at least one API request and one chaos test.')
+            return redirect('break_app')
+        
+        try:
+            api_requests = ApiRequest.objects.filter(id__in=request_ids)
+            chaos_tests = ChaosTest.objects.filter(id__in=test_ids)
+            
+            job = ChaosMatrixJob.objects.create()
+            job.api_requests.set(api_requests)
+            job.chaos_tests.set(chaos_tests)
+            
+            # A job worker picks the pending job up; the detail page polls until it finishes
+            messages.success(
+                request,
+                f'Chaos matrix queued: {len(request_ids)} requests x {len(test_ids)} chaos tests.'
+            )
+            return redirect('chaos_matrix_detail', job_id=job.id)
+        
+        except Exception as e:
+            messages.error(request, f'Error starting chaos matrix: {str(e)}')
+            return redirect('break_app')
+    
+    # If not POST, redirect to the break_app view
+    return redirect('break_app')
+
+def chaos_matrix_detail(request, job_id):
+    """View for displaying the progress and summary grid of a chaos matrix job"""
+    job = get_object_or_404(ChaosMatrixJob, id=job_id)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({
+            'status': job.status,
+            'total_cases': job.total_cases,
+            'completed_cases': job.completed_cases,
+            'progress': job.get_progress_percentage(),
+            'summary': job.summary,
+            'error': job.error,
+        })
+    
+    context = {
+        'job': job,
+        'summary': job.summary,
+        'is_running': job.status in ('PENDING', 'RUNNING'),
+    }
+    
+    return render(request, 'playground/chaos_matrix_detail.html', context)
+
 def chaos_test_runs(request):
     """View for listing all chaos test runs"""
-    runs = ChaosTestRun.objects.all().order_by('-created_at')
+    runs = ChaosTestRun.objects.select_related('chaos_test', 'failed_response').only(
+        'id', 'created_at', 'chaos_test__name', 'chaos_test__fault_type', 'failed_response__status_code'
+    )
     
-    # Pagination
-    paginator = Paginator(runs, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Cursor pagination, newest first
+    paginator = KeysetPaginator(runs, 10)
+    page_obj = paginator.get_page(request.GET.get('page'))
     
     context = {
         'page_obj': page_obj,
@@ -399,19 +588,37 @@ def chaos_test_runs(request):
 
 def chaos_test_run_detail(request, run_id):
     """View for displaying chaos test run details"""
-    run = get_object_or_404(ChaosTestRun, id=run_id)
+    run = get_object_or_404(
+        ChaosTestRun.objects.select_related(
+            'chaos_test',
+            *_stored_text_paths(ApiRequest, 'original_request'),
+            *_stored_text_paths(ApiRequest, 'modified_request'),
+            *_stored_text_paths(ApiResponse, 'failed_response'),
+        ),
+        id=run_id,
+    )
     
     # Check if this run already has an RCA
-    has_rca = RootCauseAnalysis.objects.filter(chaos_test_run=run).exists()
+    rca = RootCauseAnalysis.objects.filter(chaos_test_run=run).first()
+    has_rca = rca is not None
+    
+    # Runs recorded before diffs were stored are diffed on the fly
+    request_diff = run.request_diff
+    if request_diff is None:
+        request_diff = RequestDiff.compute(run.original_request, run.modified_request)
     
     context = {
         'run': run,
+        'request_changes': [
+            {**change, 'label': RequestDiff.label(change)} for change in request_diff['changes']
+        ],
+        'request_changes_omitted': request_diff.get('omitted', 0),
         'has_rca': has_rca,
+        'rca_job': None if has_rca else RcaQueue.active_job_for(chaos_test_run=run),
     }
     
     # If it has an RCA, include it in the context
     if has_rca:
-        rca = RootCauseAnalysis.objects.get(chaos_test_run=run)
         context['rca'] = rca
     
     return render(request, 'playground/chaos_test_run_detail.html', context)
@@ -430,18 +637,24 @@ def rca_generator(request):
                     rca = RootCauseAnalysis.objects.get(chaos_test_run=chaos_test_run)
                     messages.info(request, 'An RCA already exists for this test run.')
                 else:
-                    # Generate RCA
+                    # Queue RCA generation
                     try:
-                        rca = RcaEngine.generate_rca(chaos_test_run)
-                        messages.success(request, 'Root Cause Analysis generated successfully!')
+                        job = RcaQueue.enqueue(chaos_test_run=chaos_test_run, priority=RcaQueue.PRIORITY_INTERACTIVE)
                     except Exception as e:
                         # Log the exception for debugging
                         import logging
                         logger = logging.getLogger(__name__)
-                        logger.error(f"Error in RCA generation: {str(e)}")
+                        logger.error(f"Error queueing RCA generation: {str(e)}")
                         
-                        messages.error(request, f'Error generating RCA: {str(e)}')
+                        messages.error(request, f'Error queueing RCA: {str(e)}')
                         return redirect('rca_generator')
+                    
+                    rca = job.rca
+                    if rca is None:
+                        # The run detail page polls until the worker finishes
+                        messages.success(request, 'Root Cause Analysis has been queued.')
+                        return redirect('chaos_test_run_detail', run_id=chaos_test_run.id)
+                    messages.success(request, 'Root Cause Analysis generated successfully!')
                 
                 # Redirect to RCA detail
                 return redirect('rca_detail', rca_id=rca.id)
@@ -454,7 +667,7 @@ def rca_generator(request):
             form = RcaGenerateForm()
         
         # Get recent RCAs
-        rcas = RootCauseAnalysis.objects.all().order_by('-created_at')[:10]
+        rcas = _recent_rcas().order_by('-created_at')[:10]
         
         context = {
             'form': form,
@@ -477,7 +690,7 @@ def rca_generator(request):
         
         # Get recent RCAs (if possible)
         try:
-            rcas = RootCauseAnalysis.objects.all().order_by('-created_at')[:10]
+            rcas = _recent_rcas().order_by('-created_at')[:10]
         except Exception:
             rcas = []
         
@@ -490,24 +703,23 @@ def rca_generator(request):
 
 def rca_detail(request, rca_id):
     """View for displaying RCA details"""
-    rca = get_object_or_404(RootCauseAnalysis, id=rca_id)
+    rca = get_object_or_404(
+        RootCauseAnalysis.objects.select_related(
+            'chaos_test_run__chaos_test',
+            *_stored_text_paths(ApiRequest, 'chaos_test_run__original_request'),
+            *_stored_text_paths(ApiRequest, 'chaos_test_run__modified_request'),
+            *_stored_text_paths(ApiResponse, 'chaos_test_run__failed_response'),
+            *_stored_text_paths(ApiRequest, 'api_response__request'),
+            *_stored_text_paths(ApiResponse, 'api_response'),
+        ),
+        id=rca_id,
+    )
     
     # Get failure categories for analytics
     categories = RootCauseAnalysis.objects.exclude(failure_category__isnull=True).values_list('failure_category', flat=True).distinct()
     
-    # Get related RCAs with similar failure type
-    if rca.failure_category:
-        related_rcas = RootCauseAnalysis.objects.filter(
-            failure_category=rca.failure_category
-        ).exclude(id=rca.id).order_by('-created_at')[:3]
-    elif rca.chaos_test_run:
-        # Fallback to chaos test type if no failure category
-        related_rcas = RootCauseAnalysis.objects.filter(
-            chaos_test_run__chaos_test__fault_type=rca.chaos_test_run.chaos_test.fault_type
-        ).exclude(id=rca.id).order_by('-created_at')[:3]
-    else:
-        # No good way to relate, just get recent ones
-        related_rcas = RootCauseAnalysis.objects.exclude(id=rca.id).order_by('-created_at')[:3]
+    # Get related RCAs describing similar failures
+    related_rcas = _related_rcas(rca)
     
     context = {
         'rca': rca,
@@ -525,6 +737,155 @@ def rca_detail(request, rca_id):
     
     return render(request, 'playground/rca_detail.html', context)
 
+def similar_rcas(request, rca_id):
+    """JSON view of the RCAs most similar to one, from the similarity index (?k=, default 5)"""
+    rca = get_object_or_404(
+        RootCauseAnalysis.objects.select_related(
+            'chaos_test_run__chaos_test',
+            'chaos_test_run__modified_request',
+            'chaos_test_run__failed_response',
+            'api_response__request',
+        ),
+        id=rca_id,
+    )
+    try:
+        k = int(request.GET.get('k') or 5)
+    except ValueError:
+        return JsonResponse({'error': 'k must be an integer'}, status=400)
+    if not 1 <= k <= MAX_SIMILAR_RCAS:
+        return JsonResponse({'error': f'k must be between 1 and {MAX_SIMILAR_RCAS}'}, status=400)
+    if not SimilarityIndex.available():
+        return JsonResponse({'error': 'The similarity index is disabled or NumPy is not installed'}, status=503)
+    
+    matches = SimilarityIndex.similar(rca, k=k)
+    rcas = {str(other.id): other for other in _recent_rcas().filter(id__in=[other_id for other_id, _ in matches])}
+    return JsonResponse({
+        'rca_id': str(rca.id),
+        'results': [
+            {
+                'id': other_id,
+                'similarity': round(score, 4),
+                'root_cause': rcas[other_id].root_cause,
+                'failure_category': rcas[other_id].failure_category,
+                'created_at': rcas[other_id].created_at.isoformat(),
+                'url': reverse('rca_detail', kwargs={'rca_id': other_id}),
+            }
+            for other_id, score in matches if other_id in rcas
+        ],
+    })
+
+def rca_job_status(request, job_id):
+    """JSON view polled by detail pages while a queued RCA is being generated"""
+    job = get_object_or_404(RcaJob, id=job_id)
+    
+    data = {
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error,
+        'rca_id': str(job.rca_id) if job.rca_id else None,
+        'rca_url': None,
+    }
+    if job.rca_id:
+        data['rca_url'] = reverse('rca_detail', kwargs={'rca_id': job.rca_id})
+    
+    return JsonResponse(data)
+
+def rca_engine_status(request):
+    """JSON monitoring view for the RCA pipeline of this process"""
+    queue_counts = dict(
+        RcaJob.objects.values_list('status').annotate(count=Count('id')).order_by()
+    )
+    
+    return JsonResponse({
+        'circuit_breakers': CircuitBreaker.stats(),
+        'rca_cache': RcaCache.stats(),
+        'similarity_index': SimilarityIndex.stats(),
+        'rca_queue': {status: queue_counts.get(status, 0) for status, _ in RcaJob.STATUS_CHOICES},
+    })
+
+def response_timing_stats(request):
+    """JSON view of request phase percentiles per target host (?host=, ?hours=)"""
+    try:
+        hours = float(request.GET['hours']) if request.GET.get('hours') else None
+    except ValueError:
+        return JsonResponse({'error': 'hours must be a number'}, status=400)
+    if hours is not None and hours <= 0:
+        return JsonResponse({'error': 'hours must be positive'}, status=400)
+    
+    return JsonResponse({
+        'window_hours': hours or TimingStats.get_setting('WINDOW_HOURS'),
+        'hosts': TimingStats.per_host(host=request.GET.get('host') or None, hours=hours),
+    })
+
+def _latency_query(request):
+    """
+    Read the window and endpoint filters of the latency views from the query string
+    
+    ``?hours=`` sets a window ending now; ``?start=`` and ``?end=`` (ISO 8601)
+    set an explicit one. ``?method=`` and ``?endpoint=`` select one endpoint.
+    
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    start = end = hours = None
+    if request.GET.get('hours'):
+        hours = float(request.GET['hours'])
+        if hours <= 0:
+            raise ValueError("hours must be positive")
+    for name in ('start', 'end'):
+        if request.GET.get(name):
+            moment = parse_datetime(request.GET[name])
+            if moment is None:
+                raise ValueError(f"{name} must be an ISO 8601 datetime")
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            if name == 'start':
+                start = moment
+            else:
+                end = moment
+    start, end = EndpointLatency.window(start, end, hours)
+    if start >= end:
+        raise ValueError("start must be before end")
+    return start, end, request.GET.get('method') or None, request.GET.get('endpoint') or None
+
+def endpoint_latency(request):
+    """View for latency percentiles per endpoint, read from the bucketed histograms"""
+    try:
+        start, end, method, endpoint = _latency_query(request)
+    except ValueError as e:
+        messages.error(request, f'Invalid latency window: {str(e)}')
+        start, end = EndpointLatency.window()
+        method = endpoint = None
+    
+    context = {
+        'endpoints': EndpointLatency.percentiles(start, end),
+        'start': start,
+        'end': end,
+        'method': method,
+        'endpoint': endpoint,
+        'series': EndpointLatency.series(start, end, method, endpoint) if method and endpoint else None,
+        'window_choices': [(1, '1 hour'), (24, '24 hours'), (24 * 7, '7 days'), (24 * 30, '30 days')],
+        'hours': request.GET.get('hours', ''),
+    }
+    return render(request, 'playground/endpoint_latency.html', context)
+
+def latency_stats(request):
+    """JSON view of latency percentiles per endpoint, with a per-bucket series when one endpoint is selected"""
+    try:
+        start, end, method, endpoint = _latency_query(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    data = {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'bucket_seconds': EndpointLatency.get_setting('BUCKET_SECONDS'),
+        'endpoints': EndpointLatency.percentiles(start, end, method, endpoint),
+    }
+    if method and endpoint:
+        data['series'] = EndpointLatency.series(start, end, method, endpoint)
+    return JsonResponse(data)
+
 # Internal REST API Views
 class TodoItemViewSet(viewsets.ModelViewSet):
     """ViewSet for TodoItem CRUD operations"""
@@ -532,9 +893,7 @@ class TodoItemViewSet(viewsets.ModelViewSet):
     serializer_class = TodoItemSerializer
 
     def dispatch(self, request, *args, **kwargs):
-        # Apply weak rate limiting to all TodoItem API endpoints
-        if WeakRateLimiter.is_rate_limited(request):
-            return WeakRateLimiter.get_rate_limit_response()
+        # Rate limiting is applied by RateLimitMiddleware before dispatch
         try:
             return super().dispatch(request, *args, **kwargs)
         except Exception as e:
@@ -553,10 +912,6 @@ class TodoItemViewSet(viewsets.ModelViewSet):
     def delete_completed(self, request):
         """Delete all completed todos"""
         try:
-            # Check rate limiting again for this specific action
-            if WeakRateLimiter.is_rate_limited(request):
-                return WeakRateLimiter.get_rate_limit_response()
-                
             deleted_count = TodoItem.objects.filter(completed=True).delete()[0]
             return Response({
                 "message": f"Deleted {deleted_count} completed todo items",
@@ -575,9 +930,7 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
 
     def dispatch(self, request, *args, **kwargs):
-        # Apply weak rate limiting to all Product API endpoints
-        if WeakRateLimiter.is_rate_limited(request):
-            return WeakRateLimiter.get_rate_limit_response()
+        # Rate limiting is applied by RateLimitMiddleware before dispatch
         try:
             return super().dispatch(request, *args, **kwargs)
         except Exception as e:
@@ -596,11 +949,11 @@ class ProductViewSet(viewsets.ModelViewSet):
     def available(self, request):
         """Get only available products"""
         try:
-            # Check rate limiting again for this specific action
-            if WeakRateLimiter.is_rate_limited(request):
-                return WeakRateLimiter.get_rate_limit_response()
-                
             available_products = Product.objects.filter(is_available=True)
+            page = self.paginate_queryset(available_products)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
             serializer = self.get_serializer(available_products, many=True)
             return Response(serializer.data)
         except Exception as e:
@@ -613,10 +966,6 @@ class ProductViewSet(viewsets.ModelViewSet):
     def update_inventory(self, request, pk=None):
         """Update product inventory"""
         try:
-            # Check rate limiting again for this specific action
-            if WeakRateLimiter.is_rate_limited(request):
-                return WeakRateLimiter.get_rate_limit_response()
-                
             product = self.get_object()
             try:
                 quantity = int(request.data.get('quantity', 0))
@@ -3,3 +3,7 @@ cd /home/ubuntu/fixit.ai
 source venv/bin/activate
 nohup gunicorn fixit_ai.wsgi:application --bind 0.0.0.0:8000 --workers 3 --access-logfile logs/access.log --error-logfile logs/error.log &
 echo "Server started with PID: $!"
+nohup python manage.py rca_worker --processes 2 >> logs/rca_worker.log 2>&1 &
+echo "RCA workers started with PID: $!"
+nohup python manage.py job_worker --processes 2 >> logs/job_worker.log 2>&1 &
+echo "Job workers started with PID: $!"